@@ -1,16 +1,143 @@
-from flask import Flask, jsonify
-from flask_restx import Api, reqparse, Resource
-
-from zoo import Zoo
+import os
+import zlib
+import uuid
+import time
+import base64
+import datetime
+import threading
+import functools
+from typing import Callable, Iterable, Iterator, Mapping
+
+from flask import (Flask, Response, copy_current_request_context, jsonify,
+                   request)
+from flask_restx import Api, inputs, reqparse, Resource
+
+from zoo import Zoo, CARETAKER_STRATEGIES
+from zoo_collections import EntitySet
 from api_json_utils import CustomJSONProvider
-from zoo_objects import Animal, Caretaker, Enclosure
+from zoo_concurrency import SingleWriter, ZooSnapshot
+from zoo_persistence import BackgroundSave, WriteAheadLog, load_snapshot, save_snapshot
+from zoo_objects import Animal, Caretaker, Enclosure, ZooObject
 
 my_zoo = Zoo()
 
 # had to change how json gets handled using this post: https://shorturl.at/qEJZ6
 app = Flask(__name__)
 app.json = CustomJSONProvider(app)
-api = Api(app)
+
+# if ZOO_WAL_PATH is set all changes get written to a log at this path
+# and on startup the zoo gets restored from the latest snapshot at
+# ZOO_SNAPSHOT_PATH and the entries of the log after it
+wal: WriteAheadLog | None = None
+snapshot_path: str | None = None
+snapshot_lsn = 0
+if os.environ.get('ZOO_WAL_PATH'):
+    wal = WriteAheadLog(os.environ['ZOO_WAL_PATH'])
+    snapshot_path = os.environ.get('ZOO_SNAPSHOT_PATH') or wal.path + '.snapshot'
+    if os.path.exists(snapshot_path):
+        snapshot_lsn = load_snapshot(my_zoo, snapshot_path)
+    wal.replay(my_zoo, snapshot_lsn)
+    my_zoo.journal = wal.append
+
+
+def snapshot_saved(lsn: int) -> None:
+    """Drop the entries a new snapshot contains from the log."""
+    global snapshot_lsn
+    snapshot_lsn = max(snapshot_lsn, lsn)
+    wal.truncate(lsn)
+
+
+# saves snapshots in a forked child process, while the zoo keeps serving
+# requests
+background_save: BackgroundSave | None = None
+if wal is not None:
+    background_save = BackgroundSave(snapshot_path, snapshot_saved)
+
+
+def save_zoo_snapshot() -> int | None:
+    """Save the zoo to its snapshot, drop the entries it contains from
+    the log and return the size of the snapshot. Return None if nothing
+    changed since the last snapshot or a background save is running.
+
+    The zoo cannot be changed while it gets saved."""
+    with my_zoo.lock.read():
+        lsn = wal.last_lsn
+        if lsn == snapshot_lsn or background_save.running:
+            return None
+        size = save_snapshot(my_zoo, snapshot_path, lsn)
+    snapshot_saved(lsn)
+    return size
+
+
+def start_background_save() -> bool:
+    """Start saving the zoo in the background, unless nothing changed
+    since the last snapshot, and return whether it has been started."""
+    with my_zoo.lock.read():
+        lsn = wal.last_lsn
+        return lsn != snapshot_lsn and background_save.start(my_zoo, lsn)
+
+
+def save_snapshots(interval: float, background: bool) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            if background:
+                start_background_save()
+            else:
+                save_zoo_snapshot()
+        except OSError:
+            app.logger.exception('Saving a snapshot of the zoo failed')
+
+
+# with a log the zoo gets saved every ZOO_SNAPSHOT_INTERVAL seconds, if
+# ZOO_BACKGROUND_SAVE is set as well in a forked child process
+if wal is not None and os.environ.get('ZOO_SNAPSHOT_INTERVAL'):
+    threading.Thread(target=save_snapshots, args=(float(os.environ['ZOO_SNAPSHOT_INTERVAL']),
+                                                  bool(os.environ.get('ZOO_BACKGROUND_SAVE'))),
+                     daemon=True).start()
+
+# in single writer mode all changes are applied by one writer thread and
+# lists and objects are read from snapshots of the zoo without a lock,
+# which lag behind the zoo by at most ZOO_SNAPSHOT_STALENESS seconds
+writer: SingleWriter | None = None
+if os.environ.get('ZOO_SNAPSHOT_STALENESS'):
+    writer = SingleWriter(my_zoo, app.json.dumps_zoo_object,
+                          float(os.environ['ZOO_SNAPSHOT_STALENESS']))
+
+# the HTTP methods that do not change the zoo
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def locked(view: Callable) -> Callable:
+    """Decorator for every resource: requests that only read hold the
+    read lock of the zoo, all others its write lock. So requests can be
+    handled by many threads at once, while changes that touch several
+    objects (e.g. moving an animal) are never seen half done.
+
+    In single writer mode requests that change the zoo get handled by
+    the writer thread instead. With a log they only get answered once
+    their changes are on disk."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        lock = my_zoo.lock
+        if request.method in READ_METHODS:
+            with lock.read():
+                return view(*args, **kwargs)
+
+        if writer is not None:
+            response = writer.submit(copy_current_request_context(view), *args, **kwargs)
+        else:
+            with lock.write():
+                response = view(*args, **kwargs)
+        # wait without holding the lock, so that the changes of other
+        # requests can be synced together with these
+        if wal is not None:
+            wal.wait()
+        return response
+    return wrapper
+
+
+api = Api(app, decorators=[locked])
 api.title = 'Zooma'
 
 create_animal_parser = reqparse.RequestParser()
@@ -45,6 +172,428 @@ animal_death_parser = reqparse.RequestParser()
 animal_death_parser.add_argument('animal_id', type=str, required=True,
                                  help='The ID of the animal that died. For example \'an889d3a-f378-416c-9c88-2dae19fc0f3c\'')
 
+plan_parser = reqparse.RequestParser()
+plan_parser.add_argument('strategy', type=str, location='args', default='round_robin',
+                         choices=list(CARETAKER_STRATEGIES),
+                         help='How caretakers get assigned to the tasks. For example \'least_loaded\'')
+
+
+def local_datetime(value: str) -> datetime.datetime:
+    """Parse an ISO 8601 date. Dates with a timezone get converted to
+    local time without timezone, just like all records are stored."""
+    date = datetime.datetime.fromisoformat(value)
+    if date.tzinfo is not None:
+        date = date.astimezone().replace(tzinfo=None)
+    return date
+
+
+due_tasks_parser = reqparse.RequestParser()
+due_tasks_parser.add_argument('before', type=local_datetime, location='args',
+                              help='Only return tasks that are due before this date. For example \'2023-05-01T12:00:00\'')
+due_tasks_parser.add_argument('limit', type=inputs.positive, location='args', default=10,
+                              help='The maximum number of tasks to return. For example \'10\'')
+
+
+def encode_cursor(seq: int) -> str:
+    """Return an opaque cursor for the sequence number of an object."""
+    return base64.urlsafe_b64encode(f'seq:{seq}'.encode()).decode()
+
+
+def decode_cursor(value: str) -> int:
+    """Return the sequence number of a cursor, raise a ValueError for
+    invalid cursors."""
+    try:
+        prefix, seq = base64.urlsafe_b64decode(value.encode()).decode().split(':')
+        seq = int(seq)
+    except (ValueError, UnicodeError):
+        raise ValueError(f'{value} is not a valid cursor')
+    if prefix != 'seq' or seq < 0:
+        raise ValueError(f'{value} is not a valid cursor')
+    return seq
+
+
+list_parser = reqparse.RequestParser()
+list_parser.add_argument('format', type=str, location='args', choices=('json', 'ndjson'),
+                         help='Return a JSON array or one JSON object per line. For example \'ndjson\'')
+list_parser.add_argument('limit', type=inputs.positive, location='args',
+                         help='Return at most this many objects and the cursor of the next page in the X-Next-Cursor header. For example \'100\'')
+list_parser.add_argument('cursor', type=decode_cursor, location='args', default=0,
+                         help='Continue after the page that returned this cursor in its X-Next-Cursor header')
+
+# the fields of an animal that can be selected via the fields parameter
+ANIMAL_FIELDS = ('id', 'species_name', 'common_name', 'age', 'enclosure',
+                 'caretaker', 'feeding_record', 'medical_record')
+
+
+def animal_fields(value: str) -> list[str]:
+    """Parse a comma separated list of animal fields, raise a ValueError
+    for unknown fields."""
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in ANIMAL_FIELDS]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+    return fields
+
+
+animal_view_parser = reqparse.RequestParser()
+animal_view_parser.add_argument('fields', type=animal_fields, location='args',
+                                help='Only return these comma separated fields of every animal. For example \'id,age\'')
+animal_view_parser.add_argument('records', type=str, location='args', default='full',
+                                choices=('full', 'summary'),
+                                help='Return the full feeding and medical records or only the number of records and the latest one. For example \'summary\'')
+
+animal_list_parser = list_parser.copy()
+for argument in animal_view_parser.args:
+    animal_list_parser.add_argument(argument)
+
+
+def animal_view(animal: Animal, fields: list[str] | None, records: str) -> dict:
+    """Return the JSON data of an animal with only the given fields and
+    the full records or just a summary of them."""
+    if records == 'summary':
+        data = animal.to_summary_json()
+    else:
+        data = animal.to_json()
+    if fields is not None:
+        data = {field: data[field] for field in fields}
+    return data
+
+
+def animal_encoder() -> Callable[[Animal], str]:
+    """Return a function that encodes an animal in the view requested
+    via the fields and records parameters.
+
+    Only the full view uses the cached JSON of the animals."""
+    args = animal_view_parser.parse_args()
+    provider = app.json
+    if args['fields'] is None and args['records'] == 'full':
+        return provider.dumps_zoo_object
+    return lambda animal: provider.dumps(animal_view(animal, args['fields'], args['records']))
+
+
+# list responses get sent in chunks of about this many characters
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# without a limit the objects of lists get collected in pages of this
+# many objects
+STREAM_PAGE_SIZE = 1000
+
+
+def stream_objects(objects: EntitySet[ZooObject],
+                   encode: Callable[[ZooObject], str] | None = None) -> Response:
+    """Stream a list of zoo objects as a JSON array or, if requested via
+    the format parameter or the Accept header, as NDJSON.
+
+    With a limit only one page gets returned and the cursor of the next
+    page is sent in the X-Next-Cursor header. Otherwise all objects get
+    returned.
+
+    All objects get encoded while the request holds the read lock, so
+    the list shows a single state of the zoo, the one its ETag belongs
+    to. The response then gets put together chunk by chunk from the
+    encoded objects, after the lock has been released.
+
+    With the cached JSON of the objects (the default) only references
+    to it get collected, so the memory needed does not grow with the
+    size of the document. Other encode functions, like the views of
+    animals with fields or records, create a new string for every
+    object, so all of them are in memory until the response has been
+    sent."""
+    args = list_parser.parse_args()
+    output_format = requested_format(args)
+
+    headers = {}
+    if args['limit'] is not None:
+        selected, next_seq = objects.page(args['cursor'], args['limit'])
+        if next_seq is not None:
+            headers['X-Next-Cursor'] = encode_cursor(next_seq)
+    else:
+        selected = [obj for page in all_pages(objects, args['cursor']) for obj in page]
+    if encode is None:
+        encode = app.json.dumps_zoo_object
+    fragments = list(map(encode, selected))
+
+    return Response(join_fragments(fragments, output_format),
+                    mimetype=MIMETYPES[output_format], headers=headers)
+
+
+# the mimetypes of the formats lists can be returned in
+MIMETYPES = {'json': 'application/json', 'ndjson': 'application/x-ndjson'}
+
+
+def requested_format(args: dict) -> str:
+    """Return the format of a list requested via the format parameter
+    or the Accept header, JSON by default."""
+    if args['format'] is not None:
+        return args['format']
+    best_match = request.accept_mimetypes.best_match(list(MIMETYPES.values()))
+    return 'ndjson' if best_match == MIMETYPES['ndjson'] else 'json'
+
+
+def join_fragments(fragments: Iterable[str], output_format: str) -> Iterator[str]:
+    """Join the JSON of many objects to a JSON array or to NDJSON and
+    return it in chunks of about STREAM_CHUNK_SIZE characters."""
+    chunk: list[str] = ['['] if output_format == 'json' else []
+    size = 0
+    first = True
+    for fragment in fragments:
+        if output_format == 'ndjson':
+            chunk.append(fragment)
+            chunk.append('\n')
+        else:
+            if not first:
+                chunk.append(',')
+            chunk.append(fragment)
+        first = False
+        size += len(fragment)
+        if size >= STREAM_CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk.clear()
+            size = 0
+
+    if output_format == 'json':
+        chunk.append(']')
+    yield ''.join(chunk)
+
+
+def all_pages(objects: EntitySet[ZooObject], after: int) -> Iterator[list[ZooObject]]:
+    """Return all objects after the given sequence number page by
+    page."""
+    while after is not None:
+        page, after = objects.page(after, STREAM_PAGE_SIZE)
+        yield page
+
+
+def id_list(value: list) -> list[str]:
+    """Check that a JSON value is a list of IDs."""
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f'{value} is not a list of IDs')
+    return value
+
+
+select_animals_parser = reqparse.RequestParser()
+select_animals_parser.add_argument('animal_ids', type=id_list, location='json',
+                                   help='The IDs of the animals. For example [\'an889d3a-f378-416c-9c88-2dae19fc0f3c\']')
+select_animals_parser.add_argument('species_name', type=str, location='json',
+                                   help='Select all animals of this species. For example \'Panthera tigris\'')
+select_animals_parser.add_argument('enclosure_id', type=str, location='json',
+                                   help='Select all animals living in this enclosure. For example \'en889d3a-f378-416c-9c88-2dae19fc0f3c\'')
+select_animals_parser.add_argument('caretaker_id', type=str, location='json',
+                                   help='Select all animals of this caretaker. For example \'ca889d3a-f378-416c-9c88-2dae19fc0f3c\'')
+
+select_enclosures_parser = reqparse.RequestParser()
+select_enclosures_parser.add_argument('enclosure_ids', type=id_list, location='json',
+                                      help='The IDs of the enclosures. For example [\'en889d3a-f378-416c-9c88-2dae19fc0f3c\']')
+select_enclosures_parser.add_argument('species_name', type=str, location='json',
+                                      help='Select all enclosures where this species lives. For example \'Panthera tigris\'')
+
+
+def encode_since(epoch: str, version: int) -> str:
+    """Return the token for a version of the zoo with the given epoch,
+    which gets passed as since to /changes."""
+    return f'{epoch}-{version}'
+
+
+def decode_since(value: str) -> tuple[str, int]:
+    """Return the epoch and the version of a since token, raise a
+    ValueError for invalid tokens. A plain version has no epoch, so it
+    only matches version 0, which is the same in every epoch."""
+    epoch, separator, version = value.rpartition('-')
+    if not version.isdigit() or (separator and not epoch):
+        raise ValueError(f'{value} is not a valid version')
+    return epoch, int(version)
+
+
+changes_parser = reqparse.RequestParser()
+changes_parser.add_argument('since', type=decode_since, location='args', required=True,
+                            help='Return the changes after this version of the zoo, as returned in since by the last call or 0. For example \'3f2a9c1b-42\'')
+
+
+# the fields needed to create animals, enclosures and caretakers with
+# the types their values get converted to
+CREATE_ANIMAL_FIELDS = {'species_name': str, 'common_name': str, 'age': int}
+CREATE_ENCLOSURE_FIELDS = {'name': str, 'area': float}
+CREATE_CARETAKER_FIELDS = {'name': str, 'address': str}
+
+
+def read_bulk_items() -> list:
+    """Return the items of a request body that is either a JSON array or
+    NDJSON (one JSON object per line). Lines that are no valid JSON
+    become None, so that they get reported as invalid items."""
+    if request.mimetype == 'application/x-ndjson':
+        items = []
+        for line in request.get_data(as_text=True).splitlines():
+            if line.strip():
+                try:
+                    items.append(app.json.loads(line))
+                except ValueError:
+                    items.append(None)
+        return items
+
+    items = request.get_json(force=True, silent=True)
+    if not isinstance(items, list):
+        api.abort(400, 'The body has to be a JSON array or NDJSON')
+    return items
+
+
+def parse_bulk_item(item: object, fields: dict[str, type]) -> dict | str:
+    """Convert the values of an item to the types of the given fields.
+    Return an error message if the item is invalid."""
+    if not isinstance(item, dict):
+        return 'The item has to be a JSON object'
+
+    values = {}
+    for field, field_type in fields.items():
+        value = item.get(field)
+        if value is None:
+            return f'Missing required parameter {field}'
+        if isinstance(value, (bool, list, dict)) or (field_type is int and isinstance(value, float)):
+            return f'Invalid value for {field}: {value}'
+        try:
+            values[field] = field_type(value)
+        except ValueError:
+            return f'Invalid value for {field}: {value}'
+    return values
+
+
+def bulk_create(cls: type, fields: dict[str, type],
+                check: Callable[[dict], str | None],
+                add: Callable[[list], int]) -> Response:
+    """Create an object of the given class for every valid item of the
+    request body and add all of them to the zoo at once.
+
+    Return the number of created and failed items and per item either
+    the ID of the new object or the reason why it is invalid."""
+    items = read_bulk_items()
+    results = []
+    new_objects = []
+    for item in items:
+        values = parse_bulk_item(item, fields)
+        if isinstance(values, dict):
+            error = check(values)
+            if error is None:
+                new_object = cls(**values)
+                new_objects.append(new_object)
+                results.append({'id': new_object.id})
+                continue
+            values = error
+        results.append({'error': values})
+
+    add(new_objects)
+    return jsonify({'created': len(new_objects),
+                    'failed': len(items) - len(new_objects),
+                    'results': results})
+
+
+# the versions start at 0 with every start of the API, so this prefix
+# makes sure that ETags of an earlier run do not match
+ETAG_PREFIX = uuid.uuid4().hex[:8]
+
+
+def conditional(get_version: Callable[..., tuple]) -> Callable:
+    """Decorator for GET methods that sends an ETag derived from the
+    versions returned by get_version, which gets called with the same
+    arguments as the method.
+
+    If the If-None-Match header of the request contains the ETag the
+    method does not get called at all and 304 Not Modified gets
+    returned instead. The ETag also depends on the query parameters and
+    the Accept header, as they change the representation."""
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            etag = make_etag(get_version(*args, **kwargs))
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = method(self, *args, **kwargs)
+            # weak, because the whitespace depends on the JSON backend
+            response.set_etag(etag, weak=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def make_etag(versions: Iterable) -> str:
+    """Return the ETag of the current request for the given versions."""
+    variant = zlib.crc32(request.query_string + request.headers.get('Accept', '').encode())
+    return '-'.join([ETAG_PREFIX, *map(str, versions), f'{variant:08x}'])
+
+
+def object_version(obj: ZooObject | None, collection: str) -> tuple:
+    """Return the version of an object or of its whole collection if
+    the object does not exist, as it could be added later."""
+    if obj is None:
+        return (collection, my_zoo.collection_version(collection))
+    return (obj.id, obj.version)
+
+
+def collection_version(*collections: str) -> tuple:
+    """Return the versions of the given collections."""
+    return tuple(my_zoo.collection_version(collection) for collection in collections)
+
+
+def snapshot_list(collection: Mapping[str, str]) -> Response | None:
+    """Return a list of a snapshot, but only if all of it is requested,
+    pages need the sequence numbers of the zoo."""
+    args = list_parser.parse_args()
+    if args['limit'] is not None or args['cursor']:
+        return None
+    output_format = requested_format(args)
+    return Response(join_fragments(collection.values(), output_format),
+                    mimetype=MIMETYPES[output_format])
+
+
+def snapshot_object(collection: Mapping[str, str], obj_id: str) -> Response:
+    """Return an object of a snapshot or null if it does not exist."""
+    return app.response_class(collection.get(obj_id, 'null'), mimetype='application/json')
+
+
+def full_animal_view() -> bool:
+    """Return whether the full JSON of the animals is requested."""
+    args = animal_view_parser.parse_args()
+    return args['fields'] is None and args['records'] == 'full'
+
+
+# the GET requests that can be answered from a snapshot by their route,
+# the functions return None if they cannot answer a request
+SNAPSHOT_VIEWS: dict[str, Callable[..., Response | None]] = {
+    '/animals': lambda snapshot: snapshot_list(snapshot.animals) if full_animal_view() else None,
+    '/enclosures': lambda snapshot: snapshot_list(snapshot.enclosures),
+    '/caretakers': lambda snapshot: snapshot_list(snapshot.caretakers),
+    '/animal/<animal_id>': lambda snapshot, animal_id: (
+        snapshot_object(snapshot.animals, animal_id) if full_animal_view() else None),
+    '/enclosure/<enclosure_id>': lambda snapshot, enclosure_id: snapshot_object(snapshot.enclosures, enclosure_id),
+    '/caretaker/<caretaker_id>': lambda snapshot, caretaker_id: snapshot_object(snapshot.caretakers, caretaker_id),
+}
+
+
+@app.before_request
+def serve_snapshot() -> Response | None:
+    """In single writer mode answer the lists and objects from the
+    latest snapshot without taking any lock. All other requests are
+    handled by the resources as usual."""
+    if writer is None or request.method != 'GET' or request.url_rule is None:
+        return None
+    view = SNAPSHOT_VIEWS.get(request.url_rule.rule)
+    if view is None:
+        return None
+
+    snapshot: ZooSnapshot = writer.snapshot
+    response = view(snapshot, **request.view_args)
+    if response is None:
+        return None
+    # lists change with every snapshot, objects only with their JSON
+    if response.is_streamed:
+        etag = make_etag(('snapshot', snapshot.version))
+    else:
+        etag = make_etag(('snapshot', f'{zlib.crc32(response.get_data()):08x}'))
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    response.headers['X-Snapshot-Version'] = str(snapshot.version)
+    return response
+
 
 # ---- Animal API calls ----
 
@@ -72,10 +621,15 @@ class CreateAnimal(Resource):
 
 @api.route('/animal/<animal_id>')
 class AnimalID(Resource):
+    @api.doc(parser=animal_view_parser)
+    @conditional(lambda animal_id: object_version(my_zoo.get_animal(animal_id), 'animals'))
     def get(self, animal_id):
+        args = animal_view_parser.parse_args()
         # returns None when no animal with the given ID exists
         search_result = my_zoo.get_animal(animal_id)
-        return jsonify(search_result)
+        if search_result is None or (args['fields'] is None and args['records'] == 'full'):
+            return jsonify(search_result)
+        return jsonify(animal_view(search_result, args['fields'], args['records']))
 
     def delete(self, animal_id):
         targeted_animal = my_zoo.get_animal(animal_id)
@@ -87,8 +641,15 @@ class AnimalID(Resource):
 
 @api.route('/animals')
 class AllAnimals(Resource):
+    @api.doc(parser=animal_list_parser)
+    @conditional(lambda: collection_version('animals'))
     def get(self):
-        return jsonify(my_zoo.get_all_animals())
+        return stream_objects(my_zoo.get_all_animals(), animal_encoder())
+
+    def post(self):
+        return bulk_create(Animal, CREATE_ANIMAL_FIELDS,
+                           lambda values: f'An age of {values["age"]} is not possible' if values['age'] < 0 else None,
+                           my_zoo.add_animals)
 
 
 @api.route('/animal/<animal_id>/feed')
@@ -101,6 +662,18 @@ class FeedAnimal(Resource):
         return jsonify(targeted_animal)
 
 
+@api.route('/animals/feed')
+class FeedAnimals(Resource):
+    @api.doc(parser=select_animals_parser)
+    def post(self):
+        args = select_animals_parser.parse_args()
+        summary = my_zoo.feed_animals(args['animal_ids'], args['species_name'],
+                                      args['enclosure_id'], args['caretaker_id'])
+        if summary is None:
+            return jsonify('No animals have been selected')
+        return jsonify(summary)
+
+
 @api.route('/animal/<animal_id>/vet')
 class VetAnimal(Resource):
     def post(self, animal_id):
@@ -111,6 +684,18 @@ class VetAnimal(Resource):
         return jsonify(targeted_animal)
 
 
+@api.route('/animals/vet')
+class VetAnimals(Resource):
+    @api.doc(parser=select_animals_parser)
+    def post(self):
+        args = select_animals_parser.parse_args()
+        summary = my_zoo.vet_animals(args['animal_ids'], args['species_name'],
+                                     args['enclosure_id'], args['caretaker_id'])
+        if summary is None:
+            return jsonify('No animals have been selected')
+        return jsonify(summary)
+
+
 @api.route('/animal/<animal_id>/home')
 class SetHomeAnimal(Resource):
     @api.doc(parser=set_home_parser)
@@ -163,6 +748,7 @@ class DeathAnimal(Resource):
 
 @api.route('/animal/stats')
 class AnimalStats(Resource):
+    @conditional(lambda: collection_version('animals'))
     def get(self):
         stats = my_zoo.get_animal_stats()
         return jsonify(stats)
@@ -189,6 +775,7 @@ class CreateEnclosure(Resource):
 
 @api.route('/enclosure/<enclosure_id>')
 class EnclosureID(Resource):
+    @conditional(lambda enclosure_id: object_version(my_zoo.get_enclosure(enclosure_id), 'enclosures'))
     def get(self, enclosure_id):
         # returns None when no enclosure with the given ID exists
         search_result = my_zoo.get_enclosure(enclosure_id)
@@ -207,8 +794,15 @@ class EnclosureID(Resource):
 
 @api.route('/enclosures')
 class AllEnclosures(Resource):
+    @api.doc(parser=list_parser)
+    @conditional(lambda: collection_version('enclosures'))
     def get(self):
-        return jsonify(my_zoo.get_all_enclosures())
+        return stream_objects(my_zoo.get_all_enclosures())
+
+    def post(self):
+        return bulk_create(Enclosure, CREATE_ENCLOSURE_FIELDS,
+                           lambda values: f'An area of {values["area"]} is not possible' if values['area'] <= 0 else None,
+                           my_zoo.add_enclosures)
 
 
 @api.route('/enclosure/<enclosure_id>/clean')
@@ -221,18 +815,46 @@ class CleanEnclosure(Resource):
         return jsonify(targeted_enclosure)
 
 
+@api.route('/enclosures/clean')
+class CleanEnclosures(Resource):
+    @api.doc(parser=select_enclosures_parser)
+    def post(self):
+        args = select_enclosures_parser.parse_args()
+        summary = my_zoo.clean_enclosures(args['enclosure_ids'], args['species_name'])
+        if summary is None:
+            return jsonify('No enclosures have been selected')
+        return jsonify(summary)
+
+
 @api.route('/enclosure/<enclosure_id>/animals')
 class AllAnimalsInEnclosure(Resource):
+    @api.doc(parser=animal_list_parser)
+    @conditional(lambda enclosure_id: (*object_version(my_zoo.get_enclosure(enclosure_id), 'enclosures'),
+                                        *collection_version('animals')))
     def get(self, enclosure_id):
         targeted_enclosure = my_zoo.get_enclosure(enclosure_id)
         if not targeted_enclosure:
             return jsonify(f'Enclosure with ID {enclosure_id} has not been found')
         animals = targeted_enclosure.get_animals()
-        return jsonify(animals)
+        return stream_objects(animals, animal_encoder())
+
+    @api.doc(parser=select_animals_parser)
+    def post(self, enclosure_id):
+        targeted_enclosure = my_zoo.get_enclosure(enclosure_id)
+        if not targeted_enclosure:
+            return jsonify(f'Enclosure with ID {enclosure_id} has not been found')
+
+        args = select_animals_parser.parse_args()
+        summary = my_zoo.move_animals(targeted_enclosure, args['animal_ids'], args['species_name'],
+                                      args['enclosure_id'], args['caretaker_id'])
+        if summary is None:
+            return jsonify('No animals have been selected')
+        return jsonify(summary)
 
 
 @api.route('/enclosure/stats')
 class EnclosureStats(Resource):
+    @conditional(lambda: collection_version('enclosures'))
     def get(self):
         stats = my_zoo.get_enclosure_stats()
         return jsonify(stats)
@@ -256,6 +878,7 @@ class CreateCaretaker(Resource):
 
 @api.route('/caretaker/<caretaker_id>')
 class CaretakerID(Resource):
+    @conditional(lambda caretaker_id: object_version(my_zoo.get_caretaker(caretaker_id), 'caretakers'))
     def get(self, caretaker_id):
         # returns None when no caretaker with the given ID exists
         search_result = my_zoo.get_caretaker(caretaker_id)
@@ -276,8 +899,14 @@ class CaretakerID(Resource):
 
 @api.route('/caretakers')
 class AllCaretakers(Resource):
+    @api.doc(parser=list_parser)
+    @conditional(lambda: collection_version('caretakers'))
     def get(self):
-        return jsonify(my_zoo.get_all_caretakers())
+        return stream_objects(my_zoo.get_all_caretakers())
+
+    def post(self):
+        return bulk_create(Caretaker, CREATE_CARETAKER_FIELDS,
+                           lambda values: None, my_zoo.add_caretakers)
 
 
 @api.route('/caretaker/<caretaker_id>/care/<animal_id>')
@@ -297,16 +926,33 @@ class AssignCaretaker(Resource):
 
 @api.route('/caretaker/<caretaker_id>/animals')
 class AllAnimalsOfCaretaker(Resource):
+    @api.doc(parser=list_parser)
+    @conditional(lambda caretaker_id: (*object_version(my_zoo.get_caretaker(caretaker_id), 'caretakers'),
+                                        *collection_version('animals')))
     def get(self, caretaker_id):
         targeted_caretaker = my_zoo.get_caretaker(caretaker_id)
         if not targeted_caretaker:
             return jsonify(f'Caretaker with ID {caretaker_id} has not been found')
         animals = targeted_caretaker.get_animals()
-        return jsonify(animals)
+        return stream_objects(animals)
+
+    @api.doc(parser=select_animals_parser)
+    def post(self, caretaker_id):
+        targeted_caretaker = my_zoo.get_caretaker(caretaker_id)
+        if not targeted_caretaker:
+            return jsonify(f'Caretaker with ID {caretaker_id} has not been found')
+
+        args = select_animals_parser.parse_args()
+        summary = my_zoo.assign_caretaker(targeted_caretaker, args['animal_ids'], args['species_name'],
+                                          args['enclosure_id'], args['caretaker_id'])
+        if summary is None:
+            return jsonify('No animals have been selected')
+        return jsonify(summary)
 
 
 @api.route('/caretaker/stats')
 class CaretakerStats(Resource):
+    @conditional(lambda: collection_version('caretakers'))
     def get(self):
         stats = my_zoo.get_caretaker_stats()
         return jsonify(stats)
@@ -317,24 +963,81 @@ class CaretakerStats(Resource):
 
 @api.route('/tasks/feeding')
 class AnimalFeedingPlan(Resource):
+    @api.doc(parser=plan_parser)
+    @conditional(lambda: (my_zoo.version,))
     def get(self):
-        feeding_plan = my_zoo.generate_feeding_plan()
+        args = plan_parser.parse_args()
+        feeding_plan = my_zoo.generate_feeding_plan(args['strategy'])
         return jsonify(feeding_plan)
 
 
 @api.route('/tasks/medical')
 class AnimalMedicalPlan(Resource):
+    @api.doc(parser=plan_parser)
+    @conditional(lambda: (my_zoo.version,))
     def get(self):
-        medical_plan = my_zoo.generate_medical_plan()
+        args = plan_parser.parse_args()
+        medical_plan = my_zoo.generate_medical_plan(args['strategy'])
         return jsonify(medical_plan)
 
 
 @api.route('/tasks/cleaning')
 class EnclosureCleaningPlan(Resource):
+    @api.doc(parser=plan_parser)
+    @conditional(lambda: (my_zoo.version,))
     def get(self):
-        cleaning_plan = my_zoo.generate_cleaning_plan()
+        args = plan_parser.parse_args()
+        cleaning_plan = my_zoo.generate_cleaning_plan(args['strategy'])
         return jsonify(cleaning_plan)
 
 
+@api.route('/tasks/<any(feeding, medical, cleaning):task>/due')
+class DueTasks(Resource):
+    @api.doc(parser=due_tasks_parser)
+    @conditional(lambda task: (my_zoo.version,))
+    def get(self, task):
+        args = due_tasks_parser.parse_args()
+        due_tasks = my_zoo.get_due_tasks(task, args['before'], args['limit'])
+        return jsonify(due_tasks)
+
+
+# ---- Change API calls ----
+
+
+@api.route('/changes')
+class Changes(Resource):
+    @api.doc(parser=changes_parser)
+    @conditional(lambda: (my_zoo.version,))
+    def get(self):
+        args = changes_parser.parse_args()
+        epoch, version = args['since']
+        changes = my_zoo.get_changes(version, epoch)
+        changes['since'] = encode_since(changes['epoch'], changes['version'])
+        return jsonify(changes)
+
+
+# ---- Admin API calls ----
+
+
+@api.route('/admin/snapshot')
+class AdminSnapshot(Resource):
+    def get(self):
+        if background_save is None:
+            return jsonify('Snapshots need a write-ahead log, set ZOO_WAL_PATH')
+        status = background_save.status()
+        if status is None:
+            return jsonify('No background save has been started yet')
+        return jsonify(status)
+
+    def post(self):
+        if background_save is None:
+            return jsonify('Snapshots need a write-ahead log, set ZOO_WAL_PATH')
+        # requests that change the zoo hold its write lock, so it cannot
+        # change while the process gets forked
+        if not background_save.start(my_zoo, wal.last_lsn):
+            return jsonify('A background save is already in progress')
+        return jsonify(background_save.status())
+
+
 if __name__ == '__main__':
     app.run(debug=False, port=7890)
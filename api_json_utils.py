@@ -1,42 +1,164 @@
+import re
 import json
-from datetime import date
+from datetime import date, datetime
 from json import JSONEncoder
+from typing import Any, Callable
 from flask.json.provider import JSONProvider
 
-from zoo_objects import Animal, Caretaker, Enclosure
+from zoo_collections import EntitySet, TimestampRecord
+from zoo_objects import Animal, Caretaker, Enclosure, ZooObject
 
+# orjson is optional, without it the standard library gets used
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# had to add this class using this post: 
+
+def encode_zoo_object(obj: Animal | Caretaker | Enclosure) -> dict:
+    """Encode an animal, caretaker or enclosure via its to_json method.
+
+    The records get converted to ISO 8601 strings right away, so that
+    the JSON encoder does not need to call back for every record."""
+    data = obj.to_json()
+    for key, value in data.items():
+        if type(value) is TimestampRecord:
+            data[key] = value.isoformat()
+    return data
+
+
+def encode_zoo_object_native(obj: Animal | Caretaker | Enclosure) -> dict:
+    """Same as encode_zoo_object, but the records become lists of
+    datetime objects, which orjson formats a lot faster itself."""
+    data = obj.to_json()
+    for key, value in data.items():
+        if type(value) is TimestampRecord:
+            data[key] = value.datetimes()
+    return data
+
+
+# look up the encoder of an object by its exact type instead of going
+# through a chain of isinstance checks for every object
+ENCODERS: dict[type, Callable[[Any], Any]] = {
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    Animal: encode_zoo_object,
+    Caretaker: encode_zoo_object,
+    Enclosure: encode_zoo_object,
+    TimestampRecord: TimestampRecord.isoformat,
+    EntitySet: list,
+}
+
+# orjson serializes datetime objects natively (in the same format as
+# isoformat), so they do not need to be converted beforehand
+ORJSON_ENCODERS: dict[type, Callable[[Any], Any]] = {
+    **ENCODERS,
+    Animal: encode_zoo_object_native,
+    Caretaker: encode_zoo_object_native,
+    Enclosure: encode_zoo_object_native,
+    TimestampRecord: TimestampRecord.datetimes,
+}
+
+# orjson parses integers that do not fit into 64 bit as floats, so JSON
+# with that many digits in a row gets parsed by the standard library
+LONG_NUMBER = re.compile('[0-9]{19}')
+LONG_NUMBER_BYTES = re.compile(b'[0-9]{19}')
+
+
+# had to add this class using this post:
 # https://stackoverflow.com/questions/44146087/pass-user-built-json-encoder-into-flasks-jsonify
 class CustomJSONProvider(JSONProvider):
+    # use orjson whenever it is installed, it does not support the
+    # keyword arguments of json.dumps though
+    use_orjson = orjson is not None
 
     def dumps(self, obj, **kwargs):
+        if not kwargs:
+            # zoo objects and lists of them are put together from the
+            # cached JSON of every object
+            if isinstance(obj, ZooObject):
+                return self.dumps_zoo_object(obj)
+            if type(obj) in (EntitySet, list) and all(isinstance(item, ZooObject) for item in obj):
+                separator = ',' if self.use_orjson else ', '
+                return '[' + separator.join(map(self.dumps_zoo_object, obj)) + ']'
+        return self._dumps(obj, **kwargs)
+
+    def dumps_zoo_object(self, obj: ZooObject) -> str:
+        """Return the JSON of an animal, caretaker or enclosure.
+
+        The JSON gets cached on the object until the object changes, so
+        objects that did not change do not have to be encoded again."""
+        if obj._json is None:
+            obj._json = self._dumps(obj)
+        return obj._json
+
+    def _dumps(self, obj, **kwargs) -> str:
+        if self.use_orjson and not kwargs:
+            try:
+                return orjson.dumps(obj, default=encode_default_orjson,
+                                    option=orjson.OPT_NON_STR_KEYS).decode()
+            except orjson.JSONEncodeError:
+                # orjson only supports integers up to 64 bit, the
+                # standard library handles all of them
+                pass
         return json.dumps(obj, **kwargs, cls=ZooJsonEncoder)
 
     def loads(self, s: str | bytes, **kwargs):
+        if self.use_orjson and not kwargs:
+            long_number = LONG_NUMBER if isinstance(s, str) else LONG_NUMBER_BYTES
+            if long_number.search(s) is None:
+                return orjson.loads(s)
         return json.loads(s, **kwargs)
 
 
-class ZooJsonEncoder(JSONEncoder):
-    def default(self, obj):
-        try:
-            # handle date separately (includes datetime)
-            if isinstance(obj, date):
-                return obj.isoformat()
-
-            # handle Animal, Caretaker and Enclosure separately;
-            # to handle circular references
-            elif isinstance(obj, (Animal, Caretaker, Enclosure)):
-                return obj.to_json()
-
-            # check if object is iterable
-            iterable = iter(obj)
-        except TypeError:
-            pass
-
-        # gets executed when no exception occured
-        else:
-            # when object is not iterable
-            return list(iterable)
+def encode_default(obj):
+    """Return a JSON serializable version of an object that the JSON
+    encoder cannot handle by itself."""
+    encoder = ENCODERS.get(type(obj))
+    if encoder is not None:
+        return encoder(obj)
+
+    try:
+        # handle date separately (includes datetime)
+        if isinstance(obj, date):
+            return obj.isoformat()
+
+        # handle Animal, Caretaker and Enclosure separately;
+        # to handle circular references
+        elif isinstance(obj, (Animal, Caretaker, Enclosure)):
+            return encode_zoo_object(obj)
+
+        # convert all timestamps at once instead of one by one
+        elif isinstance(obj, TimestampRecord):
+            return obj.isoformat()
+
+        # check if object is iterable
+        iterable = iter(obj)
+    except TypeError:
+        pass
+
+    # gets executed when no exception occured
+    else:
+        # when object is not iterable
+        return list(iterable)
 
+    # objects with __slots__ do not have a __dict__
+    if hasattr(obj, '__dict__'):
         return obj.__dict__
+    return {name: getattr(obj, name)
+            for cls in type(obj).__mro__
+            for name in getattr(cls, '__slots__', ())
+            if hasattr(obj, name)}
+
+
+def encode_default_orjson(obj):
+    """Return a version of an object that orjson can serialize."""
+    encoder = ORJSON_ENCODERS.get(type(obj))
+    if encoder is not None:
+        return encoder(obj)
+    return encode_default(obj)
+
+
+class ZooJsonEncoder(JSONEncoder):
+    def default(self, obj):
+        return encode_default(obj)
@@ -0,0 +1,80 @@
+"""Compare how long changes of the zoo stall while a snapshot gets saved,
+once inline while holding the read lock and once in a forked child
+process (background save).
+
+Run from the repository root with:
+
+    python -m benchmarks.background_save [animals]
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+
+from zoo import Zoo
+from benchmarks.cold_start import build
+from zoo_persistence import BackgroundSave, save_snapshot
+
+
+def measure(zoo: Zoo, save) -> tuple[float, float, int]:
+    """Feed animals over and over again while save runs. Return the
+    longest time a feeding had to wait, the duration of the save and the
+    number of feedings meanwhile."""
+    animals = list(zoo.animals)[:1000]
+    done = threading.Event()
+    latencies = []
+
+    def change():
+        idx = 0
+        while not done.is_set():
+            start = time.perf_counter()
+            with zoo.lock.write():
+                animals[idx % len(animals)].feed()
+            latencies.append(time.perf_counter() - start)
+            idx += 1
+            time.sleep(0.001)
+
+    thread = threading.Thread(target=change)
+    thread.start()
+    time.sleep(0.1)
+    start = time.perf_counter()
+    save()
+    duration = time.perf_counter() - start
+    done.set()
+    thread.join()
+    return max(latencies), duration, len(latencies)
+
+
+def main() -> None:
+    animals = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    zoo = Zoo()
+    build(zoo, animals)
+
+    with tempfile.TemporaryDirectory(dir='.') as directory:
+        path = os.path.join(directory, 'zoo.snapshot')
+
+        def inline():
+            with zoo.lock.read():
+                save_snapshot(zoo, path, 0)
+
+        background_save = BackgroundSave(path)
+
+        def background():
+            with zoo.lock.read():
+                background_save.start(zoo, 0)
+            background_save.wait()
+
+        inline_stall, inline_duration, inline_changes = measure(zoo, inline)
+        background_stall, background_duration, background_changes = measure(zoo, background)
+        status = background_save.status()
+
+    print(f'{animals} animals, snapshot of {status["bytes_written"] / 2 ** 20:.1f} MiB')
+    print(f'inline:     save {inline_duration:6.2f} s, longest stall {inline_stall * 1000:8.1f} ms, '
+          f'{inline_changes:5d} changes meanwhile')
+    print(f'background: save {background_duration:6.2f} s, longest stall {background_stall * 1000:8.1f} ms, '
+          f'{background_changes:5d} changes meanwhile')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Compare adding animals one by one via POST /animal with adding them
+all at once via POST /animals as a JSON array and as NDJSON.
+
+Run from the repository root with:
+
+    python -m benchmarks.bulk_create [animals]
+"""
+import sys
+import json
+import time
+
+import api
+from zoo import Zoo
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    client = api.app.test_client()
+    items = [{'species_name': 'Panthera tigris', 'common_name': 'Tiger', 'age': age % 30}
+             for age in range(count)]
+
+    # one request per animal takes too long, so only measure a sample
+    sample = min(count, 2000)
+    start = time.perf_counter()
+    for item in items[:sample]:
+        client.post('/animal', data=item)
+    single = (time.perf_counter() - start) / sample * count
+
+    bodies = {
+        'JSON array': (json.dumps(items), 'application/json'),
+        'NDJSON': ('\n'.join(map(json.dumps, items)), 'application/x-ndjson'),
+    }
+    print(f'adding {count} animals')
+    print(f'{"one by one":12} {single:6.2f} s (estimated from {sample} requests)')
+    for name, (body, content_type) in bodies.items():
+        api.my_zoo = Zoo()
+        start = time.perf_counter()
+        result = client.post('/animals', data=body, content_type=content_type).get_json()
+        seconds = time.perf_counter() - start
+        assert result['created'] == count
+        print(f'{name:12} {seconds:6.2f} s, {single / seconds:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
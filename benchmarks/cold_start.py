@@ -0,0 +1,105 @@
+"""Compare the startup time of a zoo that gets restored by replaying its
+whole write ahead log with one that loads a snapshot and replays only the
+entries of the log after it.
+
+Run from the repository root with:
+
+    python -m benchmarks.cold_start [animals] [changes after the snapshot]
+"""
+import os
+import sys
+import time
+import tempfile
+
+from zoo import Zoo
+from zoo_objects import Animal, Caretaker, Enclosure
+from zoo_persistence import WriteAheadLog, load_snapshot, save_snapshot
+
+SPECIES = [('Panthera tigris', 'Tiger'), ('Ailurus fulgens', 'Red panda'),
+           ('Ursus arctos', 'Brown bear'), ('Giraffa camelopardalis', 'Giraffe')]
+
+
+def build(zoo: Zoo, animals: int) -> None:
+    """Fill a zoo with animals that live in enclosures, have caretakers
+    and have been fed."""
+    enclosures = [Enclosure(f'Enclosure{idx}', 500.0) for idx in range(max(1, animals // 1000))]
+    zoo.add_enclosures(enclosures)
+    caretakers = [Caretaker(f'Caretaker{idx}', 'Zoo Street 1') for idx in range(max(1, animals // 500))]
+    for caretaker in caretakers:
+        zoo.add_caretaker(caretaker)
+    for start in range(0, animals, 10_000):
+        batch = [Animal(*SPECIES[idx % len(SPECIES)], idx % 30) for idx in range(start, min(animals, start + 10_000))]
+        zoo.add_animals(batch)
+        for idx, animal in enumerate(batch, start):
+            animal.set_home(enclosures[idx % len(enclosures)])
+            animal.set_caretaker(caretakers[idx % len(caretakers)])
+            animal.feed()
+
+
+def change(zoo: Zoo, changes: int) -> None:
+    animals = list(zoo.animals)
+    for idx in range(changes):
+        animals[idx % len(animals)].vet()
+
+
+def timed(restore) -> tuple[float, Zoo]:
+    start = time.perf_counter()
+    zoo = restore()
+    return time.perf_counter() - start, zoo
+
+
+def main() -> None:
+    animals = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+
+    with tempfile.TemporaryDirectory(dir='.') as directory:
+        full_path = os.path.join(directory, 'full.wal')
+        log_path = os.path.join(directory, 'zoo.wal')
+        snapshot_path = os.path.join(directory, 'zoo.snapshot')
+
+        # the same changes once in a log that is never truncated and once
+        # in a log that gets truncated after the snapshot
+        zoo = Zoo()
+        full_wal = WriteAheadLog(full_path)
+        wal = WriteAheadLog(log_path)
+        zoo.journal = lambda entry: (full_wal.append(entry), wal.append(entry))
+        build(zoo, animals)
+        wal.wait()
+        lsn = wal.last_lsn
+        start = time.perf_counter()
+        size = save_snapshot(zoo, snapshot_path, lsn)
+        save_seconds = time.perf_counter() - start
+        wal.truncate(lsn)
+        change(zoo, changes)
+        full_wal.close()
+        wal.close()
+        log_size = os.path.getsize(full_path)
+        del zoo
+
+        def replay_all() -> Zoo:
+            restored = Zoo()
+            log = WriteAheadLog(full_path)
+            log.replay(restored)
+            log.close()
+            return restored
+
+        def load_and_replay_tail() -> Zoo:
+            restored = Zoo()
+            log = WriteAheadLog(log_path)
+            log.replay(restored, load_snapshot(restored, snapshot_path))
+            log.close()
+            return restored
+
+        replay_seconds, replayed = timed(replay_all)
+        del replayed
+        snapshot_seconds, restored = timed(load_and_replay_tail)
+        assert len(restored.animals) == animals
+
+    print(f'{animals} animals, {changes} changes after the snapshot')
+    print(f'saving the snapshot:  {save_seconds:6.2f} s, {size / 2 ** 20:7.1f} MiB')
+    print(f'replaying whole log:  {replay_seconds:6.2f} s, {log_size / 2 ** 20:7.1f} MiB')
+    print(f'snapshot + log tail:  {snapshot_seconds:6.2f} s, {replay_seconds / snapshot_seconds:4.1f}x')
+
+
+if __name__ == '__main__':
+    main()
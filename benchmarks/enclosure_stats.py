@@ -0,0 +1,72 @@
+"""Compare the maintained enclosure statistics with the previous full
+recomputation on every request.
+
+Run from the repository root with:
+
+    python -m benchmarks.enclosure_stats [enclosures] [animals per enclosure]
+"""
+import sys
+import timeit
+
+from zoo import Zoo
+from zoo_objects import Animal, Enclosure
+
+SPECIES = ['Panthera tigris', 'Testudinata', 'Pan troglodytes', 'Ursus arctos']
+
+
+def full_recomputation(zoo: Zoo) -> dict:
+    """The previous implementation of Zoo.get_enclosure_stats, which
+    walks through all enclosures three times and builds a sorted set of
+    species for every enclosure."""
+    animals_in_enclosures = [len(enclosure.get_animals())
+                             for enclosure in zoo.enclosures]
+
+    enclosures_with_multiple_species = {}
+    for enclosure in zoo.enclosures:
+        animal_species_names = sorted({animal.species_name for animal in enclosure.get_animals()})
+        if len(animal_species_names) > 1:
+            enclosures_with_multiple_species[enclosure.id] = animal_species_names
+
+    available_space_per_animal_per_enclosure = {}
+    for enclosure in zoo.enclosures:
+        animals = len(enclosure.get_animals())
+        if animals == 0:
+            available_space_per_animal_per_enclosure[enclosure.id] = enclosure.area
+        else:
+            available_space_per_animal_per_enclosure[enclosure.id] = enclosure.area / animals
+
+    return {
+        'average_animals_per_enclosure': 0 if not animals_in_enclosures else sum(animals_in_enclosures) / len(animals_in_enclosures),
+        'enclosures_with_multiple_species': enclosures_with_multiple_species,
+        'available_space_per_animal_per_enclosure': available_space_per_animal_per_enclosure
+    }
+
+
+def main() -> None:
+    enclosures = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    animals_per_enclosure = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    zoo = Zoo()
+    for i in range(enclosures):
+        enclosure = Enclosure(f'Enclosure{i}', 100)
+        zoo.add_enclosure(enclosure)
+        for j in range(animals_per_enclosure):
+            # every third enclosure houses a single species only
+            species_name = SPECIES[0] if i % 3 == 0 else SPECIES[j % len(SPECIES)]
+            animal = Animal(species_name, 'Animal', 1)
+            zoo.add_animal(animal)
+            animal.set_home(enclosure)
+
+    assert zoo.get_enclosure_stats() == full_recomputation(zoo)
+
+    runs = 20
+    maintained = timeit.timeit(zoo.get_enclosure_stats, number=runs) / runs
+    recomputed = timeit.timeit(lambda: full_recomputation(zoo), number=runs) / runs
+    print(f'{enclosures} enclosures, {animals_per_enclosure} animals each')
+    print(f'maintained:         {maintained * 1000:8.2f} ms per call')
+    print(f'full recomputation: {recomputed * 1000:8.2f} ms per call')
+    print(f'speedup:            {recomputed / maintained:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Compare the throughput of GET /animals with the previous JSON
+encoder, the type-dispatch encoder and the orjson backend, with and
+without the cached JSON of every object.
+
+Run from the repository root with:
+
+    python -m benchmarks.json_encoding [animals] [records per animal]
+"""
+import sys
+import json
+import time
+from datetime import date
+from json import JSONEncoder
+
+import api
+from api_json_utils import CustomJSONProvider, orjson
+from zoo_objects import Animal, Caretaker, Enclosure
+
+
+class LegacyJsonEncoder(JSONEncoder):
+    """The previous encoder, which runs through isinstance checks and
+    tries iter() for every object it does not know."""
+
+    def default(self, obj):
+        try:
+            if isinstance(obj, date):
+                return obj.isoformat()
+            elif isinstance(obj, (Animal, Caretaker, Enclosure)):
+                return obj.to_json()
+            iterable = iter(obj)
+        except TypeError:
+            pass
+        else:
+            return list(iterable)
+        return obj.__dict__
+
+
+class LegacyJSONProvider(CustomJSONProvider):
+    def dumps(self, obj, **kwargs):
+        return json.dumps(obj, **kwargs, cls=LegacyJsonEncoder)
+
+    def dumps_zoo_object(self, obj):
+        return self.dumps(obj)
+
+
+class UncachedJSONProvider(CustomJSONProvider):
+    """Encode every object again instead of using its cached JSON."""
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps(obj, **kwargs)
+
+    def dumps_zoo_object(self, obj):
+        return self._dumps(obj)
+
+
+class StdlibJSONProvider(UncachedJSONProvider):
+    use_orjson = False
+
+
+def measure(provider: CustomJSONProvider, runs: int,
+            changed: list[Animal]) -> tuple[float, int]:
+    """Return the average seconds per request and the response size.
+
+    The changed animals get fed before every request (not measured)."""
+    api.app.json = provider
+    for animal in api.my_zoo.get_all_animals():
+        animal._json = None
+    client = api.app.test_client()
+    size = len(client.get('/animals').data)
+
+    seconds = 0.0
+    for _ in range(runs):
+        for animal in changed:
+            animal.feed()
+        start = time.perf_counter()
+        client.get('/animals').get_data()
+        seconds += time.perf_counter() - start
+    return seconds / runs, size
+
+
+def main() -> None:
+    animals = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    records = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    enclosure = Enclosure('Cave1', 125)
+    caretaker = Caretaker('Laetitia', 'Blond-Street 19')
+    api.my_zoo.add_enclosure(enclosure)
+    api.my_zoo.add_caretaker(caretaker)
+    for _ in range(animals):
+        animal = Animal('Panthera tigris', 'Tiger', 12)
+        api.my_zoo.add_animal(animal)
+        animal.set_home(enclosure)
+        animal.set_caretaker(caretaker)
+        for _ in range(records):
+            animal.feed()
+            animal.vet()
+
+    all_animals = list(api.my_zoo.get_all_animals())
+    one_percent = all_animals[::100]
+    providers = {
+        'previous encoder': (LegacyJSONProvider(api.app), []),
+        'type dispatch': (StdlibJSONProvider(api.app), []),
+        'cached, 1% changed': (CustomJSONProvider(api.app), one_percent),
+    }
+    if orjson is not None:
+        providers['orjson'] = (UncachedJSONProvider(api.app), [])
+        providers['orjson, 1% changed'] = (CustomJSONProvider(api.app), one_percent)
+        providers['orjson, unchanged'] = (CustomJSONProvider(api.app), [])
+    providers['cached, 1% changed'][0].use_orjson = False
+
+    print(f'GET /animals with {animals} animals, {records} feeding and medical records each')
+    baseline = None
+    for name, (provider, changed) in providers.items():
+        seconds, size = measure(provider, 5, changed)
+        baseline = baseline or seconds
+        print(f'{name:19} {seconds * 1000:8.1f} ms per request, '
+              f'{size / seconds / 1e6:6.1f} MB/s, {baseline / seconds:4.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Measure the memory used per Animal, Caretaker and Enclosure object.
+
+Run from the repository root with:
+
+    python -m benchmarks.memory_per_object [count]
+"""
+import sys
+import tracemalloc
+
+from zoo_objects import Animal, Caretaker, Enclosure
+
+
+def measure(factory, count: int) -> float:
+    """Return the average number of bytes allocated per created
+    object, including its ID string and collections."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # do not count the list that keeps the objects alive
+    list_size = sys.getsizeof(objects)
+    return (after - before - list_size) / count
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    factories = {
+        'Animal': lambda: Animal('Panthera tigris', 'Tiger', 12),
+        'Caretaker': lambda: Caretaker('Laetitia', 'Blond-Street 19'),
+        'Enclosure': lambda: Enclosure('Cave1', 125),
+    }
+    for name, factory in factories.items():
+        print(f'{name}: {measure(factory, count):.0f} bytes per object')
+
+
+if __name__ == '__main__':
+    main()
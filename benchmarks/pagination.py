@@ -0,0 +1,49 @@
+"""Compare returning a page of animals via the sequence numbers of the
+EntitySet with skipping an offset, at the start, middle and end of the
+zoo.
+
+Run from the repository root with:
+
+    python -m benchmarks.pagination [animals] [page size]
+"""
+import sys
+import time
+from itertools import islice
+
+from zoo import Zoo
+from zoo_objects import Animal
+
+
+def offset_page(animals, offset: int, limit: int) -> list:
+    """Page via an offset, which has to skip all objects before it."""
+    return list(islice(animals, offset, offset + limit))
+
+
+def measure(function, runs: int = 20) -> float:
+    """Return the average milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        function()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    zoo = Zoo()
+    for _ in range(count):
+        zoo.add_animal(Animal('Panthera tigris', 'Tiger', 12))
+    animals = zoo.get_all_animals()
+
+    print(f'pages of {limit} out of {count} animals')
+    for position in (0, count // 2, count - limit):
+        # the sequence number of the object before the page
+        after = animals.page(0, position)[1] if position else 0
+        offset = measure(lambda: offset_page(animals, position, limit))
+        cursor = measure(lambda: animals.page(after, limit))
+        print(f'at {position:8}: offset {offset:8.3f} ms, cursor {cursor:6.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
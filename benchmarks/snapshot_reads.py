@@ -0,0 +1,70 @@
+"""Compare the latency of changes and the throughput of GET /animals
+while several threads read the whole list, once with the reader/writer
+lock and once in single writer mode with reads served from snapshots.
+
+Run from the repository root with:
+
+    python -m benchmarks.snapshot_reads [animals] [reader threads]
+"""
+import sys
+import time
+import threading
+from statistics import quantiles
+
+import api
+from zoo import Zoo
+from zoo_concurrency import SingleWriter
+from zoo_objects import Animal
+
+
+def run(readers: int, seconds: float = 3.0) -> tuple[list[float], int]:
+    """Feed an animal over and over again while the readers fetch all
+    animals. Return the latency of every change and the number of
+    finished reads."""
+    client = api.app.test_client()
+    animal_id = next(iter(api.my_zoo.get_all_animals())).id
+    stop = time.perf_counter() + seconds
+    reads = []
+
+    def read():
+        count = 0
+        while time.perf_counter() < stop:
+            client.get('/animals').get_data()
+            count += 1
+        reads.append(count)
+
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    latencies = []
+    while time.perf_counter() < stop:
+        start = time.perf_counter()
+        client.post(f'/animal/{animal_id}/feed')
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+    return latencies, sum(reads)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    api.my_zoo = Zoo()
+    api.my_zoo.add_animals(Animal('Panthera tigris', 'Tiger', age % 30) for age in range(count))
+
+    print(f'{count} animals, {readers} reader threads')
+    for name in ('lock', 'snapshots'):
+        if name == 'snapshots':
+            api.writer = SingleWriter(api.my_zoo, api.app.json.dumps_zoo_object, 0.1)
+        latencies, reads = run(readers)
+        p50, p99 = (quantiles(latencies, n=100)[index] * 1000 for index in (49, 98))
+        print(f'{name:9}: change p50 {p50:6.2f} ms, p99 {p99:7.2f} ms, '
+              f'{reads / 3:6.1f} reads/s')
+        if api.writer is not None:
+            api.writer.stop()
+            api.writer = None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Compare the peak memory and the time to the first byte of GET /animals
+when the whole JSON document gets built with jsonify and when it gets
+streamed in chunks.
+
+Run from the repository root with:
+
+    python -m benchmarks.streaming [animals ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from flask import jsonify
+
+import api
+from zoo_objects import Animal, Caretaker, Enclosure
+
+
+def build_response():
+    """The previous way: build the whole document before sending it."""
+    with api.app.test_request_context('/animals'):
+        return [jsonify(api.my_zoo.get_all_animals()).get_data()]
+
+
+def stream_response():
+    """Stream the response and throw away every chunk once it is sent."""
+    return api.app.test_client().get('/animals').response
+
+
+def measure(get_response) -> tuple[float, float]:
+    """Return the time to the first chunk in seconds and the peak memory
+    used while sending the response in MB."""
+    start = time.perf_counter()
+    first_byte = None
+    for _ in get_response():
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for _ in get_response():
+        pass
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return first_byte, peak / 1e6
+
+
+def fill_zoo(animals: int) -> None:
+    enclosure = Enclosure('Cave1', 125)
+    caretaker = Caretaker('Laetitia', 'Blond-Street 19')
+    api.my_zoo.add_enclosure(enclosure)
+    api.my_zoo.add_caretaker(caretaker)
+    for _ in range(animals - len(api.my_zoo.get_all_animals())):
+        animal = Animal('Panthera tigris', 'Tiger', 12)
+        api.my_zoo.add_animal(animal)
+        animal.set_home(enclosure)
+        animal.set_caretaker(caretaker)
+        for _ in range(3):
+            animal.feed()
+            animal.vet()
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 100_000]
+    print(f'{"animals":>8} {"":9} {"first byte":>11} {"peak memory":>12}')
+    for animals in sizes:
+        fill_zoo(animals)
+        # fill the JSON cache of the objects, it is shared by both ways
+        for _ in stream_response():
+            pass
+        for name, get_response in (('jsonify', build_response),
+                                   ('streaming', stream_response)):
+            first_byte, peak = measure(get_response)
+            print(f'{animals:8} {name:9} {first_byte * 1000:8.1f} ms '
+                  f'{peak:9.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Compare the number of changes per second that are on disk before they
+get answered, when every change calls fsync itself and when the write
+ahead log syncs all waiting changes together (group commit).
+
+Run from the repository root with:
+
+    python -m benchmarks.wal_throughput [threads] [changes per thread]
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import datetime
+
+from zoo_persistence import WriteAheadLog, encode_value
+
+
+class SyncEveryEntry:
+    """The simple way: write and sync every entry on its own."""
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'ab')
+        self._lock = threading.Lock()
+
+    def append(self, entry: tuple) -> None:
+        line = json.dumps(entry, default=encode_value, separators=(',', ':')).encode() + b'\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def wait(self) -> None:
+        pass
+
+
+def measure(log, threads: int, changes: int) -> float:
+    """Return the changes per second that threads appending and waiting
+    for their entries reach."""
+    def work():
+        for _ in range(changes):
+            log.append(('record', 'feeding', 'an889d3a', datetime.datetime.now()))
+            log.wait()
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * changes / (time.perf_counter() - start)
+
+
+def main() -> None:
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory(dir='.') as directory:
+        single = measure(SyncEveryEntry(os.path.join(directory, 'single.wal')), threads, changes)
+        wal = WriteAheadLog(os.path.join(directory, 'group.wal'))
+        group = measure(wal, threads, changes)
+        wal.close()
+
+    print(f'{threads} threads, {changes} changes each')
+    print(f'fsync per change: {single:9.0f} changes/s')
+    print(f'group commit:     {group:9.0f} changes/s, {threads * changes / wal.commits:5.1f} changes per fsync, '
+          f'{group / single:4.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -88,6 +88,13 @@ class TestAnimal:
         animal1.unset_caretaker()
         assert animal1.caretaker is None
 
+    def test_animal_uses_slots(self, animal1: Animal):
+        """Test that an animal does not carry a __dict__ and does not
+        accept unknown attributes."""
+        assert not hasattr(animal1, '__dict__')
+        with pytest.raises(AttributeError):
+            animal1.unknown_attribute = 1
+
     def test_feed_animal_once(self, animal1: Animal):
         """Test feeding an animal once."""
         animal1.feed()
@@ -186,3 +193,20 @@ class TestAnimal:
             "feeding_record": [animal1.feeding_record[0]],
             "medical_record": [animal1.medical_record[0]],
         }
+
+    def test_to_summary_json(self, animal1: Animal):
+        """Test converting the animal data to json like format with only
+        a summary of the feeding and medical records."""
+        animal1.feed()
+        animal1.feed()
+
+        assert animal1.to_summary_json() == {
+            "id": animal1.id,
+            "species_name": animal1.species_name,
+            "common_name": animal1.common_name,
+            "age": animal1.age,
+            "enclosure": None,
+            "caretaker": None,
+            "feeding_record": {"count": 2, "last": animal1.feeding_record[1]},
+            "medical_record": {"count": 0, "last": None},
+        }
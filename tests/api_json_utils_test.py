@@ -0,0 +1,141 @@
+import json
+import pytest
+
+from api import app
+from api_json_utils import CustomJSONProvider, ZooJsonEncoder
+from zoo_objects import Animal, Caretaker, Enclosure
+
+
+class SlottedPoint:
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x: int, y: int) -> None:
+        self.x = x
+        self.y = y
+
+
+class TestZooJsonEncoder:
+    def test_encode_animal(self, animal1: Animal):
+        """Test encoding a slotted zoo object via its to_json method."""
+        data = json.loads(json.dumps(animal1, cls=ZooJsonEncoder))
+        assert data['id'] == animal1.id
+        assert data['species_name'] == animal1.species_name
+
+    def test_encode_slotted_object(self):
+        """Test encoding an unknown object that uses __slots__ instead 
+        of a __dict__."""
+        data = json.loads(json.dumps(SlottedPoint(1, 2), cls=ZooJsonEncoder))
+        assert data == {'x': 1, 'y': 2}
+
+    def test_encode_records(self, animal1: Animal):
+        """Test that feeding and medical records get encoded as ISO 8601
+        strings."""
+        animal1.feed()
+        animal1.vet()
+        data = json.loads(json.dumps(animal1, cls=ZooJsonEncoder))
+        assert data['feeding_record'] == animal1.feeding_record.isoformat()
+        assert data['medical_record'] == animal1.medical_record.isoformat()
+
+
+class TestCustomJSONProvider:
+    def dumps_both(self, obj) -> tuple[str, str]:
+        """Encode an object with the standard library and orjson."""
+        pytest.importorskip('orjson')
+        stdlib_provider = CustomJSONProvider(app)
+        stdlib_provider.use_orjson = False
+        orjson_provider = CustomJSONProvider(app)
+        orjson_provider.use_orjson = True
+        return stdlib_provider.dumps(obj), orjson_provider.dumps(obj)
+
+    def test_same_output(self, animal1: Animal, caretaker1: Caretaker, enclosure1: Enclosure):
+        """Test that both backends produce the same JSON for the zoo
+        objects."""
+        animal1.feed()
+        animal1.feed()
+        animal1.vet()
+        animal1.set_home(enclosure1)
+        animal1.set_caretaker(caretaker1)
+        enclosure1.clean()
+        objects = [animal1, caretaker1, enclosure1]
+        stdlib_json, orjson_json = self.dumps_both(objects)
+        assert json.loads(stdlib_json) == json.loads(orjson_json)
+
+    def test_same_output_slotted_object(self):
+        """Test that both backends fall back to the slots of unknown
+        objects."""
+        stdlib_json, orjson_json = self.dumps_both({'point': SlottedPoint(1, 2)})
+        assert json.loads(stdlib_json) == json.loads(orjson_json)
+
+    def test_same_output_big_integer(self, animal1: Animal):
+        """Encode an integer that does not fit into 64 bit, which only
+        the standard library supports."""
+        animal1.age = 10 ** 20
+        stdlib_json, orjson_json = self.dumps_both([animal1, {'age': 2 ** 64}])
+        assert json.loads(stdlib_json) == json.loads(orjson_json)
+        assert json.loads(orjson_json)[0]['age'] == 10 ** 20
+
+    def test_loads_big_integer(self):
+        """Test that integers that do not fit into 64 bit are parsed as
+        the exact integer, not as a float like orjson does."""
+        pytest.importorskip('orjson')
+        provider = CustomJSONProvider(app)
+        provider.use_orjson = True
+        for number in (2 ** 64, 2 ** 70 + 1, -2 ** 63 - 1, 2 ** 63 - 1):
+            data = f'{{"age": {number}, "ages": [1, {number}]}}'
+            assert provider.loads(data) == {'age': number, 'ages': [1, number]}
+            assert provider.loads(data.encode()) == {'age': number, 'ages': [1, number]}
+
+    def test_keyword_arguments(self, animal1: Animal):
+        """Test that keyword arguments of json.dumps still work."""
+        data = CustomJSONProvider(app).dumps(animal1, indent=2)
+        assert '\n  "id"' in data
+
+    def test_cache_json(self, animal1: Animal):
+        """Test that the JSON of an object gets cached."""
+        provider = CustomJSONProvider(app)
+        data = provider.dumps(animal1)
+        assert animal1._json == data
+        assert provider.dumps(animal1) is data
+
+    def test_cache_invalidated(self, animal1: Animal, caretaker1: Caretaker, enclosure1: Enclosure):
+        """Test that every change drops the cached JSON of the changed 
+        objects."""
+        provider = CustomJSONProvider(app)
+        changes = [animal1.feed, animal1.vet,
+                   lambda: animal1.set_home(enclosure1),
+                   lambda: animal1.set_caretaker(caretaker1),
+                   animal1.unset_home, animal1.unset_caretaker]
+        for change in changes:
+            provider.dumps([animal1, caretaker1, enclosure1])
+            change()
+            assert animal1._json is None
+            assert json.loads(provider.dumps(animal1)) == json.loads(json.dumps(animal1, cls=ZooJsonEncoder))
+
+        provider.dumps(enclosure1)
+        enclosure1.clean()
+        assert enclosure1._json is None
+        assert len(json.loads(provider.dumps(enclosure1))['cleaning_record']) == 1
+
+    def test_cache_invalidated_related_objects(self, animal1: Animal, caretaker1: Caretaker, enclosure1: Enclosure):
+        """Test that the cached JSON of enclosures and caretakers gets 
+        dropped when animals are added or removed."""
+        provider = CustomJSONProvider(app)
+        provider.dumps([caretaker1, enclosure1])
+        animal1.set_home(enclosure1)
+        animal1.set_caretaker(caretaker1)
+        assert json.loads(provider.dumps(enclosure1))['animals'] == [animal1.id]
+        assert json.loads(provider.dumps(caretaker1))['animals'] == [animal1.id]
+
+        animal1.unset_home()
+        animal1.unset_caretaker()
+        assert json.loads(provider.dumps(enclosure1))['animals'] == []
+        assert json.loads(provider.dumps(caretaker1))['animals'] == []
+
+    def test_dumps_list(self, animal1: Animal, animal2: Animal):
+        """Test that lists of objects are put together correctly from 
+        the cached JSON."""
+        provider = CustomJSONProvider(app)
+        provider.dumps(animal1)
+        assert json.loads(provider.dumps([animal1, animal2])) == \
+            json.loads(json.dumps([animal1, animal2], cls=ZooJsonEncoder))
+        assert provider.dumps([]) == '[]'
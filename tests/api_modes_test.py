@@ -0,0 +1,149 @@
+import json
+import pytest
+import threading
+
+import api
+
+# NOTE Unlike api_test.py these tests do not need a running server, they
+# use the test client of the app with the zoo replaced for every test.
+
+
+class TestSingleWriterMode:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(api, 'my_zoo', api.Zoo())
+        writer = api.SingleWriter(api.my_zoo, api.app.json.dumps_zoo_object, 0)
+        monkeypatch.setattr(api, 'writer', writer)
+        yield api.app.test_client()
+        writer.stop()
+
+    def test_changes_in_writer_thread(self, client, monkeypatch):
+        """Test that changes are applied by the writer thread."""
+        threads = []
+        monkeypatch.setattr(api.my_zoo, 'add_animal', lambda animal: threads.append(threading.current_thread()))
+        client.post('/animal', data={'species_name': 'Panthera tigris', 'common_name': 'Tiger', 'age': 12})
+        assert threads == [api.writer._thread]
+
+    def test_reads_from_snapshot(self, client):
+        """Test that lists and objects are answered from the snapshot
+        and everything else as usual."""
+        animal = client.post('/animal', data={'species_name': 'Panthera tigris',
+                                              'common_name': 'Tiger', 'age': 12}).get_json()
+        enclosure = client.post('/enclosure', data={'name': 'Cave1', 'area': 125}).get_json()
+        client.post(f'/animal/{animal["id"]}/home', data={'enclosure_id': enclosure['id']})
+
+        r = client.get('/animals')
+        assert r.headers['X-Snapshot-Version'] == str(api.my_zoo.version)
+        assert [a['enclosure'] for a in r.get_json()] == [enclosure['id']]
+        r = client.get('/animals?format=ndjson')
+        assert json.loads(r.get_data(as_text=True).splitlines()[0])['id'] == animal['id']
+        r = client.get(f'/enclosure/{enclosure["id"]}')
+        assert r.get_json()['animals'] == [animal['id']]
+        assert client.get('/caretaker/unknown').get_json() is None
+
+        # pages and other views of the animals are read from the zoo
+        r = client.get('/animals?limit=1')
+        assert 'X-Snapshot-Version' not in r.headers
+        assert r.get_json()[0]['id'] == animal['id']
+        r = client.get(f'/animal/{animal["id"]}?fields=age')
+        assert 'X-Snapshot-Version' not in r.headers
+        assert r.get_json() == {'age': 12}
+
+    def test_snapshot_etag(self, client):
+        """Test that snapshot responses are answered with 304 until the
+        next snapshot."""
+        etag = client.get('/enclosures').headers['ETag']
+        assert client.get('/enclosures', headers={'If-None-Match': etag}).status_code == 304
+        client.post('/enclosure', data={'name': 'Cave1', 'area': 125})
+        assert client.get('/enclosures', headers={'If-None-Match': etag}).status_code == 200
+
+
+class TestWriteAheadLog:
+    @pytest.fixture
+    def path(self, tmp_path, monkeypatch):
+        """Serve a new zoo whose changes get logged to a file in tmp_path,
+        with snapshots next to it, and return the path of the log."""
+        path = str(tmp_path / 'zoo.wal')
+        monkeypatch.setattr(api, 'my_zoo', api.Zoo())
+        monkeypatch.setattr(api, 'writer', None)
+        wal = api.WriteAheadLog(path)
+        api.my_zoo.journal = wal.append
+        monkeypatch.setattr(api, 'wal', wal)
+        monkeypatch.setattr(api, 'snapshot_path', path + '.snapshot')
+        monkeypatch.setattr(api, 'snapshot_lsn', 0)
+        monkeypatch.setattr(api, 'background_save', api.BackgroundSave(path + '.snapshot', api.snapshot_saved))
+        yield path
+        wal.close()
+
+    @pytest.fixture
+    def client(self, path):
+        return api.app.test_client()
+
+    def test_changes_are_logged(self, path, client):
+        """Test that changes are on disk once they are answered and that
+        replaying the log restores the zoo."""
+        animal = client.post('/animal', data={'species_name': 'Panthera tigris',
+                                              'common_name': 'Tiger', 'age': 12}).get_json()
+        with open(path) as file:
+            assert json.loads(file.readlines()[-1])[0] == 'add_animal'
+        client.post(f'/animal/{animal["id"]}/feed')
+        client.post('/enclosures', json=[{'name': 'Cave1', 'area': 125}])
+        api.wal.close()
+
+        zoo = api.Zoo()
+        wal = api.WriteAheadLog(path)
+        wal.replay(zoo)
+        wal.close()
+        assert client.get(f'/animal/{animal["id"]}').get_json() == api.app.json.loads(
+            api.app.json.dumps(zoo.get_animal(animal['id'])))
+        assert len(zoo.get_all_enclosures()) == 1
+
+    def test_save_snapshot(self, path, client):
+        """Test that saving a snapshot truncates the log and that the
+        snapshot plus the rest of the log restore the zoo."""
+        animal = client.post('/animal', data={'species_name': 'Panthera tigris',
+                                              'common_name': 'Tiger', 'age': 12}).get_json()
+        assert api.save_zoo_snapshot() > 0
+        assert api.save_zoo_snapshot() is None
+        with open(path) as file:
+            assert len(file.readlines()) == 1
+        client.post(f'/animal/{animal["id"]}/feed')
+        api.wal.close()
+
+        zoo = api.Zoo()
+        wal = api.WriteAheadLog(path)
+        assert wal.replay(zoo, api.load_snapshot(zoo, path + '.snapshot')) == 1
+        wal.close()
+        assert client.get(f'/animal/{animal["id"]}').get_json() == api.app.json.loads(
+            api.app.json.dumps(zoo.get_animal(animal['id'])))
+
+    def test_background_save(self, path, client):
+        """Test that a background save can be started and followed via
+        the API and truncates the log once it has finished."""
+        assert client.get('/admin/snapshot').get_json() == 'No background save has been started yet'
+        animal = client.post('/animal', data={'species_name': 'Panthera tigris',
+                                              'common_name': 'Tiger', 'age': 12}).get_json()
+        status = client.post('/admin/snapshot').get_json()
+        assert status['in_progress'] is True
+        assert status['lsn'] == 1
+        assert client.post('/admin/snapshot').get_json() == 'A background save is already in progress'
+
+        api.background_save.wait(10)
+        status = client.get('/admin/snapshot').get_json()
+        assert status['status'] == 'ok'
+        assert status['bytes_written'] > 0
+        assert api.snapshot_lsn == 1
+        with open(path) as file:
+            assert len(file.readlines()) == 1
+        api.wal.close()
+
+        zoo = api.Zoo()
+        api.load_snapshot(zoo, path + '.snapshot')
+        assert zoo.get_animal(animal['id']) is not None
+
+    def test_snapshot_without_log(self, monkeypatch):
+        """Test that snapshots are refused without a log."""
+        monkeypatch.setattr(api, 'background_save', None)
+        client = api.app.test_client()
+        assert client.post('/admin/snapshot').get_json() == 'Snapshots need a write-ahead log, set ZOO_WAL_PATH'
+        assert client.get('/admin/snapshot').get_json() == 'Snapshots need a write-ahead log, set ZOO_WAL_PATH'
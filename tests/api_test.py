@@ -2,6 +2,140 @@ import json
 import pytest
 import datetime
 import requests
+from concurrent.futures import ThreadPoolExecutor
+
+import api
+from zoo_objects import Animal
+
+
+class TestStreaming:
+    def test_stream_multiple_chunks(self, monkeypatch):
+        """Test that a list streamed in many small chunks is still valid 
+        JSON and NDJSON."""
+        monkeypatch.setattr(api, 'STREAM_CHUNK_SIZE', 10)
+        monkeypatch.setattr(api, 'my_zoo', api.Zoo())
+        monkeypatch.setattr(api, 'writer', None)
+        animals = [Animal('Panthera tigris', 'Tiger', age) for age in range(5)]
+        for animal in animals:
+            api.my_zoo.add_animal(animal)
+        client = api.app.test_client()
+
+        chunks = list(client.get('/animals').response)
+        assert len(chunks) > 1
+        assert [animal['age'] for animal in json.loads(b''.join(chunks))] == list(range(5))
+
+        r = client.get('/animals?format=ndjson')
+        lines = r.get_data(as_text=True).splitlines()
+        assert [json.loads(line)['age'] for line in lines] == list(range(5))
+
+    def test_stream_single_state(self, monkeypatch):
+        """Test that a list longer than a page shows the zoo as it was
+        when the request was handled, even if the zoo changes while it
+        gets sent."""
+        monkeypatch.setattr(api, 'STREAM_PAGE_SIZE', 2)
+        monkeypatch.setattr(api, 'my_zoo', api.Zoo())
+        monkeypatch.setattr(api, 'writer', None)
+        animals = [Animal('Panthera tigris', 'Tiger', age) for age in range(5)]
+        for animal in animals:
+            api.my_zoo.add_animal(animal)
+        client = api.app.test_client()
+
+        r = client.get('/animals')
+        api.my_zoo.remove_animal(animals[4])
+        assert [animal['age'] for animal in json.loads(b''.join(r.response))] == list(range(5))
+
+
+class TestConditionalRequests:
+    def test_not_modified(self, base_url, post_animal1, post_animal2):
+        """Test that an unchanged list of animals is answered with 304
+        and a changed one with the new list."""
+        r = requests.get(base_url + '/animals')
+        etag = r.headers['ETag']
+        r = requests.get(base_url + '/animals', headers={'If-None-Match': etag})
+        assert r.status_code == 304
+        assert r.content == b''
+        assert r.headers['ETag'] == etag
+
+        requests.post(base_url + f'/animal/{post_animal1["id"]}/feed')
+        r = requests.get(base_url + '/animals', headers={'If-None-Match': etag})
+        assert r.status_code == 200
+        assert len(json.loads(r.content)[0]['feeding_record']) == 1
+        assert r.headers['ETag'] != etag
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+        requests.delete(base_url + f'/animal/{post_animal2["id"]}')
+
+    def test_object_etag(self, base_url, post_animal1, post_animal2):
+        """Test that the ETag of an animal only changes when the animal
+        itself changes."""
+        etag = requests.get(base_url + f'/animal/{post_animal1["id"]}').headers['ETag']
+
+        requests.post(base_url + f'/animal/{post_animal2["id"]}/feed')
+        r = requests.get(base_url + f'/animal/{post_animal1["id"]}',
+                         headers={'If-None-Match': etag})
+        assert r.status_code == 304
+
+        requests.post(base_url + f'/animal/{post_animal1["id"]}/vet')
+        r = requests.get(base_url + f'/animal/{post_animal1["id"]}',
+                         headers={'If-None-Match': etag})
+        assert r.status_code == 200
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+        requests.delete(base_url + f'/animal/{post_animal2["id"]}')
+
+    def test_etag_depends_on_parameters(self, base_url):
+        """Test that different representations have different ETags."""
+        etag = requests.get(base_url + '/animals').headers['ETag']
+        r = requests.get(base_url + '/animals', params={'format': 'ndjson'},
+                         headers={'If-None-Match': etag})
+        assert r.status_code == 200
+        assert r.headers['ETag'] != etag
+
+    def test_plan_etag(self, base_url, post_enclosure1):
+        """Test that plans are answered with 304 until the zoo 
+        changes."""
+        etag = requests.get(base_url + '/tasks/cleaning').headers['ETag']
+        r = requests.get(base_url + '/tasks/cleaning', headers={'If-None-Match': etag})
+        assert r.status_code == 304
+
+        requests.post(base_url + f'/enclosure/{post_enclosure1["id"]}/clean')
+        r = requests.get(base_url + '/tasks/cleaning', headers={'If-None-Match': etag})
+        assert r.status_code == 200
+
+        # cleanup
+        requests.delete(base_url + f'/enclosure/{post_enclosure1["id"]}')
+
+
+class TestConcurrentRequests:
+    def test_concurrent_moves(self, base_url, post_enclosure1, post_enclosure2):
+        """Test that moving animals between enclosures with many 
+        requests at once leaves every animal in exactly one 
+        enclosure."""
+        animals = requests.post(base_url + '/animals', json=[
+            {'species_name': 'Panthera tigris', 'common_name': 'Tiger', 'age': age}
+            for age in range(10)]).json()['results']
+        enclosure_ids = [post_enclosure1['id'], post_enclosure2['id']]
+
+        def move(idx: int):
+            animal_id = animals[idx % len(animals)]['id']
+            requests.post(base_url + f'/animal/{animal_id}/home',
+                          data={'enclosure_id': enclosure_ids[idx % 2]})
+            return requests.get(base_url + '/animals').status_code
+
+        with ThreadPoolExecutor(8) as executor:
+            assert set(executor.map(move, range(80))) == {200}
+
+        housed = [animal['id'] for enclosure_id in enclosure_ids
+                  for animal in requests.get(base_url + f'/enclosure/{enclosure_id}/animals').json()]
+        assert sorted(housed) == sorted(animal['id'] for animal in animals)
+
+        # cleanup
+        for animal in animals:
+            requests.delete(base_url + f'/animal/{animal["id"]}')
+        requests.delete(base_url + f'/enclosure/{post_enclosure1["id"]}')
+        requests.delete(base_url + f'/enclosure/{post_enclosure2["id"]}')
 
 
 class TestAnimalAPICalls:
@@ -72,6 +206,139 @@ class TestAnimalAPICalls:
         for animal_dict in animals:
             requests.delete(base_url + f'/animal/{animal_dict["id"]}')
 
+    def test_get_all_animals_ndjson(self, base_url, post_animal1, post_animal2):
+        """Test retrieving all animals of a zoo as one JSON object per 
+        line."""
+        r = requests.get(base_url + '/animals', params={'format': 'ndjson'})
+        assert r.headers['Content-Type'] == 'application/x-ndjson'
+        animals = [json.loads(line) for line in r.text.splitlines()]
+        assert [animal['id'] for animal in animals] == [post_animal1['id'], post_animal2['id']]
+
+        # the format can be requested via the Accept header as well
+        r = requests.get(base_url + '/animals',
+                         headers={'Accept': 'application/x-ndjson'})
+        assert [json.loads(line) for line in r.text.splitlines()] == animals
+
+        # cleanup
+        for animal_dict in animals:
+            requests.delete(base_url + f'/animal/{animal_dict["id"]}')
+        r = requests.get(base_url + '/animals', params={'format': 'ndjson'})
+        assert r.text == ''
+
+    def test_get_all_animals_unknown_format(self, base_url):
+        """Test retrieving all animals in a not supported format."""
+        r = requests.get(base_url + '/animals', params={'format': 'xml'})
+        assert r.status_code == 400
+
+    def test_get_all_animals_paginated(self, base_url, post_animal1, post_animal2, post_animal3):
+        """Test retrieving all animals page by page."""
+        r = requests.get(base_url + '/animals', params={'limit': 2})
+        assert [animal['id'] for animal in json.loads(r.content)] == [post_animal1['id'], post_animal2['id']]
+        cursor = r.headers['X-Next-Cursor']
+
+        # animals added or removed in between do not shift the pages
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+        r = requests.get(base_url + '/animals', params={'limit': 2, 'cursor': cursor})
+        assert [animal['id'] for animal in json.loads(r.content)] == [post_animal3['id']]
+        assert 'X-Next-Cursor' not in r.headers
+
+        # without a limit all remaining animals get returned
+        r = requests.get(base_url + '/animals', params={'cursor': cursor})
+        assert [animal['id'] for animal in json.loads(r.content)] == [post_animal3['id']]
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal2["id"]}')
+        requests.delete(base_url + f'/animal/{post_animal3["id"]}')
+
+    def test_get_all_animals_fields(self, base_url, post_animal1, post_animal2):
+        """Test retrieving only some fields of all animals."""
+        animals = json.loads(requests.get(
+            base_url + '/animals', params={'fields': 'id,age'}).content)
+        assert animals == [{'id': post_animal1['id'], 'age': post_animal1['age']},
+                           {'id': post_animal2['id'], 'age': post_animal2['age']}]
+
+        r = requests.get(base_url + '/animals', params={'fields': 'id,weight'})
+        assert r.status_code == 400
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+        requests.delete(base_url + f'/animal/{post_animal2["id"]}')
+
+    def test_get_all_animals_records_summary(self, base_url, post_animal1):
+        """Test retrieving all animals with only a summary of their 
+        records."""
+        requests.post(base_url + f'/animal/{post_animal1["id"]}/feed')
+        animal = json.loads(requests.post(base_url + f'/animal/{post_animal1["id"]}/feed').content)
+
+        animals = json.loads(requests.get(
+            base_url + '/animals', params={'records': 'summary'}).content)
+        assert animals[0]['feeding_record'] == {'count': 2, 'last': animal['feeding_record'][-1]}
+        assert animals[0]['medical_record'] == {'count': 0, 'last': None}
+
+        animals = json.loads(requests.get(
+            base_url + '/animals', params={'records': 'summary', 'fields': 'medical_record'}).content)
+        assert animals == [{'medical_record': {'count': 0, 'last': None}}]
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+
+    def test_get_all_animals_invalid_page(self, base_url):
+        """Test retrieving animals with an invalid limit or cursor."""
+        r = requests.get(base_url + '/animals', params={'limit': 0})
+        assert r.status_code == 400
+        r = requests.get(base_url + '/animals', params={'cursor': 'unknown'})
+        assert r.status_code == 400
+
+    def test_add_animals_bulk(self, base_url):
+        """Test adding many animals with a single JSON array, invalid 
+        animals get reported per item."""
+        items = [{'species_name': 'Panthera tigris', 'common_name': 'Tiger', 'age': 12},
+                 {'species_name': 'Testudinata', 'common_name': 'Turtle'},
+                 {'species_name': 'Testudinata', 'common_name': 'Turtle', 'age': -5},
+                 {'species_name': 'Testudinata', 'common_name': 'Turtle', 'age': 'old'},
+                 'Tiger',
+                 {'species_name': 'Pan troglodytes', 'common_name': 'Chimpanzee', 'age': '36'}]
+        result = requests.post(base_url + '/animals', json=items).json()
+        assert result['created'] == 2
+        assert result['failed'] == 4
+        assert 'id' in result['results'][0]
+        assert result['results'][1] == {'error': 'Missing required parameter age'}
+        assert result['results'][2] == {'error': 'An age of -5 is not possible'}
+        assert 'error' in result['results'][3]
+        assert 'error' in result['results'][4]
+
+        animals = json.loads(requests.get(base_url + '/animals').content)
+        assert [animal['id'] for animal in animals] == [result['results'][0]['id'], result['results'][5]['id']]
+        assert animals[1]['age'] == 36
+
+        # cleanup
+        for animal_dict in animals:
+            requests.delete(base_url + f'/animal/{animal_dict["id"]}')
+
+    def test_add_animals_bulk_ndjson(self, base_url):
+        """Test adding many animals with one JSON object per line."""
+        body = ('{"species_name": "Panthera tigris", "common_name": "Tiger", "age": 12}\n'
+                '{"species_name": "Testudinata", \n'
+                '\n'
+                '{"species_name": "Testudinata", "common_name": "Turtle", "age": 5}\n')
+        result = requests.post(base_url + '/animals', data=body,
+                               headers={'Content-Type': 'application/x-ndjson'}).json()
+        assert result['created'] == 2
+        assert result['failed'] == 1
+        assert 'error' in result['results'][1]
+
+        # cleanup
+        for item in result['results']:
+            if 'id' in item:
+                requests.delete(base_url + f'/animal/{item["id"]}')
+
+    def test_add_animals_bulk_invalid_body(self, base_url):
+        """Test adding many animals without a JSON array."""
+        r = requests.post(base_url + '/animals', json={'species_name': 'Panthera tigris'})
+        assert r.status_code == 400
+        r = requests.post(base_url + '/animals', data='[{')
+        assert r.status_code == 400
+
     def test_get_animal(self, base_url, post_animal1, post_animal2, post_animal3):
         """Test retrieving information about specific animals."""
         animals = json.loads(requests.get(base_url + '/animals').content)
@@ -91,6 +358,20 @@ class TestAnimalAPICalls:
         animals = json.loads(requests.get(base_url + '/animals').content)
         assert len(animals) == 0
 
+    def test_get_animal_fields(self, base_url, post_animal1):
+        """Test retrieving only some fields of a single animal."""
+        animal = json.loads(requests.get(
+            base_url + f'/animal/{post_animal1["id"]}',
+            params={'fields': 'species_name', 'records': 'summary'}).content)
+        assert animal == {'species_name': post_animal1['species_name']}
+
+        animal = json.loads(requests.get(
+            base_url + f'/animal/{post_animal1["id"]}', params={'records': 'summary'}).content)
+        assert animal['feeding_record'] == {'count': 0, 'last': None}
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+
     def test_get_animal_unknown_id(self, base_url, unknown_id):
         """Test retrieving information about an animal that does not 
         exist."""
@@ -239,6 +520,45 @@ class TestAnimalAPICalls:
         assert len(enclosures) == 0
         assert len(caretakers) == 0
 
+    def test_feed_animals(self, base_url, post_animal1, post_animal2, unknown_id):
+        """Test feeding many animals at once by their IDs."""
+        summary = requests.post(base_url + '/animals/feed', json={
+            'animal_ids': [post_animal1['id'], post_animal2['id'], unknown_id]}).json()
+        assert summary['count'] == 2
+        assert summary['not_found'] == [unknown_id]
+
+        # all animals share the same feeding date
+        for animal in (post_animal1, post_animal2):
+            animal_data = requests.get(base_url + f'/animal/{animal["id"]}').json()
+            assert animal_data['feeding_record'] == [summary['timestamp']]
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+        requests.delete(base_url + f'/animal/{post_animal2["id"]}')
+
+    def test_vet_animals_by_species(self, base_url, post_animal1, post_animal3, post_animal4):
+        """Test adding a medical record to all animals of a species."""
+        summary = requests.post(base_url + '/animals/vet', json={
+            'species_name': post_animal3['species_name']}).json()
+        assert summary['count'] == 2
+
+        animals = {animal['id']: animal for animal in json.loads(requests.get(base_url + '/animals').content)}
+        assert animals[post_animal1['id']]['medical_record'] == []
+        assert animals[post_animal3['id']]['medical_record'] == [summary['timestamp']]
+        assert animals[post_animal4['id']]['medical_record'] == [summary['timestamp']]
+
+        # cleanup
+        for animal_id in animals:
+            requests.delete(base_url + f'/animal/{animal_id}')
+
+    def test_feed_animals_invalid_selection(self, base_url):
+        """Test feeding many animals without selecting any or with 
+        invalid IDs."""
+        r = requests.post(base_url + '/animals/feed', json={})
+        assert json.loads(r.content) == 'No animals have been selected'
+        r = requests.post(base_url + '/animals/feed', json={'animal_ids': 'abc'})
+        assert r.status_code == 400
+
     def test_feed_animal(self, base_url, post_animal1):
         """Test feeding an animal and see if it gets added to the 
         animals' feeding record."""
@@ -696,6 +1016,22 @@ class TestAnimalAPICalls:
 
 
 class TestCaretakerAPICalls:
+    def test_assign_animals(self, base_url, post_caretaker1, post_animal1, post_animal3, post_animal4):
+        """Test assigning all animals of a species to a caretaker."""
+        summary = requests.post(base_url + f'/caretaker/{post_caretaker1["id"]}/animals', json={
+            'species_name': post_animal3['species_name']}).json()
+        assert summary == {'count': 2, 'not_found': []}
+        caretaker = requests.get(base_url + f'/caretaker/{post_caretaker1["id"]}').json()
+        assert caretaker['animals'] == [post_animal3['id'], post_animal4['id']]
+
+        r = requests.post(base_url + f'/caretaker/{post_caretaker1["id"]}/animals', json={})
+        assert json.loads(r.content) == 'No animals have been selected'
+
+        # cleanup
+        for animal in (post_animal1, post_animal3, post_animal4):
+            requests.delete(base_url + f'/animal/{animal["id"]}')
+        requests.delete(base_url + f'/caretaker/{post_caretaker1["id"]}')
+
     def test_add_caretaker(self, base_url, post_caretaker1):
         """Test adding a single caretaker to the zoo."""
         caretakers = json.loads(requests.get(base_url + '/caretakers').content)
@@ -742,6 +1078,31 @@ class TestCaretakerAPICalls:
         for caretaker_dict in caretakers:
             requests.delete(base_url + f'/caretaker/{caretaker_dict["id"]}')
 
+    def test_add_caretakers_bulk(self, base_url):
+        """Test adding many caretakers with a single JSON array."""
+        items = [{'name': 'Laetitia', 'address': 'Blond-Street 19'},
+                 {'name': 'Siena', 'address': 'Brown Rose Hall 2'}]
+        result = requests.post(base_url + '/caretakers', json=items).json()
+        assert result['created'] == 2
+
+        caretakers = json.loads(requests.get(base_url + '/caretakers').content)
+        assert [caretaker['name'] for caretaker in caretakers] == ['Laetitia', 'Siena']
+
+        # cleanup
+        for caretaker_dict in caretakers:
+            requests.delete(base_url + f'/caretaker/{caretaker_dict["id"]}')
+
+    def test_get_all_caretakers_ndjson(self, base_url, post_caretaker1, post_caretaker2):
+        """Test retrieving all caretakers of a zoo as one JSON object per
+        line."""
+        r = requests.get(base_url + '/caretakers', params={'format': 'ndjson'})
+        caretakers = [json.loads(line) for line in r.text.splitlines()]
+        assert [caretaker['id'] for caretaker in caretakers] == [post_caretaker1['id'], post_caretaker2['id']]
+
+        # cleanup
+        for caretaker_dict in caretakers:
+            requests.delete(base_url + f'/caretaker/{caretaker_dict["id"]}')
+
     def test_get_caretaker_info(self, base_url, post_caretaker1, post_caretaker2, post_caretaker3):
         """Test retrieving information about specific caretakers."""
         caretakers = json.loads(requests.get(base_url + '/caretakers').content)
@@ -1214,6 +1575,30 @@ class TestEnclosureAPICalls:
         for enclosure_dict in enclosures:
             requests.delete(base_url + f'/enclosure/{enclosure_dict["id"]}')
 
+    def test_add_enclosures_bulk(self, base_url):
+        """Test adding many enclosures with a single JSON array."""
+        items = [{'name': 'Cave1', 'area': 125}, {'name': 'Cave2', 'area': 0}]
+        result = requests.post(base_url + '/enclosures', json=items).json()
+        assert result['created'] == 1
+        assert result['results'][1] == {'error': 'An area of 0.0 is not possible'}
+
+        enclosures = json.loads(requests.get(base_url + '/enclosures').content)
+        assert enclosures[0]['area'] == 125
+
+        # cleanup
+        requests.delete(base_url + f'/enclosure/{result["results"][0]["id"]}')
+
+    def test_get_all_enclosures_ndjson(self, base_url, post_enclosure1, post_enclosure2):
+        """Test retrieving all enclosures of a zoo as one JSON object per
+        line."""
+        r = requests.get(base_url + '/enclosures', params={'format': 'ndjson'})
+        enclosures = [json.loads(line) for line in r.text.splitlines()]
+        assert [enclosure['id'] for enclosure in enclosures] == [post_enclosure1['id'], post_enclosure2['id']]
+
+        # cleanup
+        for enclosure_dict in enclosures:
+            requests.delete(base_url + f'/enclosure/{enclosure_dict["id"]}')
+
     def test_get_enclosure_info(self, base_url, post_enclosure1, post_enclosure2, post_enclosure3):
         """Test retrieving information about specific enclosures."""
         enclosures = json.loads(requests.get(base_url + '/enclosures').content)
@@ -1343,6 +1728,26 @@ class TestEnclosureAPICalls:
         assert len(enclosures) == 0
         assert len(animals) == 0
 
+    def test_clean_enclosures(self, base_url, post_enclosure1, post_enclosure2, post_animal1):
+        """Test cleaning many enclosures at once, by their IDs or by the 
+        species living in them."""
+        summary = requests.post(base_url + '/enclosures/clean', json={
+            'enclosure_ids': [post_enclosure1['id'], post_enclosure2['id']]}).json()
+        assert summary['count'] == 2
+
+        requests.post(base_url + f'/animal/{post_animal1["id"]}/home',
+                      data={'enclosure_id': post_enclosure2['id']})
+        summary = requests.post(base_url + '/enclosures/clean', json={
+            'species_name': post_animal1['species_name']}).json()
+        assert summary['count'] == 1
+        enclosure = requests.get(base_url + f'/enclosure/{post_enclosure2["id"]}').json()
+        assert len(enclosure['cleaning_record']) == 2
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+        requests.delete(base_url + f'/enclosure/{post_enclosure1["id"]}')
+        requests.delete(base_url + f'/enclosure/{post_enclosure2["id"]}')
+
     def test_clean_enclosure(self, base_url, post_enclosure1):
         """Test cleaning an enclosure and see if it gets added to the 
         enclosures' cleaning record."""
@@ -1459,6 +1864,68 @@ class TestEnclosureAPICalls:
         assert len(enclosures) == 0
         assert len(animals) == 0
 
+    def test_get_animals_paginated(self, base_url, post_enclosure1, post_animal1, post_animal2):
+        """Test retrieving the animals of an enclosure page by page."""
+        for animal in (post_animal1, post_animal2):
+            requests.post(base_url + f'/animal/{animal["id"]}/home',
+                          data={'enclosure_id': post_enclosure1['id']})
+
+        r = requests.get(base_url + f'/enclosure/{post_enclosure1["id"]}/animals',
+                         params={'limit': 1})
+        assert [animal['id'] for animal in json.loads(r.content)] == [post_animal1['id']]
+        r = requests.get(base_url + f'/enclosure/{post_enclosure1["id"]}/animals',
+                         params={'limit': 1, 'cursor': r.headers['X-Next-Cursor']})
+        assert [animal['id'] for animal in json.loads(r.content)] == [post_animal2['id']]
+        assert 'X-Next-Cursor' not in r.headers
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+        requests.delete(base_url + f'/animal/{post_animal2["id"]}')
+        requests.delete(base_url + f'/enclosure/{post_enclosure1["id"]}')
+
+    def test_get_animals_fields(self, base_url, post_enclosure1, post_animal1):
+        """Test retrieving only some fields of the animals of an 
+        enclosure."""
+        requests.post(base_url + f'/animal/{post_animal1["id"]}/home',
+                      data={'enclosure_id': post_enclosure1['id']})
+        animals = json.loads(requests.get(
+            base_url + f'/enclosure/{post_enclosure1["id"]}/animals',
+            params={'fields': 'id,enclosure'}).content)
+        assert animals == [{'id': post_animal1['id'], 'enclosure': post_enclosure1['id']}]
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+        requests.delete(base_url + f'/enclosure/{post_enclosure1["id"]}')
+
+    def test_move_animals(self, base_url, post_enclosure1, post_enclosure2, post_animal1, post_animal2, unknown_id):
+        """Test moving many animals to an enclosure at once."""
+        summary = requests.post(base_url + f'/enclosure/{post_enclosure1["id"]}/animals', json={
+            'animal_ids': [post_animal1['id'], post_animal2['id'], unknown_id]}).json()
+        assert summary == {'count': 2, 'not_found': [unknown_id]}
+
+        summary = requests.post(base_url + f'/enclosure/{post_enclosure2["id"]}/animals', json={
+            'enclosure_id': post_enclosure1['id']}).json()
+        assert summary == {'count': 2, 'not_found': []}
+        animals = json.loads(requests.get(base_url + f'/enclosure/{post_enclosure2["id"]}/animals').content)
+        assert [animal['id'] for animal in animals] == [post_animal1['id'], post_animal2['id']]
+        animals = json.loads(requests.get(base_url + f'/enclosure/{post_enclosure1["id"]}/animals').content)
+        assert animals == []
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+        requests.delete(base_url + f'/animal/{post_animal2["id"]}')
+        requests.delete(base_url + f'/enclosure/{post_enclosure1["id"]}')
+        requests.delete(base_url + f'/enclosure/{post_enclosure2["id"]}')
+
+    def test_move_animals_unknown_enclosure(self, base_url, post_animal1, unknown_id):
+        """Test moving animals to a not existing enclosure."""
+        r = requests.post(base_url + f'/enclosure/{unknown_id}/animals',
+                          json={'animal_ids': [post_animal1['id']]})
+        assert json.loads(r.content) == f'Enclosure with ID {unknown_id} has not been found'
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+
     def test_get_animals_unknown_enclosure_id(self, base_url, unknown_id):
         """Test getting all animals of a not existing enclosure."""
         enclosures = json.loads(requests.get(base_url + '/enclosures').content)
@@ -1626,6 +2093,65 @@ class TestGeneratePlanAPICalls:
         requests.delete(base_url + f'/caretaker/{post_caretaker1["id"]}')
         requests.delete(base_url + f'/caretaker/{post_caretaker2["id"]}')
 
+    def test_generate_feeding_plan_least_loaded(self, base_url, post_animal1, post_animal2, post_animal3,
+                                                post_caretaker1, post_caretaker2):
+        """Test generating a feeding plan that assigns the tasks to the
+        caretakers with the fewest animals."""
+        requests.post(
+            base_url + f'/caretaker/{post_caretaker1["id"]}/care/{post_animal1["id"]}')
+
+        feeding_plan = json.loads(requests.get(
+            base_url + '/tasks/feeding', params={'strategy': 'least_loaded'}).content)
+
+        assert feeding_plan[post_animal1['id']
+                            ]['caretaker'] == post_caretaker2['id']
+        assert feeding_plan[post_animal2['id']
+                            ]['caretaker'] == post_caretaker1['id']
+        assert feeding_plan[post_animal3['id']
+                            ]['caretaker'] == post_caretaker2['id']
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+        requests.delete(base_url + f'/animal/{post_animal2["id"]}')
+        requests.delete(base_url + f'/animal/{post_animal3["id"]}')
+        requests.delete(base_url + f'/caretaker/{post_caretaker1["id"]}')
+        requests.delete(base_url + f'/caretaker/{post_caretaker2["id"]}')
+
+    def test_generate_feeding_plan_unknown_strategy(self, base_url):
+        """Test generating a feeding plan with a not existing 
+        strategy."""
+        r = requests.get(base_url + '/tasks/feeding',
+                         params={'strategy': 'unknown'})
+        assert r.status_code == 400
+
+    def test_get_due_feeding_tasks(self, base_url, post_animal1, post_animal2):
+        """Test getting the animals that have to be fed next."""
+        requests.post(base_url + f'/animal/{post_animal1["id"]}/feed')
+
+        due_tasks = json.loads(requests.get(
+            base_url + '/tasks/feeding/due').content)
+        assert [task['id'] for task in due_tasks] == [post_animal2['id'], post_animal1['id']]
+
+        due_tasks = json.loads(requests.get(
+            base_url + '/tasks/feeding/due', params={'limit': 1}).content)
+        assert [task['id'] for task in due_tasks] == [post_animal2['id']]
+
+        tomorrow = datetime.datetime.now() + datetime.timedelta(days=1)
+        due_tasks = json.loads(requests.get(
+            base_url + '/tasks/feeding/due', params={'before': tomorrow.isoformat()}).content)
+        assert [task['id'] for task in due_tasks] == [post_animal2['id']]
+
+        # cleanup
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+        requests.delete(base_url + f'/animal/{post_animal2["id"]}')
+
+    def test_get_due_tasks_invalid_parameters(self, base_url):
+        """Test getting due tasks with invalid parameters."""
+        r = requests.get(base_url + '/tasks/feeding/due', params={'limit': 0})
+        assert r.status_code == 400
+        r = requests.get(base_url + '/tasks/feeding/due', params={'before': 'tomorrow'})
+        assert r.status_code == 400
+
     def test_generate_medical_plan_no_animals(self, base_url):
         """Test generating a medical plan without any animals added
         to the zoo so far."""
@@ -1793,3 +2319,40 @@ class TestGeneratePlanAPICalls:
         requests.delete(base_url + f'/enclosure/{post_enclosure3["id"]}')
         requests.delete(base_url + f'/caretaker/{post_caretaker1["id"]}')
         requests.delete(base_url + f'/caretaker/{post_caretaker2["id"]}')
+
+
+class TestChangeAPICalls:
+    def test_get_changes(self, base_url, post_animal1):
+        """Test getting the changes since an earlier version."""
+        since = requests.get(base_url + '/changes', params={'since': 0}).json()['since']
+        requests.post(base_url + f'/animal/{post_animal1["id"]}/feed')
+        requests.delete(base_url + f'/animal/{post_animal1["id"]}')
+
+        changes = requests.get(base_url + '/changes', params={'since': since}).json()
+        assert changes['resync'] is False
+        assert [(change['operation'], change['id']) for change in changes['changes']] == [
+            ('updated', post_animal1['id']), ('deleted', post_animal1['id'])]
+
+    def test_get_changes_resync(self, base_url):
+        """Test getting the changes since a version the zoo does not 
+        know."""
+        synced = requests.get(base_url + '/changes', params={'since': 0}).json()
+        epoch, version = synced['epoch'], synced['version']
+        changes = requests.get(base_url + '/changes', params={'since': f'{epoch}-{version + 1}'}).json()
+        assert changes == {'version': version, 'epoch': epoch, 'since': f'{epoch}-{version}',
+                           'resync': True, 'changes': []}
+
+    def test_get_changes_other_epoch(self, base_url, post_animal1):
+        """Test getting the changes since a version of another run of
+        the API or without its epoch."""
+        version = requests.get(base_url + '/changes', params={'since': 0}).json()['version']
+        changes = requests.get(base_url + '/changes', params={'since': f'0123abcd-{version}'}).json()
+        assert changes['resync'] is True
+        changes = requests.get(base_url + '/changes', params={'since': version}).json()
+        assert changes['resync'] is True
+
+    def test_get_changes_invalid_version(self, base_url):
+        """Test getting the changes without a valid version."""
+        assert requests.get(base_url + '/changes').status_code == 400
+        assert requests.get(base_url + '/changes', params={'since': -1}).status_code == 400
+        assert requests.get(base_url + '/changes', params={'since': 'abc-x'}).status_code == 400
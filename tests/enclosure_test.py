@@ -28,6 +28,23 @@ class TestEnclosure:
         assert animal2 in enclosure1.get_animals()
         assert animal3 in enclosure1.get_animals()
 
+    def test_get_species(self, enclosure1: Enclosure, animal1: Animal, animal2: Animal, animal3: Animal, animal4: Animal):
+        """Test retrieving the species living in an enclosure while 
+        animals move in and out."""
+        assert enclosure1.get_species() == []
+
+        animal1.set_home(enclosure1)
+        animal3.set_home(enclosure1)
+        animal4.set_home(enclosure1)
+        assert enclosure1.get_species() == ['Pan troglodytes', 'Panthera tigris']
+
+        animal3.unset_home()
+        assert enclosure1.get_species() == ['Pan troglodytes', 'Panthera tigris']
+
+        animal4.unset_home()
+        animal2.set_home(enclosure1)
+        assert enclosure1.get_species() == ['Panthera tigris', 'Testudinata']
+
     def test_clean_enclosure(self, enclosure1: Enclosure):
         """Test clean an enclosure once."""
         enclosure1.clean()
@@ -0,0 +1,333 @@
+import pytest
+from datetime import datetime
+
+from zoo_collections import DueIndex, EntitySet, TimestampRecord
+from zoo_objects import Animal
+
+
+class TestEntitySet:
+    def test_add(self, animal1: Animal):
+        """Test adding a single object."""
+        entity_set = EntitySet()
+        assert entity_set.add(animal1) is True
+        assert len(entity_set) == 1
+        assert animal1 in entity_set
+
+    def test_add_twice(self, animal1: Animal):
+        """Test adding the same object twice."""
+        entity_set = EntitySet()
+        entity_set.add(animal1)
+        assert entity_set.add(animal1) is False
+        assert len(entity_set) == 1
+
+    def test_discard(self, animal1: Animal, animal2: Animal):
+        """Test removing an object."""
+        entity_set = EntitySet()
+        entity_set.add(animal1)
+        entity_set.add(animal2)
+
+        assert entity_set.discard(animal1) is True
+        assert len(entity_set) == 1
+        assert animal1 not in entity_set
+        assert animal2 in entity_set
+
+    def test_discard_not_existing(self, animal1: Animal):
+        """Test removing an object that has never been added."""
+        entity_set = EntitySet()
+        assert entity_set.discard(animal1) is False
+        assert len(entity_set) == 0
+
+    def test_get(self, animal1: Animal, unknown_id: str):
+        """Test getting an object via its ID."""
+        entity_set = EntitySet()
+        entity_set.add(animal1)
+
+        assert entity_set.get(animal1.id) is animal1
+        assert entity_set.get(unknown_id) is None
+
+    def test_contains_other_objects(self, animal1: Animal):
+        """Test checking membership of objects that are not zoo 
+        objects."""
+        entity_set = EntitySet()
+        entity_set.add(animal1)
+
+        assert None not in entity_set
+        assert animal1.id not in entity_set
+
+    def test_insertion_order(self, animal1: Animal, animal2: Animal, animal3: Animal):
+        """Test that iterating returns the objects in insertion order, 
+        also after removing and adding an object again."""
+        entity_set = EntitySet()
+        entity_set.add(animal1)
+        entity_set.add(animal2)
+        entity_set.add(animal3)
+        assert list(entity_set) == [animal1, animal2, animal3]
+        assert list(entity_set.ids()) == [animal1.id, animal2.id, animal3.id]
+
+        entity_set.discard(animal1)
+        entity_set.add(animal1)
+        assert list(entity_set) == [animal2, animal3, animal1]
+
+    def test_indexing(self, animal1: Animal, animal2: Animal, animal3: Animal):
+        """Test that indexing and slicing work like for a list of the
+        objects in insertion order, also with gaps of removed objects."""
+        entity_set = EntitySet()
+        with pytest.raises(IndexError):
+            entity_set[0]
+        assert entity_set[:] == []
+
+        entity_set.add(animal1)
+        entity_set.add(animal2)
+        entity_set.add(animal3)
+        assert entity_set[0] is animal1
+        assert entity_set[-1] is animal3
+        assert entity_set[1:] == [animal2, animal3]
+
+        entity_set.discard(animal2)
+        assert entity_set[1] is animal3
+        assert entity_set[:] == [animal1, animal3]
+        with pytest.raises(IndexError):
+            entity_set[2]
+
+    def test_page(self, animal1: Animal, animal2: Animal, animal3: Animal):
+        """Test returning the objects page by page."""
+        entity_set = EntitySet()
+        assert entity_set.page(0, 2) == ([], None)
+
+        entity_set.add(animal1)
+        entity_set.add(animal2)
+        entity_set.add(animal3)
+        page, after = entity_set.page(0, 2)
+        assert page == [animal1, animal2]
+        page, after = entity_set.page(after, 2)
+        assert page == [animal3]
+        assert after is None
+
+        # no next page when the page ends with the last object
+        assert entity_set.page(0, 3) == ([animal1, animal2, animal3], None)
+
+    def test_page_with_changes(self, animal1: Animal, animal2: Animal, animal3: Animal, animal4: Animal):
+        """Test that pages stay stable when objects get added or removed
+        in between."""
+        entity_set = EntitySet()
+        entity_set.add(animal1)
+        entity_set.add(animal2)
+        entity_set.add(animal3)
+        page, after = entity_set.page(0, 1)
+        assert page == [animal1]
+
+        # removing the last returned object and the next one does not
+        # skip or repeat any other object
+        entity_set.discard(animal1)
+        entity_set.discard(animal2)
+        entity_set.add(animal4)
+        page, after = entity_set.page(after, 1)
+        assert page == [animal3]
+        page, after = entity_set.page(after, 1)
+        assert page == [animal4]
+        assert after is None
+
+    def test_page_after_compaction(self):
+        """Test paging after so many objects got removed that the order
+        got compacted."""
+        entity_set = EntitySet()
+        animals = [Animal('Panthera tigris', 'Tiger', age) for age in range(100)]
+        for animal in animals:
+            entity_set.add(animal)
+        page, after = entity_set.page(0, 10)
+
+        for animal in animals[:90]:
+            entity_set.discard(animal)
+        assert len(entity_set._order) < 100
+
+        page, after = entity_set.page(after, 100)
+        assert page == animals[90:]
+        assert after is None
+
+    def test_from_unique(self, animal1: Animal, animal2: Animal, animal3: Animal, animal4: Animal):
+        """Test that a set created at once behaves like a set the
+        objects got added to one by one."""
+        entity_set = EntitySet.from_unique([animal1, animal2, animal3])
+        assert list(entity_set) == [animal1, animal2, animal3]
+        assert entity_set.get(animal2.id) is animal2
+        assert entity_set.add(animal1) is False
+
+        entity_set.discard(animal2)
+        entity_set.add(animal4)
+        page, after = entity_set.page(0, 2)
+        assert page == [animal1, animal3]
+        page, after = entity_set.page(after, 2)
+        assert page == [animal4]
+        assert len(EntitySet.from_unique([])) == 0
+
+
+class TestTimestampRecord:
+    def test_empty(self):
+        """Test an empty record."""
+        record = TimestampRecord()
+        assert len(record) == 0
+        assert record.last() is None
+        assert list(record) == []
+        assert record == []
+        assert record.isoformat() == []
+
+    def test_append(self):
+        """Test adding timestamps keeps them exactly, including 
+        microseconds."""
+        timestamps = [datetime(2023, 5, 1, 12, 30, 15, 123456),
+                      datetime(2023, 5, 3, 8, 0),
+                      datetime(1960, 1, 1, 0, 0, 0, 1)]
+        record = TimestampRecord()
+        for timestamp in timestamps:
+            record.append(timestamp)
+
+        assert len(record) == 3
+        assert record.last() == timestamps[-1]
+        assert record[0] == timestamps[0]
+        assert record[-1] == timestamps[-1]
+        assert list(record) == timestamps
+        assert record == timestamps
+
+    def test_slicing(self):
+        """Test slicing a record returns a record again."""
+        timestamps = [datetime(2023, 5, day) for day in range(1, 6)]
+        record = TimestampRecord(timestamps)
+
+        sliced = record[1:3]
+        assert isinstance(sliced, TimestampRecord)
+        assert sliced == timestamps[1:3]
+        assert record[-2:] == timestamps[-2:]
+
+    def test_index_out_of_range(self):
+        """Test accessing a not existing entry."""
+        with pytest.raises(IndexError):
+            TimestampRecord()[0]
+
+    def test_isoformat(self):
+        """Test converting all timestamps to ISO 8601 strings."""
+        timestamps = [datetime(2023, 5, 1, 12, 30, 15, 123456),
+                      datetime(2023, 5, 3, 8, 0)]
+        record = TimestampRecord(timestamps)
+        assert record.isoformat() == [timestamp.isoformat()
+                                      for timestamp in timestamps]
+
+    def test_datetimes(self):
+        """Test converting all timestamps to a list of datetimes."""
+        timestamps = [datetime(2023, 5, 1, 12, 30, 15, 123456),
+                      datetime(2023, 5, 3, 8, 0)]
+        assert TimestampRecord(timestamps).datetimes() == timestamps
+        assert TimestampRecord().datetimes() == []
+
+    def test_from_micros(self):
+        """Test that a record created from microseconds returns them
+        unchanged and can still be appended to."""
+        timestamps = [datetime(2023, 5, 1, 12, 30, 15, 123456),
+                      datetime(2023, 5, 3, 8, 0)]
+        record = TimestampRecord.from_micros(TimestampRecord(timestamps).micros())
+        assert record.datetimes() == timestamps
+        record.append(datetime(2023, 5, 4))
+        assert len(record) == 3
+        assert len(TimestampRecord.from_micros(TimestampRecord().micros())) == 0
+
+
+class TestDueIndex:
+    def test_empty(self):
+        """Test an empty index."""
+        due_index = DueIndex()
+        assert len(due_index) == 0
+        assert due_index.first(10) == []
+
+    def test_order(self):
+        """Test that the objects are returned ordered by their due 
+        date."""
+        due_index = DueIndex()
+        due_index.update('b', datetime(2023, 5, 2))
+        due_index.update('c', datetime(2023, 5, 3))
+        due_index.update('a', datetime(2023, 5, 1))
+
+        assert due_index.first(10) == [('a', datetime(2023, 5, 1)),
+                                       ('b', datetime(2023, 5, 2)),
+                                       ('c', datetime(2023, 5, 3))]
+        assert due_index.first(2) == [('a', datetime(2023, 5, 1)),
+                                      ('b', datetime(2023, 5, 2))]
+
+        # reading does not change the index
+        assert len(due_index.first(10)) == 3
+
+    def test_before(self):
+        """Test only returning objects due before a certain date."""
+        due_index = DueIndex()
+        due_index.update('a', datetime(2023, 5, 1))
+        due_index.update('b', datetime(2023, 5, 3))
+
+        assert due_index.first(10, datetime(2023, 5, 2)) == [
+            ('a', datetime(2023, 5, 1))]
+        assert due_index.first(10, datetime(2023, 4, 1)) == []
+
+    def test_update_and_discard(self):
+        """Test moving an object to a new due date and removing 
+        objects."""
+        due_index = DueIndex()
+        due_index.update('a', datetime(2023, 5, 1))
+        due_index.update('b', datetime(2023, 5, 2))
+        due_index.update('c', datetime(2023, 5, 3))
+
+        due_index.update('a', datetime(2023, 5, 4))
+        due_index.discard('b')
+        due_index.discard('unknown')
+
+        assert len(due_index) == 2
+        assert due_index.first(10) == [('c', datetime(2023, 5, 3)),
+                                       ('a', datetime(2023, 5, 4))]
+
+    def test_many_updates(self):
+        """Test that outdated entries do not pile up when updating the 
+        same objects over and over again."""
+        due_index = DueIndex()
+        for day in range(1, 29):
+            for item_id in ('a', 'b', 'c'):
+                due_index.update(item_id, datetime(2023, 2, day))
+
+        assert len(due_index._heap) <= 2 * len(due_index) + 16
+        assert [item_id for item_id, _ in due_index.first(10)] == ['a', 'b', 'c']
+
+    def test_update_many(self):
+        """Test adding and moving many objects at once, with few and
+        with many new entries compared to the size of the heap."""
+        due_index = DueIndex()
+        due_index.update_many((str(day), datetime(2023, 2, day)) for day in range(28, 0, -1))
+        assert [item_id for item_id, _ in due_index.first(3)] == ['1', '2', '3']
+
+        due_index.update_many([('1', datetime(2023, 3, 1)), ('x', datetime(2023, 1, 1))])
+        assert [item_id for item_id, _ in due_index.first(3)] == ['x', '2', '3']
+        assert len(due_index) == 29
+
+        for _ in range(20):
+            due_index.update_many((str(day), datetime(2023, 2, day)) for day in range(1, 29))
+        assert len(due_index._heap) <= 2 * len(due_index) + 16
+        assert [item_id for item_id, _ in due_index.first(2)] == ['x', '1']
+
+    def test_first_does_not_change_heap(self):
+        """Test that reading skips outdated entries without changing the
+        heap, so that several threads can read at once."""
+        due_index = DueIndex()
+        for day in range(1, 11):
+            due_index.update(str(day), datetime(2023, 2, day))
+        due_index.update('1', datetime(2023, 3, 1))
+        due_index.discard('2')
+        heap = list(due_index._heap)
+
+        assert [item_id for item_id, _ in due_index.first(3)] == ['3', '4', '5']
+        assert [item_id for item_id, _ in due_index.first(20)][-1] == '1'
+        assert due_index._heap == heap
+
+    def test_discard_many(self):
+        """Test that the entries of removed objects do not pile up."""
+        due_index = DueIndex()
+        for day in range(1, 29):
+            due_index.update(str(day), datetime(2023, 2, day))
+        for day in range(1, 28):
+            due_index.discard(str(day))
+
+        assert len(due_index._heap) <= 2 * len(due_index) + 16
+        assert due_index.first(10) == [('28', datetime(2023, 2, 28))]
@@ -0,0 +1,221 @@
+import json
+import time
+import pytest
+import threading
+
+from zoo import Zoo
+from zoo_concurrency import ReadWriteLock, SingleWriter
+from zoo_objects import Animal, Caretaker, Enclosure
+
+
+def start_thread(target) -> threading.Thread:
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestReadWriteLock:
+    def test_many_readers(self):
+        """Test that several readers can hold the lock at once."""
+        lock = ReadWriteLock()
+        inside = threading.Barrier(3, timeout=5)
+
+        def read():
+            with lock.read():
+                inside.wait()
+
+        threads = [start_thread(read) for _ in range(2)]
+        with lock.read():
+            inside.wait()
+        for thread in threads:
+            thread.join(5)
+            assert not thread.is_alive()
+
+    def test_writer_is_exclusive(self):
+        """Test that a writer waits for the readers and readers wait for
+        the writer."""
+        lock = ReadWriteLock()
+        events = []
+
+        lock.acquire_read()
+        writer = start_thread(lambda: (lock.acquire_write(), events.append('write'), lock.release_write()))
+        time.sleep(0.05)
+        assert events == []
+
+        lock.release_read()
+        writer.join(5)
+        assert events == ['write']
+
+        lock.acquire_write()
+        reader = start_thread(lambda: (lock.acquire_read(), events.append('read'), lock.release_read()))
+        time.sleep(0.05)
+        assert events == ['write']
+
+        lock.release_write()
+        reader.join(5)
+        assert events == ['write', 'read']
+
+    def test_waiting_writer_is_preferred(self):
+        """Test that new readers do not get the lock while a writer 
+        waits for it."""
+        lock = ReadWriteLock()
+        events = []
+
+        lock.acquire_read()
+        writer = start_thread(lambda: (lock.acquire_write(), events.append('write'), lock.release_write()))
+        time.sleep(0.05)
+        reader = start_thread(lambda: (lock.acquire_read(), events.append('read'), lock.release_read()))
+        time.sleep(0.05)
+        assert events == []
+
+        lock.release_read()
+        writer.join(5)
+        reader.join(5)
+        assert events == ['write', 'read']
+
+
+class TestSingleWriter:
+    def test_submit(self, zoo1: Zoo, animal1: Animal):
+        """Test that submitted functions get called in the writer thread
+        and their results and exceptions get returned."""
+        writer = SingleWriter(zoo1, lambda obj: obj.id, 0)
+        assert writer.submit(threading.current_thread) is not threading.current_thread()
+        writer.submit(zoo1.add_animal, animal1)
+        assert zoo1.get_animal(animal1.id) is animal1
+
+        with pytest.raises(ZeroDivisionError):
+            writer.submit(lambda: 1 / 0)
+        assert writer.submit(len, 'abc') == 3
+        writer.stop()
+
+    def test_encoding_error(self, zoo1: Zoo, animal1: Animal, animal2: Animal):
+        """Test that an object that cannot be encoded fails the change
+        that published it, but does not stop the writer thread."""
+        def encode(obj):
+            if obj.age > 100:
+                raise OverflowError('age out of range')
+            return obj.id
+
+        writer = SingleWriter(zoo1, encode, 0)
+        animal1.age = 200
+        with pytest.raises(OverflowError):
+            writer.submit(zoo1.add_animal, animal1)
+        assert zoo1.get_animal(animal1.id) is animal1
+
+        animal1.age = 20
+        writer.submit(zoo1.add_animal, animal2)
+        assert set(writer.snapshot.animals) == {animal1.id, animal2.id}
+        writer.stop()
+        with pytest.raises(RuntimeError):
+            writer.submit(len, 'abc')
+
+    def test_snapshots(self, zoo1: Zoo, animal1: Animal, animal2: Animal, enclosure1: Enclosure):
+        """Test that the snapshots follow the changes of the zoo and that
+        unchanged collections are shared between snapshots."""
+        zoo1.add_animal(animal1)
+        writer = SingleWriter(zoo1, lambda obj: json.dumps([obj.id, obj.version]), 0)
+        first = writer.snapshot
+        assert list(first.animals) == [animal1.id]
+        assert dict(first.enclosures) == {}
+
+        writer.submit(zoo1.add_enclosure, enclosure1)
+        second = writer.snapshot
+        assert second.version == zoo1.version
+        assert second.animals is first.animals
+        assert list(second.enclosures) == [enclosure1.id]
+
+        writer.submit(zoo1.add_animal, animal2)
+        writer.submit(animal1.feed)
+        writer.submit(zoo1.remove_animal, animal2)
+        third = writer.snapshot
+        assert dict(third.animals) == {animal1.id: json.dumps([animal1.id, animal1.version])}
+        assert list(first.animals) == [animal1.id]
+        with pytest.raises(TypeError):
+            third.animals['x'] = 'y'
+        writer.stop()
+
+    def test_snapshot_after_full_change_log(self, animal1: Animal):
+        """Test that all objects get encoded again when the change log
+        does not reach back to the previous snapshot."""
+        zoo = Zoo(change_log_size=2)
+        writer = SingleWriter(zoo, lambda obj: obj.id, 0)
+        writer.submit(zoo.add_animals, [Animal('Panthera tigris', 'Tiger', age) for age in range(5)])
+        assert len(writer.snapshot.animals) == 5
+        assert writer.snapshot.version == zoo.version
+        writer.stop()
+
+    def test_staleness(self, zoo1: Zoo):
+        """Test that under a steady stream of changes snapshots still 
+        get published after max_staleness seconds."""
+        writer = SingleWriter(zoo1, lambda obj: obj.id, 0.01)
+        versions = set()
+
+        def change():
+            zoo1.add_animal(Animal('Panthera tigris', 'Tiger', 1))
+            time.sleep(0.002)
+
+        threads = [start_thread(lambda: [writer.submit(change) for _ in range(30)])
+                   for _ in range(3)]
+        while any(thread.is_alive() for thread in threads):
+            versions.add(writer.snapshot.version)
+            time.sleep(0.001)
+        writer.stop()
+
+        assert len(versions) > 2
+        assert writer.snapshot.version == zoo1.version
+
+
+    def test_publish_once_per_interval(self, zoo1: Zoo):
+        """Test that changes in quick succession get published together
+        once max_staleness has passed, also without further changes."""
+        writer = SingleWriter(zoo1, lambda obj: obj.id, 0.2)
+        publishes = []
+        next_snapshot = writer._next_snapshot
+        writer._next_snapshot = lambda: publishes.append(zoo1.version) or next_snapshot()
+
+        for age in range(10):
+            writer.submit(zoo1.add_animal, Animal('Panthera tigris', 'Tiger', age))
+        assert len(publishes) <= 1
+        time.sleep(0.5)
+        assert writer.snapshot.version == zoo1.version
+        assert len(writer.snapshot.animals) == 10
+        assert len(publishes) <= 2
+        writer.stop()
+
+
+class TestThreadSafeZoo:
+    def test_concurrent_moves(self, zoo1: Zoo):
+        """Test that moving animals from many threads while reading the
+        stats keeps the zoo consistent when the lock of the zoo gets
+        held."""
+        enclosures = [Enclosure(f'Cave{idx}', 100) for idx in range(3)]
+        caretaker = Caretaker('Laetitia', 'Blond-Street 19')
+        animals = [Animal('Panthera tigris', 'Tiger', idx) for idx in range(30)]
+        zoo1.add_enclosures(enclosures)
+        zoo1.add_caretaker(caretaker)
+        zoo1.add_animals(animals)
+        errors = []
+
+        def move(offset: int):
+            for idx in range(200):
+                with zoo1.lock.write():
+                    animals[(idx + offset) % len(animals)].set_home(enclosures[idx % len(enclosures)])
+
+        def read():
+            for _ in range(200):
+                with zoo1.lock.read():
+                    housed = sum(len(enclosure.get_animals()) for enclosure in enclosures)
+                    average = zoo1.get_enclosure_stats()['average_animals_per_enclosure']
+                    if housed != sum(animal.enclosure is not None for animal in animals):
+                        errors.append(housed)
+                    if round(average * len(enclosures)) != housed:
+                        errors.append(average)
+
+        threads = [start_thread(lambda offset=offset: move(offset)) for offset in range(4)]
+        threads += [start_thread(read) for _ in range(2)]
+        for thread in threads:
+            thread.join(30)
+
+        assert errors == []
+        for animal in animals:
+            assert [animal in enclosure.get_animals() for enclosure in enclosures].count(True) == 1
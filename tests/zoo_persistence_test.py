@@ -0,0 +1,475 @@
+import os
+import json
+import time
+import pytest
+import signal
+import datetime
+import threading
+
+import zoo_persistence
+from zoo import Zoo
+from zoo_objects import Animal, Caretaker, Enclosure
+from zoo_persistence import (BackgroundSave, WriteAheadLog, animal_state, caretaker_state,
+                             enclosure_state, load_snapshot, save_snapshot)
+
+
+def zoo_state(zoo: Zoo) -> dict:
+    """Return the state of all objects of a zoo including which animals
+    live in which enclosure and are cared for by which caretaker."""
+    return {
+        'animals': [animal_state(animal) for animal in zoo.animals],
+        'caretakers': [(caretaker_state(caretaker), list(caretaker.animals.ids()))
+                       for caretaker in zoo.caretakers],
+        'enclosures': [(enclosure_state(enclosure), list(enclosure.animals.ids()))
+                       for enclosure in zoo.enclosures],
+        'due': {task: due_index.first(100) for task, due_index in zoo._due_indexes.items()},
+    }
+
+
+def logged_zoo(path: str) -> tuple[Zoo, WriteAheadLog]:
+    zoo = Zoo()
+    wal = WriteAheadLog(path)
+    zoo.journal = wal.append
+    return zoo, wal
+
+
+def replayed_zoo(path: str) -> Zoo:
+    zoo = Zoo()
+    wal = WriteAheadLog(path)
+    wal.replay(zoo)
+    wal.close()
+    return zoo
+
+
+class TestWriteAheadLog:
+    def test_replay(self, tmp_path, animal1: Animal, animal2: Animal, animal3: Animal,
+                    enclosure1: Enclosure, enclosure2: Enclosure,
+                    caretaker1: Caretaker, caretaker2: Caretaker):
+        """Test that replaying the log of all kinds of changes restores
+        the same zoo."""
+        path = str(tmp_path / 'zoo.wal')
+        zoo, wal = logged_zoo(path)
+        animal1.feed(datetime.datetime(2023, 5, 1, 12, 30, 15, 123456))
+        zoo.add_animal(animal1)
+        zoo.add_animals([animal2, animal3])
+        zoo.add_enclosures([enclosure1, enclosure2])
+        zoo.add_caretaker(caretaker1)
+        zoo.add_caretaker(caretaker2)
+
+        animal1.set_home(enclosure1)
+        animal2.set_home(enclosure1)
+        animal3.set_home(enclosure2)
+        animal1.set_caretaker(caretaker1)
+        animal2.set_caretaker(caretaker2)
+        animal1.feed()
+        animal2.vet()
+        enclosure1.clean()
+        zoo.feed_animals(species_name='Panthera tigris')
+        zoo.add_animal(animal1.birth())
+        zoo.move_animals(enclosure2, [animal2.id])
+        zoo.remove_enclosure(enclosure1)
+        zoo.remove_caretaker(caretaker2)
+        zoo.remove_animal(animal3)
+        wal.close()
+
+        restored = replayed_zoo(path)
+        assert zoo_state(restored) == zoo_state(zoo)
+        assert restored.check_stats()
+
+    def test_replay_continues_log(self, tmp_path, animal1: Animal, enclosure1: Enclosure):
+        """Test that changes after a replay get appended to the same log
+        and are restored by the next replay."""
+        path = str(tmp_path / 'zoo.wal')
+        zoo, wal = logged_zoo(path)
+        zoo.add_animal(animal1)
+        wal.close()
+
+        zoo = Zoo()
+        wal = WriteAheadLog(path)
+        assert wal.replay(zoo) == 1
+        zoo.journal = wal.append
+        zoo.add_enclosure(enclosure1)
+        zoo.get_animal(animal1.id).set_home(zoo.get_enclosure(enclosure1.id))
+        assert wal.last_lsn == 3
+        wal.close()
+
+        restored = replayed_zoo(path)
+        assert restored.get_animal(animal1.id).enclosure.id == enclosure1.id
+
+    def test_incomplete_last_line(self, tmp_path, animal1: Animal, animal2: Animal):
+        """Test that an entry that has only been written partly gets
+        ignored and cut off."""
+        path = tmp_path / 'zoo.wal'
+        zoo, wal = logged_zoo(str(path))
+        zoo.add_animal(animal1)
+        zoo.add_animal(animal2)
+        wal.close()
+        content = path.read_bytes()
+        path.write_bytes(content[:-10])
+
+        zoo = Zoo()
+        wal = WriteAheadLog(str(path))
+        assert wal.replay(zoo) == 1
+        zoo.journal = wal.append
+        zoo.add_animal(animal2)
+        wal.close()
+
+        lines = path.read_bytes().splitlines()
+        assert [json.loads(line)[0] for line in lines] == ['lsn', 'add_animal', 'add_animal']
+        assert len(replayed_zoo(str(path)).animals) == 2
+
+    def test_damaged_line_before_last(self, tmp_path, animal1: Animal, animal2: Animal):
+        """Test that a damaged entry followed by valid ones raises
+        instead of cutting off the valid entries."""
+        path = tmp_path / 'zoo.wal'
+        zoo, wal = logged_zoo(str(path))
+        zoo.add_animal(animal1)
+        zoo.add_animal(animal2)
+        wal.close()
+        lines = path.read_bytes().splitlines(keepends=True)
+        lines[1] = lines[1][:10] + b'\n'
+        path.write_bytes(b''.join(lines))
+
+        wal = WriteAheadLog(str(path))
+        with pytest.raises(ValueError):
+            wal.replay(Zoo())
+        wal.close()
+        assert path.read_bytes() == b''.join(lines)
+
+    def test_group_commit(self, tmp_path):
+        """Test that entries appended while a commit runs get synced
+        together, so there are fewer fsync calls than entries."""
+        wal = WriteAheadLog(str(tmp_path / 'zoo.wal'))
+
+        def append():
+            for _ in range(50):
+                wal.wait(wal.append(('record', 'feeding', 'unknown', datetime.datetime.now())))
+
+        threads = [threading.Thread(target=append) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for _ in range(100):
+            wal.append(('unset_home', 'unknown'))
+        wal.wait()
+        for thread in threads:
+            thread.join()
+        wal.close()
+
+        assert wal.last_lsn == 500
+        assert wal.commits < 500
+        assert len((tmp_path / 'zoo.wal').read_bytes().splitlines()) == 501
+
+
+def build_zoo(zoo: Zoo, animal1: Animal, animal2: Animal, animal3: Animal,
+              enclosure1: Enclosure, enclosure2: Enclosure,
+              caretaker1: Caretaker, caretaker2: Caretaker) -> None:
+    zoo.add_animals([animal1, animal2, animal3])
+    zoo.add_enclosures([enclosure1, enclosure2])
+    zoo.add_caretaker(caretaker1)
+    zoo.add_caretaker(caretaker2)
+    animal1.set_home(enclosure1)
+    animal2.set_home(enclosure2)
+    animal3.set_home(enclosure2)
+    animal1.set_caretaker(caretaker2)
+    animal3.set_caretaker(caretaker2)
+    animal1.feed(datetime.datetime(2023, 5, 1, 12, 30, 15, 123456))
+    animal1.feed()
+    animal2.vet()
+    enclosure2.clean()
+    zoo.add_animal(animal3.birth())
+
+
+class TestSnapshot:
+    def test_save_and_load(self, tmp_path, animal1: Animal, animal2: Animal, animal3: Animal,
+                           enclosure1: Enclosure, enclosure2: Enclosure,
+                           caretaker1: Caretaker, caretaker2: Caretaker):
+        """Test that loading a snapshot restores the same zoo, including
+        newborn animals, the order of all collections and the stats."""
+        path = str(tmp_path / 'zoo.snapshot')
+        zoo = Zoo()
+        build_zoo(zoo, animal1, animal2, animal3, enclosure1, enclosure2, caretaker1, caretaker2)
+        assert save_snapshot(zoo, path, 42) == (tmp_path / 'zoo.snapshot').stat().st_size
+
+        restored = Zoo()
+        assert load_snapshot(restored, path) == 42
+        assert zoo_state(restored) == zoo_state(zoo)
+        assert restored.check_stats()
+        assert restored.get_animal_stats() == zoo.get_animal_stats()
+        assert restored.get_caretaker_stats() == zoo.get_caretaker_stats()
+        assert restored.get_enclosure_stats() == zoo.get_enclosure_stats()
+
+    def test_big_integers(self, tmp_path, animal1: Animal, animal2: Animal):
+        """Test that ages that do not fit into 64 bit get saved too."""
+        path = str(tmp_path / 'zoo.snapshot')
+        zoo = Zoo()
+        animal1.age = 10 ** 20
+        zoo.add_animals([animal1, animal2])
+        save_snapshot(zoo, path, 1)
+
+        restored = Zoo()
+        load_snapshot(restored, path)
+        assert restored.get_animal(animal1.id).age == 10 ** 20
+        assert restored.get_animal(animal2.id).age == animal2.age
+
+    def test_restored_zoo_rejects_duplicates(self, tmp_path, animal1: Animal):
+        """Test that a restored zoo still finds its objects by ID."""
+        path = str(tmp_path / 'zoo.snapshot')
+        zoo = Zoo()
+        zoo.add_animal(animal1)
+        save_snapshot(zoo, path, 1)
+
+        restored = Zoo()
+        load_snapshot(restored, path)
+        restored_animal = restored.get_animal(animal1.id)
+        assert restored_animal._zoo is restored
+        assert restored.add_animal(restored_animal) is None
+
+    def test_snapshot_and_log_tail(self, tmp_path, animal1: Animal, animal2: Animal, animal3: Animal,
+                                   enclosure1: Enclosure, enclosure2: Enclosure,
+                                   caretaker1: Caretaker, caretaker2: Caretaker):
+        """Test that a snapshot plus the entries of the log after it
+        restore the same zoo, also after the log has been truncated."""
+        log_path = str(tmp_path / 'zoo.wal')
+        snapshot_path = str(tmp_path / 'zoo.snapshot')
+        zoo, wal = logged_zoo(log_path)
+        build_zoo(zoo, animal1, animal2, animal3, enclosure1, enclosure2, caretaker1, caretaker2)
+        wal.wait()
+        lsn = wal.last_lsn
+        save_snapshot(zoo, snapshot_path, lsn)
+        animal2.set_caretaker(caretaker1)
+        zoo.remove_enclosure(enclosure1)
+
+        def restore() -> Zoo:
+            restored = Zoo()
+            log = WriteAheadLog(log_path)
+            assert log.replay(restored, load_snapshot(restored, snapshot_path)) == 3
+            log.close()
+            return restored
+
+        assert zoo_state(restore()) == zoo_state(zoo)
+        wal.truncate(lsn)
+        assert len((tmp_path / 'zoo.wal').read_bytes().splitlines()) == 4
+        zoo.add_animal(animal1.birth())
+        wal.close()
+
+        restored = Zoo()
+        log = WriteAheadLog(log_path)
+        assert log.replay(restored, load_snapshot(restored, snapshot_path)) == 4
+        assert log.last_lsn == lsn + 4
+        log.close()
+        assert zoo_state(restored) == zoo_state(zoo)
+
+    def test_versions(self, tmp_path, animal1: Animal, animal2: Animal, animal3: Animal,
+                      enclosure1: Enclosure, enclosure2: Enclosure,
+                      caretaker1: Caretaker, caretaker2: Caretaker):
+        """Test that a zoo restored from a snapshot and the log after it
+        continues with the versions of the saved zoo, so that a client
+        of the change log has to resync."""
+        log_path = str(tmp_path / 'zoo.wal')
+        snapshot_path = str(tmp_path / 'zoo.snapshot')
+        zoo, wal = logged_zoo(log_path)
+        zoo.add_animal(animal1)
+        zoo.add_enclosure(enclosure1)
+        synced = zoo.version
+        build_zoo(zoo, Animal('Panthera tigris', 'Tiger', 3), animal2, animal3, enclosure1, enclosure2,
+                  caretaker1, caretaker2)
+        wal.wait()
+        save_snapshot(zoo, snapshot_path, wal.last_lsn)
+        animal2.feed()
+        wal.close()
+
+        restored = Zoo()
+        log = WriteAheadLog(log_path)
+        log.replay(restored, load_snapshot(restored, snapshot_path))
+        log.close()
+        assert restored.version == zoo.version
+        assert restored._collection_versions == zoo._collection_versions
+        assert restored.epoch == zoo.epoch
+        assert restored.get_changes(synced)['resync'] is True
+        assert restored.get_changes(zoo.version - 1)['changes'] == zoo.get_changes(zoo.version - 1)['changes']
+
+    def test_truncate_while_appending(self, tmp_path):
+        """Test that entries appended while the log gets truncated are
+        kept and keep their LSN."""
+        path = tmp_path / 'zoo.wal'
+        wal = WriteAheadLog(str(path))
+
+        def append():
+            for _ in range(300):
+                wal.wait(wal.append(('unset_home', 'unknown')))
+
+        threads = [threading.Thread(target=append) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        truncations = 0
+        while any(thread.is_alive() for thread in threads) or truncations == 0:
+            wal.truncate(wal.last_lsn)
+            truncations += 1
+        for thread in threads:
+            thread.join()
+        wal.close()
+
+        lines = path.read_bytes().splitlines()
+        assert json.loads(lines[0])[0] == 'lsn'
+        assert json.loads(lines[0])[1] + len(lines) - 1 == 1200
+        assert all(json.loads(line) == ['unset_home', 'unknown'] for line in lines[1:])
+
+    def test_truncate_while_syncing(self, tmp_path, monkeypatch):
+        """Test that entries that are still being synced when the log
+        gets truncated up to them are dropped as well."""
+        path = tmp_path / 'zoo.wal'
+        wal = WriteAheadLog(str(path))
+        fsync = os.fsync
+
+        def slow_fsync(fd):
+            if threading.current_thread() is wal._thread:
+                time.sleep(0.2)
+            fsync(fd)
+
+        monkeypatch.setattr(zoo_persistence.os, 'fsync', slow_fsync)
+        wal.wait(wal.append(('unset_home', 'unknown')))
+        lsn = wal.append(('unset_caretaker', 'unknown'))
+        wal.truncate(lsn)
+        wal.append(('unset_home', 'unknown'))
+        wal.close()
+
+        lines = path.read_bytes().splitlines()
+        assert [json.loads(line) for line in lines] == [['lsn', 2], ['unset_home', 'unknown']]
+
+    def test_log_without_entries_of_snapshot(self, tmp_path, animal1: Animal, animal2: Animal):
+        """Test that a log that has been truncated after a newer snapshot
+        cannot be replayed onto an older state of the zoo."""
+        path = str(tmp_path / 'zoo.wal')
+        zoo, wal = logged_zoo(path)
+        zoo.add_animal(animal1)
+        zoo.add_animal(animal2)
+        wal.wait()
+        wal.truncate(1)
+        wal.close()
+
+        with pytest.raises(ValueError):
+            WriteAheadLog(path).replay(Zoo())
+
+    def test_new_log_continues_after_snapshot(self, tmp_path, animal1: Animal, animal2: Animal):
+        """Test that a new log next to a snapshot numbers its entries
+        after the snapshot."""
+        snapshot_path = str(tmp_path / 'zoo.snapshot')
+        zoo = Zoo()
+        zoo.add_animal(animal1)
+        save_snapshot(zoo, snapshot_path, 5)
+
+        restored = Zoo()
+        wal = WriteAheadLog(str(tmp_path / 'zoo.wal'))
+        assert wal.replay(restored, load_snapshot(restored, snapshot_path)) == 0
+        assert wal.last_lsn == 5
+        restored.journal = wal.append
+        restored.add_animal(animal2)
+        wal.close()
+
+        restored = Zoo()
+        wal = WriteAheadLog(str(tmp_path / 'zoo.wal'))
+        assert wal.replay(restored, load_snapshot(restored, snapshot_path)) == 1
+        wal.close()
+        assert len(restored.animals) == 2
+
+
+class TestBackgroundSave:
+    def test_save(self, tmp_path, animal1: Animal, animal2: Animal, animal3: Animal,
+                  enclosure1: Enclosure, enclosure2: Enclosure,
+                  caretaker1: Caretaker, caretaker2: Caretaker):
+        """Test that a background save writes a snapshot of the zoo,
+        reports its status and rejects a second save meanwhile."""
+        path = tmp_path / 'zoo.snapshot'
+        zoo = Zoo()
+        build_zoo(zoo, animal1, animal2, animal3, enclosure1, enclosure2, caretaker1, caretaker2)
+        saved = []
+        background_save = BackgroundSave(str(path), saved.append)
+        assert background_save.status() is None
+
+        assert background_save.start(zoo, 7) is True
+        assert background_save.start(zoo, 8) is False
+        assert background_save.status()['in_progress'] is True
+
+        status = background_save.wait(10)
+        assert status['in_progress'] is False
+        assert status['status'] == 'ok'
+        assert status['lsn'] == 7
+        assert status['progress'] == 1.0
+        assert status['bytes_written'] == path.stat().st_size
+        assert status['duration'] > 0
+        assert saved == [7]
+
+        restored = Zoo()
+        assert load_snapshot(restored, str(path)) == 7
+        assert zoo_state(restored) == zoo_state(zoo)
+
+    def test_changes_after_fork(self, tmp_path, animal1: Animal, animal2: Animal):
+        """Test that changes of the parent after the save started are not
+        part of the snapshot."""
+        path = str(tmp_path / 'zoo.snapshot')
+        zoo = Zoo()
+        zoo.add_animal(animal1)
+        background_save = BackgroundSave(path)
+        background_save.start(zoo, 1)
+        zoo.add_animal(animal2)
+        animal1.feed()
+        background_save.wait(10)
+
+        restored = Zoo()
+        load_snapshot(restored, path)
+        assert list(restored.animals.ids()) == [animal1.id]
+        assert len(restored.get_animal(animal1.id).feeding_record) == 0
+
+    def test_failed_save(self, tmp_path, animal1: Animal):
+        """Test that a failed save reports its error, does not call saved
+        and does not block the next save."""
+        zoo = Zoo()
+        zoo.add_animal(animal1)
+        saved = []
+        background_save = BackgroundSave(str(tmp_path / 'missing' / 'zoo.snapshot'), saved.append)
+        background_save.start(zoo, 1)
+
+        status = background_save.wait(10)
+        assert status['status'] == 'failed'
+        assert 'No such file or directory' in status['error']
+        assert saved == []
+
+        background_save.path = str(tmp_path / 'zoo.snapshot')
+        assert background_save.start(zoo, 1) is True
+        assert background_save.wait(10)['status'] == 'ok'
+        assert saved == [1]
+
+    def test_killed_child(self, tmp_path, monkeypatch, animal1: Animal):
+        """Test that a child that gets killed while saving ends the save
+        as failed."""
+        def killed(*args):
+            os.kill(os.getpid(), signal.SIGKILL)
+
+        monkeypatch.setattr(zoo_persistence, 'save_snapshot', killed)
+        zoo = Zoo()
+        zoo.add_animal(animal1)
+        background_save = BackgroundSave(str(tmp_path / 'zoo.snapshot'))
+        background_save.start(zoo, 1)
+
+        status = background_save.wait(10)
+        assert status['status'] == 'failed'
+        assert status['error'] == 'The child process exited with code -9'
+        assert background_save.running is False
+
+    def test_failed_saved_callback(self, tmp_path, animal1: Animal):
+        """Test that an error of saved fails the save, but does not block
+        the next save."""
+        def saved(lsn):
+            raise OSError('disk full')
+
+        zoo = Zoo()
+        zoo.add_animal(animal1)
+        background_save = BackgroundSave(str(tmp_path / 'zoo.snapshot'), saved)
+        background_save.start(zoo, 1)
+
+        status = background_save.wait(10)
+        assert status['status'] == 'failed'
+        assert status['error'] == 'disk full'
+        assert background_save.start(zoo, 1) is True
+        background_save.wait(10)
+
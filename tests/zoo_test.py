@@ -31,6 +31,20 @@ class TestZooAnimalMethods:
         assert len(zoo1.animals) == 1
         assert animal1 in zoo1.animals
 
+    def test_add_animals(self, zoo1: Zoo, animal1: Animal, animal2: Animal, animal3: Animal):
+        """Test adding many animals at once, existing animals and other
+        objects get skipped."""
+        zoo1.add_animal(animal1)
+        assert zoo1.add_animals([animal1, animal2, 'animal', animal3, animal2]) == 2
+
+        assert list(zoo1.animals) == [animal1, animal2, animal3]
+        assert animal2._zoo is zoo1
+        assert zoo1.check_stats() is True
+        assert [task['id'] for task in zoo1.get_due_tasks('feeding')] == \
+            [animal1.id, animal2.id, animal3.id]
+        assert [change['id'] for change in zoo1.get_changes(1)['changes']] == \
+            [animal2.id, animal3.id]
+
     def test_remove_animal(self, zoo1: Zoo, animal1: Animal):
         """Test removing a single animal."""
         zoo1.add_animal(animal1)
@@ -123,6 +137,13 @@ class TestZooAnimalMethods:
         """Test getting an animal via a not existing animal ID."""
         assert zoo1.get_animal(unknown_id) is None
 
+    def test_get_animal_after_removal(self, zoo1: Zoo, animal1: Animal):
+        """Test getting an animal via its ID after it has been removed 
+        from the zoo."""
+        zoo1.add_animal(animal1)
+        zoo1.remove_animal(animal1)
+        assert zoo1.get_animal(animal1.id) is None
+
     def test_get_all_animals_empty(self, zoo1: Zoo):
         """Test getting all animals without any animals in the zoo."""
         assert len(zoo1.get_all_animals()) == 0
@@ -166,8 +187,33 @@ class TestZooAnimalMethods:
                                     'Pan troglodytes': 2}
         }
 
+    def test_get_animal_stats_after_changes(self, zoo1: Zoo, animal1: Animal, animal2: Animal, animal3: Animal, animal4: Animal):
+        """Test that the animal stats stay correct after adding, 
+        removing and giving birth to animals."""
+        zoo1.add_animal(animal1)
+        zoo1.add_animal(animal2)
+        zoo1.add_animal(animal3)
+        zoo1.add_animal(animal4)
+        zoo1.add_animal(animal4)
+        zoo1.add_animal(animal3.birth())
+
+        zoo1.remove_animal(animal1)
+        zoo1.remove_animal(animal1)
+        zoo1.remove_animal(animal2)
+
+        assert zoo1.get_animal_stats() == {
+            'animals_per_species': {'Pan troglodytes': 3}
+        }
+        assert zoo1.check_stats() is True
+
 
 class TestZooCaretakerMethods:
+    def test_add_caretakers(self, zoo1: Zoo, caretaker1: Caretaker, caretaker2: Caretaker):
+        """Test adding many caretakers at once."""
+        assert zoo1.add_caretakers([caretaker1, caretaker2, caretaker2]) == 2
+        assert list(zoo1.caretakers) == [caretaker1, caretaker2]
+        assert zoo1.check_stats() is True
+
     def test_add_caretaker(self, zoo1: Zoo, caretaker1: Caretaker):
         """Test adding a single caretaker."""
         zoo1.add_caretaker(caretaker1)
@@ -261,6 +307,23 @@ class TestZooCaretakerMethods:
         assert len(caretaker2.animals) == 1
         assert animal1 in caretaker2.animals
 
+    def test_remove_caretaker_with_multiple_animals(self, zoo1: Zoo, caretaker1: Caretaker, caretaker2: Caretaker, animal1: Animal, animal2: Animal, animal3: Animal):
+        """Test removing a caretaker that has multiple animals assigned. 
+        All of them have to be moved to the next caretaker."""
+        zoo1.add_caretaker(caretaker1)
+        zoo1.add_caretaker(caretaker2)
+
+        animal1.set_caretaker(caretaker1)
+        animal2.set_caretaker(caretaker1)
+        animal3.set_caretaker(caretaker1)
+
+        assert zoo1.remove_caretaker(caretaker1) is True
+        assert len(caretaker1.animals) == 0
+        assert len(caretaker2.animals) == 3
+        assert animal1.caretaker == caretaker2
+        assert animal2.caretaker == caretaker2
+        assert animal3.caretaker == caretaker2
+
     def test_get_caretaker(self, zoo1: Zoo, caretaker1: Caretaker):
         """Test getting a caretaker via an existing caretaker ID."""
         zoo1.add_caretaker(caretaker1)
@@ -270,6 +333,13 @@ class TestZooCaretakerMethods:
         """Test getting a caretaker via a not existing caretaker ID."""
         assert zoo1.get_caretaker(unknown_id) is None
 
+    def test_get_caretaker_after_removal(self, zoo1: Zoo, caretaker1: Caretaker):
+        """Test getting a caretaker via its ID after it has been removed 
+        from the zoo."""
+        zoo1.add_caretaker(caretaker1)
+        zoo1.remove_caretaker(caretaker1)
+        assert zoo1.get_caretaker(caretaker1.id) is None
+
     def test_get_all_caretakers_empty(self, zoo1: Zoo):
         """Test getting all caretaker information without caretakers."""
         assert len(zoo1.get_all_caretakers()) == 0
@@ -322,8 +392,70 @@ class TestZooCaretakerMethods:
             'average_animals_under_supervision': 1
         }
 
+    def test_get_caretaker_stats_after_changes(self, zoo1: Zoo, caretaker1: Caretaker, caretaker2: Caretaker, caretaker3: Caretaker,
+                                               animal1: Animal, animal2: Animal, animal3: Animal, animal4: Animal):
+        """Test that the caretaker stats stay correct after moving 
+        animals between caretakers and removing animals and 
+        caretakers."""
+        # a caretaker that already cares for an animal before being 
+        # added to the zoo
+        animal4.set_caretaker(caretaker3)
+
+        zoo1.add_caretaker(caretaker1)
+        zoo1.add_caretaker(caretaker2)
+        zoo1.add_caretaker(caretaker3)
+        zoo1.add_animal(animal1)
+
+        animal1.set_caretaker(caretaker1)
+        animal2.set_caretaker(caretaker1)
+        animal3.set_caretaker(caretaker1)
+        assert zoo1.get_caretaker_stats() == {
+            'minimum_animals_under_supervision': 0,
+            'maximum_animals_under_supervision': 3,
+            'average_animals_under_supervision': 4 / 3
+        }
+        assert zoo1.check_stats() is True
+
+        animal2.set_caretaker(caretaker2)
+        animal3.set_caretaker(caretaker2)
+        zoo1.remove_animal(animal1)
+        assert zoo1.get_caretaker_stats() == {
+            'minimum_animals_under_supervision': 0,
+            'maximum_animals_under_supervision': 2,
+            'average_animals_under_supervision': 1
+        }
+        assert zoo1.check_stats() is True
+
+        # the animals are moved to caretaker1
+        zoo1.remove_caretaker(caretaker2)
+        assert zoo1.get_caretaker_stats() == {
+            'minimum_animals_under_supervision': 1,
+            'maximum_animals_under_supervision': 2,
+            'average_animals_under_supervision': 1.5
+        }
+        assert zoo1.check_stats() is True
+
+        # the animals are moved to caretaker3
+        zoo1.remove_caretaker(caretaker1)
+        assert zoo1.get_caretaker_stats() == {
+            'minimum_animals_under_supervision': 3,
+            'maximum_animals_under_supervision': 3,
+            'average_animals_under_supervision': 3
+        }
+        assert zoo1.check_stats() is True
+
 
 class TestZooEnclosureMethods:
+    def test_add_enclosures(self, zoo1: Zoo, enclosure1: Enclosure, enclosure2: Enclosure, animal1: Animal):
+        """Test adding many enclosures at once."""
+        animal1.set_home(enclosure2)
+        assert zoo1.add_enclosures([enclosure1, enclosure2, enclosure1]) == 2
+
+        assert list(zoo1.enclosures) == [enclosure1, enclosure2]
+        assert zoo1.check_stats() is True
+        assert [task['id'] for task in zoo1.get_due_tasks('cleaning')] == \
+            [enclosure1.id, enclosure2.id]
+
     def test_add_enclosure(self, zoo1: Zoo, enclosure1: Enclosure):
         """Test adding a single enclosure."""
         zoo1.add_enclosure(enclosure1)
@@ -417,6 +549,23 @@ class TestZooEnclosureMethods:
         assert len(enclosure2.animals) == 1
         assert animal1 in enclosure2.animals
 
+    def test_remove_enclosure_with_multiple_animals(self, zoo1: Zoo, enclosure1: Enclosure, enclosure2: Enclosure, animal1: Animal, animal2: Animal, animal3: Animal):
+        """Test removing an enclosure that is the home of multiple 
+        animals. All of them have to be moved to the next enclosure."""
+        zoo1.add_enclosure(enclosure1)
+        zoo1.add_enclosure(enclosure2)
+
+        animal1.set_home(enclosure1)
+        animal2.set_home(enclosure1)
+        animal3.set_home(enclosure1)
+
+        assert zoo1.remove_enclosure(enclosure1) is True
+        assert len(enclosure1.animals) == 0
+        assert len(enclosure2.animals) == 3
+        assert animal1.enclosure == enclosure2
+        assert animal2.enclosure == enclosure2
+        assert animal3.enclosure == enclosure2
+
     def test_get_enclosure(self, zoo1: Zoo, enclosure1: Enclosure):
         """Test getting an enclosure via an existing enclosure ID."""
         zoo1.add_enclosure(enclosure1)
@@ -426,6 +575,13 @@ class TestZooEnclosureMethods:
         """Test getting an enclosure via a not existing enclosure ID."""
         assert zoo1.get_enclosure(unknown_id) is None
 
+    def test_get_enclosure_after_removal(self, zoo1: Zoo, enclosure1: Enclosure):
+        """Test getting an enclosure via its ID after it has been removed 
+        from the zoo."""
+        zoo1.add_enclosure(enclosure1)
+        zoo1.remove_enclosure(enclosure1)
+        assert zoo1.get_enclosure(enclosure1.id) is None
+
     def test_get_all_enclosures_empty(self, zoo1: Zoo):
         """Test getting all enclosure information without enclosures."""
         assert len(zoo1.get_all_enclosures()) == 0
@@ -482,6 +638,67 @@ class TestZooEnclosureMethods:
                                                          enclosure3.id: enclosure3.area}
         }
 
+    def test_get_enclosure_stats_after_changes(self, zoo1: Zoo, enclosure1: Enclosure, enclosure2: Enclosure, enclosure3: Enclosure,
+                                               animal1: Animal, animal2: Animal, animal3: Animal, animal4: Animal):
+        """Test that the enclosure stats stay correct after moving 
+        animals between enclosures and removing animals and 
+        enclosures."""
+        # an enclosure that already has animals before being added to
+        # the zoo
+        animal1.set_home(enclosure1)
+        animal2.set_home(enclosure1)
+
+        zoo1.add_enclosure(enclosure1)
+        zoo1.add_enclosure(enclosure2)
+        zoo1.add_enclosure(enclosure3)
+        zoo1.add_animal(animal2)
+        zoo1.add_animal(animal3)
+        assert zoo1.get_enclosure_stats()['enclosures_with_multiple_species'] == {
+            enclosure1.id: ['Panthera tigris', 'Testudinata']}
+
+        animal3.set_home(enclosure2)
+        animal4.set_home(enclosure2)
+        animal2.set_home(enclosure2)
+        zoo1.remove_animal(animal3)
+        assert zoo1.get_enclosure_stats() == {
+            'average_animals_per_enclosure': 1,
+            'enclosures_with_multiple_species': {enclosure2.id: ['Pan troglodytes', 'Testudinata']},
+            'available_space_per_animal_per_enclosure': {enclosure1.id: enclosure1.area,
+                                                         enclosure2.id: enclosure2.area / 2,
+                                                         enclosure3.id: enclosure3.area}
+        }
+        assert zoo1.check_stats() is True
+
+        # the animals are moved to enclosure1
+        zoo1.remove_enclosure(enclosure2)
+        assert zoo1.get_enclosure_stats() == {
+            'average_animals_per_enclosure': 1.5,
+            'enclosures_with_multiple_species': {enclosure1.id: ['Pan troglodytes', 'Panthera tigris', 'Testudinata']},
+            'available_space_per_animal_per_enclosure': {enclosure1.id: enclosure1.area / 3,
+                                                         enclosure3.id: enclosure3.area}
+        }
+        assert zoo1.check_stats() is True
+
+    def test_rebuild_stats(self, zoo1: Zoo, enclosure1: Enclosure, caretaker1: Caretaker, animal1: Animal, animal2: Animal):
+        """Test recalculating all statistics from scratch after objects 
+        have been added without going through the add methods."""
+        zoo1.animals.add(animal1)
+        zoo1.animals.add(animal2)
+        zoo1.enclosures.add(enclosure1)
+        zoo1.caretakers.add(caretaker1)
+        animal1.set_home(enclosure1)
+        animal2.set_home(enclosure1)
+        animal1.set_caretaker(caretaker1)
+        assert zoo1.check_stats() is False
+
+        zoo1._rebuild_stats()
+        assert zoo1.check_stats() is True
+        assert zoo1.get_animal_stats() == {
+            'animals_per_species': {'Panthera tigris': 1, 'Testudinata': 1}}
+        assert zoo1.get_enclosure_stats()['enclosures_with_multiple_species'] == {
+            enclosure1.id: ['Panthera tigris', 'Testudinata']}
+        assert zoo1.get_caretaker_stats()['maximum_animals_under_supervision'] == 1
+
 
 class TestZooGeneratePlanMethods:
     def test_generate_feeding_plan_no_animals(self, zoo1: Zoo):
@@ -542,6 +759,36 @@ class TestZooGeneratePlanMethods:
         assert feeding_plan[animal2.id]['caretaker'] == caretaker2.id
         assert feeding_plan[animal3.id]['caretaker'] == caretaker1.id
 
+    def test_generate_feeding_plan_least_loaded(self, zoo1: Zoo, animal1: Animal, animal2: Animal, animal3: Animal,
+                                                caretaker1: Caretaker, caretaker2: Caretaker):
+        """Test generating a feeding plan that assigns the tasks to the
+        caretakers with the fewest animals."""
+        zoo1.add_animal(animal1)
+        zoo1.add_animal(animal2)
+        zoo1.add_animal(animal3)
+
+        zoo1.add_caretaker(caretaker1)
+        zoo1.add_caretaker(caretaker2)
+        animal1.set_caretaker(caretaker1)
+
+        feeding_plan = zoo1.generate_feeding_plan('least_loaded')
+        assert feeding_plan[animal1.id]['caretaker'] == caretaker2.id
+        assert feeding_plan[animal2.id]['caretaker'] == caretaker1.id
+        assert feeding_plan[animal3.id]['caretaker'] == caretaker2.id
+
+    def test_generate_feeding_plan_least_loaded_no_caretaker(self, zoo1: Zoo, animal1: Animal):
+        """Test generating a feeding plan that assigns the tasks to the
+        caretakers with the fewest animals while no caretakers exist."""
+        zoo1.add_animal(animal1)
+        feeding_plan = zoo1.generate_feeding_plan('least_loaded')
+        assert feeding_plan[animal1.id]['caretaker'] == ''
+
+    def test_generate_feeding_plan_unknown_strategy(self, zoo1: Zoo, animal1: Animal):
+        """Test generating a feeding plan with a not existing 
+        strategy."""
+        zoo1.add_animal(animal1)
+        assert zoo1.generate_feeding_plan('unknown') is None
+
     def test_generate_medical_plan_no_animals(self, zoo1: Zoo):
         """Test generating a medical plan when no animals exist."""
         medical_plan = zoo1.generate_medical_plan()
@@ -657,3 +904,349 @@ class TestZooGeneratePlanMethods:
         assert cleaning_plan[enclosure1.id]['caretaker'] == caretaker1.id
         assert cleaning_plan[enclosure2.id]['caretaker'] == caretaker2.id
         assert cleaning_plan[enclosure3.id]['caretaker'] == caretaker1.id
+
+
+class TestZooBulkRecordMethods:
+    def test_feed_animals_by_id(self, zoo1: Zoo, animal1: Animal, animal2: Animal, unknown_id: str):
+        """Test feeding many animals with the same date."""
+        zoo1.add_animals([animal1, animal2])
+        summary = zoo1.feed_animals([animal1.id, unknown_id, animal1.id, animal2.id])
+        assert summary['count'] == 2
+        assert summary['not_found'] == [unknown_id]
+        assert animal1.feeding_record == [summary['timestamp']]
+        assert animal2.feeding_record == [summary['timestamp']]
+        assert [task['id'] for task in zoo1.get_due_tasks('feeding')] == [animal1.id, animal2.id]
+
+    def test_vet_animals_with_selectors(self, zoo1: Zoo, animal1: Animal, animal3: Animal, animal4: Animal,
+                                        enclosure1: Enclosure, caretaker1: Caretaker):
+        """Test that all given selectors have to match."""
+        zoo1.add_animals([animal1, animal3, animal4])
+        zoo1.add_enclosure(enclosure1)
+        zoo1.add_caretaker(caretaker1)
+        animal1.set_home(enclosure1)
+        animal3.set_home(enclosure1)
+        animal3.set_caretaker(caretaker1)
+        animal4.set_caretaker(caretaker1)
+        timestamp = datetime.datetime(2023, 5, 1, 12)
+
+        assert zoo1.vet_animals(species_name='Pan troglodytes', timestamp=timestamp)['count'] == 2
+        assert zoo1.vet_animals(enclosure_id=enclosure1.id, timestamp=timestamp)['count'] == 2
+        assert zoo1.vet_animals(enclosure_id=enclosure1.id, caretaker_id=caretaker1.id,
+                                timestamp=timestamp)['count'] == 1
+        assert zoo1.vet_animals([animal1.id, animal4.id], caretaker_id=caretaker1.id,
+                                timestamp=timestamp)['count'] == 1
+        assert animal1.medical_record == [timestamp]
+        assert animal3.medical_record == [timestamp] * 3
+        assert animal4.medical_record == [timestamp] * 2
+
+    def test_feed_animals_invalid_selection(self, zoo1: Zoo, animal1: Animal, unknown_id: str):
+        """Test feeding without selecting any animals or with unknown 
+        enclosures."""
+        zoo1.add_animal(animal1)
+        assert zoo1.feed_animals() is None
+        summary = zoo1.feed_animals(enclosure_id=unknown_id)
+        assert summary['count'] == 0
+        assert summary['not_found'] == [unknown_id]
+        assert animal1.feeding_record == []
+
+    def test_move_animals(self, zoo1: Zoo, animal1: Animal, animal3: Animal, animal4: Animal,
+                          enclosure1: Enclosure, enclosure2: Enclosure, unknown_id: str):
+        """Test moving many animals to another enclosure at once."""
+        zoo1.add_animals([animal1, animal3, animal4])
+        zoo1.add_enclosures([enclosure1, enclosure2])
+        zoo1.move_animals(enclosure1, [animal1.id, animal3.id, animal4.id])
+        assert list(enclosure1.get_animals()) == [animal1, animal3, animal4]
+
+        summary = zoo1.move_animals(enclosure2, species_name='Pan troglodytes', enclosure_id=enclosure1.id)
+        assert summary == {'count': 2, 'not_found': []}
+        assert list(enclosure1.get_animals()) == [animal1]
+        assert list(enclosure2.get_animals()) == [animal3, animal4]
+        assert animal3.enclosure is enclosure2
+
+        # animals that already live there do not count
+        assert zoo1.move_animals(enclosure2, [animal3.id, unknown_id]) == {'count': 0, 'not_found': [unknown_id]}
+        assert zoo1.get_enclosure_stats()['enclosures_with_multiple_species'] == {}
+        assert zoo1.check_stats() is True
+
+    def test_move_animals_invalid(self, zoo1: Zoo, animal1: Animal, enclosure1: Enclosure):
+        """Test moving animals to an enclosure of another zoo or without 
+        selecting any animals."""
+        zoo1.add_animal(animal1)
+        assert zoo1.move_animals(enclosure1, [animal1.id]) is None
+        zoo1.add_enclosure(enclosure1)
+        assert zoo1.move_animals(enclosure1) is None
+        assert animal1.enclosure is None
+
+    def test_assign_caretaker(self, zoo1: Zoo, animal1: Animal, animal2: Animal, animal3: Animal,
+                              caretaker1: Caretaker, caretaker2: Caretaker):
+        """Test assigning many animals to another caretaker at once."""
+        zoo1.add_animals([animal1, animal2, animal3])
+        zoo1.add_caretakers([caretaker1, caretaker2])
+        assert zoo1.assign_caretaker(caretaker1, [animal1.id, animal2.id, animal3.id])['count'] == 3
+        assert zoo1.assign_caretaker(caretaker2, species_name='Testudinata')['count'] == 1
+
+        assert list(caretaker1.get_animals()) == [animal1, animal3]
+        assert list(caretaker2.get_animals()) == [animal2]
+        assert zoo1.get_caretaker_stats()['minimum_animals_under_supervision'] == 1
+        assert zoo1.check_stats() is True
+
+    def test_clean_enclosures(self, zoo1: Zoo, enclosure1: Enclosure, enclosure2: Enclosure, animal1: Animal):
+        """Test cleaning many enclosures with the same date."""
+        zoo1.add_enclosures([enclosure1, enclosure2])
+        animal1.set_home(enclosure2)
+        assert zoo1.clean_enclosures() is None
+
+        summary = zoo1.clean_enclosures([enclosure1.id, enclosure2.id])
+        assert summary['count'] == 2
+        assert enclosure1.cleaning_record == enclosure2.cleaning_record == [summary['timestamp']]
+
+        assert zoo1.clean_enclosures(species_name=animal1.species_name)['count'] == 1
+        assert zoo1.clean_enclosures([enclosure1.id], animal1.species_name)['count'] == 0
+        assert len(enclosure2.cleaning_record) == 2
+
+
+class TestZooDueTasksMethods:
+    def test_get_due_tasks_empty(self, zoo1: Zoo):
+        """Test getting the due tasks of an empty zoo."""
+        assert zoo1.get_due_tasks('feeding') == []
+        assert zoo1.get_due_tasks('medical') == []
+        assert zoo1.get_due_tasks('cleaning') == []
+
+    def test_get_due_tasks_invalid_input(self, zoo1: Zoo):
+        """Test getting the due tasks of a not existing task or with an
+        invalid limit."""
+        assert zoo1.get_due_tasks('unknown') is None
+        assert zoo1.get_due_tasks('feeding', limit=0) is None
+
+    def test_get_due_feeding_tasks(self, zoo1: Zoo, animal1: Animal, animal2: Animal, animal3: Animal):
+        """Test that animals without feeding records come first and the
+        others follow ordered by their next feeding date."""
+        zoo1.add_animal(animal1)
+        zoo1.add_animal(animal2)
+        zoo1.add_animal(animal3)
+
+        animal2.feed()
+        animal1.feed()
+
+        due_tasks = zoo1.get_due_tasks('feeding')
+        assert [task['id'] for task in due_tasks] == [animal3.id, animal2.id, animal1.id]
+        assert abs((datetime.datetime.now() - due_tasks[0]['date']).total_seconds()) < 5
+        assert due_tasks[1]['date'] == animal2.feeding_record[-1] + datetime.timedelta(days=2)
+
+        # the dates match the ones of the feeding plan
+        feeding_plan = zoo1.generate_feeding_plan()
+        assert due_tasks[1]['date'] == feeding_plan[animal2.id]['date']
+        assert due_tasks[2]['date'] == feeding_plan[animal1.id]['date']
+
+        animal3.feed()
+        animal2.feed()
+        due_tasks = zoo1.get_due_tasks('feeding', limit=2)
+        assert [task['id'] for task in due_tasks] == [animal1.id, animal3.id]
+
+    def test_get_due_tasks_before(self, zoo1: Zoo, animal1: Animal, animal2: Animal):
+        """Test only getting the tasks that are due before a certain 
+        date."""
+        zoo1.add_animal(animal1)
+        zoo1.add_animal(animal2)
+        animal1.vet()
+
+        tomorrow = datetime.datetime.now() + datetime.timedelta(days=1)
+        due_tasks = zoo1.get_due_tasks('medical', before=tomorrow)
+        assert [task['id'] for task in due_tasks] == [animal2.id]
+
+        next_year = datetime.datetime.now() + datetime.timedelta(days=365)
+        due_tasks = zoo1.get_due_tasks('medical', before=next_year)
+        assert [task['id'] for task in due_tasks] == [animal2.id, animal1.id]
+
+    def test_get_due_tasks_after_removal(self, zoo1: Zoo, animal1: Animal, enclosure1: Enclosure, enclosure2: Enclosure):
+        """Test that removed animals and enclosures are no longer 
+        part of the due tasks."""
+        zoo1.add_animal(animal1)
+        zoo1.add_enclosure(enclosure1)
+        zoo1.add_enclosure(enclosure2)
+        enclosure2.clean()
+
+        zoo1.remove_animal(animal1)
+        zoo1.remove_enclosure(enclosure1)
+        assert zoo1.get_due_tasks('feeding') == []
+        assert [task['id'] for task in zoo1.get_due_tasks('cleaning')] == [enclosure2.id]
+
+        # records added outside of the zoo do not matter anymore
+        animal1.feed()
+        assert zoo1.get_due_tasks('feeding') == []
+
+
+class TestZooVersionMethods:
+    def test_version_increases(self, zoo1: Zoo, animal1: Animal, caretaker1: Caretaker, enclosure1: Enclosure):
+        """Test that every change of the zoo or one of its objects 
+        increases the version."""
+        versions = [zoo1.version]
+
+        def changed() -> bool:
+            versions.append(zoo1.version)
+            return versions[-1] > versions[-2]
+
+        zoo1.add_animal(animal1)
+        assert changed()
+        zoo1.add_caretaker(caretaker1)
+        assert changed()
+        zoo1.add_enclosure(enclosure1)
+        assert changed()
+        animal1.set_home(enclosure1)
+        assert changed()
+        animal1.set_caretaker(caretaker1)
+        assert changed()
+        animal1.feed()
+        assert changed()
+        animal1.vet()
+        assert changed()
+        enclosure1.clean()
+        assert changed()
+        zoo1.remove_animal(animal1)
+        assert changed()
+        zoo1.remove_caretaker(caretaker1)
+        assert changed()
+        zoo1.remove_enclosure(enclosure1)
+        assert changed()
+
+    def test_version_unchanged(self, zoo1: Zoo, animal1: Animal, animal2: Animal):
+        """Test that reading from the zoo and changing objects outside 
+        of the zoo do not increase the version."""
+        zoo1.add_animal(animal1)
+        version = zoo1.version
+
+        zoo1.add_animal(animal1)
+        zoo1.get_animal(animal1.id)
+        zoo1.get_animal_stats()
+        zoo1.generate_feeding_plan()
+        animal2.feed()
+        assert zoo1.version == version
+
+    def test_collection_versions(self, zoo1: Zoo, animal1: Animal, caretaker1: Caretaker, enclosure1: Enclosure):
+        """Test that the version of a collection only increases with
+        changes of its own objects."""
+        zoo1.add_caretaker(caretaker1)
+        zoo1.add_enclosure(enclosure1)
+        versions = {collection: zoo1.collection_version(collection)
+                    for collection in ('animals', 'caretakers', 'enclosures')}
+
+        def changed() -> set[str]:
+            result = {collection for collection, version in versions.items()
+                      if zoo1.collection_version(collection) > version}
+            versions.update((collection, zoo1.collection_version(collection))
+                            for collection in versions)
+            return result
+
+        zoo1.add_animal(animal1)
+        assert changed() == {'animals'}
+        animal1.feed()
+        assert changed() == {'animals'}
+        animal1.set_home(enclosure1)
+        assert changed() == {'animals', 'enclosures'}
+        animal1.set_caretaker(caretaker1)
+        assert changed() == {'animals', 'caretakers'}
+        enclosure1.clean()
+        assert changed() == {'enclosures'}
+        animal1.unset_caretaker()
+        assert changed() == {'animals', 'caretakers'}
+        zoo1.remove_caretaker(caretaker1)
+        assert changed() == {'caretakers'}
+        assert zoo1.collection_version('unknown') is None
+
+    def test_object_version(self, animal1: Animal, enclosure1: Enclosure):
+        """Test that the version of an object increases with every 
+        change, also outside of a zoo."""
+        version = animal1.version
+        animal1.feed()
+        assert animal1.version > version
+
+        version = enclosure1.version
+        animal1.set_home(enclosure1)
+        assert enclosure1.version > version
+
+    def test_cached_plan(self, zoo1: Zoo, animal1: Animal, caretaker1: Caretaker):
+        """Test that a plan is only generated again after the zoo has 
+        changed."""
+        zoo1.add_animal(animal1)
+        feeding_plan = zoo1.generate_feeding_plan()
+        assert zoo1.generate_feeding_plan() is feeding_plan
+        assert zoo1.generate_feeding_plan('least_loaded') is not feeding_plan
+
+        zoo1.add_caretaker(caretaker1)
+        new_feeding_plan = zoo1.generate_feeding_plan()
+        assert new_feeding_plan is not feeding_plan
+        assert new_feeding_plan[animal1.id]['caretaker'] == caretaker1.id
+
+        animal1.feed()
+        assert zoo1.generate_feeding_plan()[animal1.id]['date'] == animal1.feeding_record[-1] + datetime.timedelta(days=2)
+
+    def test_cached_stats(self, zoo1: Zoo, animal1: Animal, enclosure1: Enclosure):
+        """Test that the stats are only calculated again after the zoo
+        has changed."""
+        zoo1.add_enclosure(enclosure1)
+        enclosure_stats = zoo1.get_enclosure_stats()
+        assert zoo1.get_enclosure_stats() is enclosure_stats
+
+        animal1.set_home(enclosure1)
+        assert zoo1.get_enclosure_stats()['average_animals_per_enclosure'] == 1
+
+
+class TestZooChangeMethods:
+    def test_get_changes(self, zoo1: Zoo, animal1: Animal, enclosure1: Enclosure):
+        """Test that creating, updating and deleting objects gets 
+        recorded in the change log."""
+        since = zoo1.version
+        zoo1.add_animal(animal1)
+        zoo1.add_enclosure(enclosure1)
+        animal1.set_home(enclosure1)
+        zoo1.remove_animal(animal1)
+
+        changes = zoo1.get_changes(since)
+        assert changes['version'] == zoo1.version
+        assert changes['resync'] is False
+        assert [(change['operation'], change['type'], change['id'])
+                for change in changes['changes']] == [
+            ('created', 'animal', animal1.id),
+            ('created', 'enclosure', enclosure1.id),
+            # setting the home changes the enclosure and the animal
+            ('updated', 'enclosure', enclosure1.id),
+            ('updated', 'animal', animal1.id),
+            # removing the animal unsets its home first
+            ('updated', 'enclosure', enclosure1.id),
+            ('updated', 'animal', animal1.id),
+            ('deleted', 'animal', animal1.id),
+        ]
+        assert [change['version'] for change in changes['changes']] == \
+            list(range(since + 1, zoo1.version + 1))
+
+    def test_get_changes_up_to_date(self, zoo1: Zoo, animal1: Animal):
+        """Test getting the changes when nothing has changed since."""
+        zoo1.add_animal(animal1)
+        assert zoo1.get_changes(zoo1.version) == {
+            'version': zoo1.version, 'epoch': zoo1.epoch, 'resync': False, 'changes': []}
+
+    def test_get_changes_other_epoch(self, zoo1: Zoo, animal1: Animal, animal2: Animal):
+        """Test that versions of another zoo, e.g. the one before a 
+        restart, are answered with resync, except for the empty zoo."""
+        other = Zoo()
+        other.add_animal(animal1)
+        zoo1.add_animal(animal2)
+        assert zoo1.get_changes(1, zoo1.epoch)['resync'] is False
+        assert zoo1.get_changes(1, other.epoch)['resync'] is True
+        assert zoo1.get_changes(1, '')['resync'] is True
+        assert [change['id'] for change in zoo1.get_changes(0, other.epoch)['changes']] == [animal2.id]
+
+    def test_get_changes_not_available(self, animal1: Animal, animal2: Animal, animal3: Animal):
+        """Test getting changes that are not kept anymore or versions 
+        newer than the current one."""
+        zoo = Zoo(change_log_size=2)
+        zoo.add_animal(animal1)
+        zoo.add_animal(animal2)
+        zoo.add_animal(animal3)
+
+        assert zoo.get_changes(0)['resync'] is True
+        assert zoo.get_changes(0)['changes'] == []
+        changes = zoo.get_changes(1)
+        assert changes['resync'] is False
+        assert [change['id'] for change in changes['changes']] == [animal2.id, animal3.id]
+        assert zoo.get_changes(zoo.version + 1)['resync'] is True
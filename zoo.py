@@ -1,13 +1,204 @@
+import uuid
+import heapq
 import datetime
+import functools
+import itertools
+from collections import deque
+from typing import Callable, Iterable, Iterator
 
+from zoo_collections import DueIndex, EntitySet, TimestampRecord
+from zoo_concurrency import ReadWriteLock
 from zoo_objects import Animal, Caretaker, Enclosure
 
+# days until a task has to be done again after it has been recorded
+TASK_INTERVALS = {'feeding': 2, 'medical': 35, 'cleaning': 3}
+
+# the number of changes the change log of a zoo keeps by default
+CHANGE_LOG_SIZE = 10_000
+
+
+def round_robin(caretakers: list[Caretaker]) -> Iterator[str]:
+    """Select a responsible caretaker by just going through the list
+    of available caretakers. If at the end of the list start again from
+    the beginning."""
+    if not caretakers:
+        while True:
+            yield ''
+
+    idx = 0
+    while True:
+        yield caretakers[idx].id
+        idx = (idx + 1) % len(caretakers)
+
+
+def least_loaded(caretakers: list[Caretaker]) -> Iterator[str]:
+    """Select the caretaker with the fewest animals, counting both the 
+    animals already assigned and the tasks handed out so far. On a tie 
+    the caretaker that comes first in the list gets selected.
+
+    The caretakers are kept in a heap, so selecting one is O(log c)."""
+    if not caretakers:
+        while True:
+            yield ''
+
+    heap = [(len(caretaker.get_animals()), idx, caretaker.id)
+            for idx, caretaker in enumerate(caretakers)]
+    heapq.heapify(heap)
+    while True:
+        load, idx, caretaker_id = heap[0]
+        heapq.heapreplace(heap, (load + 1, idx, caretaker_id))
+        yield caretaker_id
+
+
+# all strategies that can be used to assign caretakers when generating
+# a plan; add a new one by mapping its name to a function that yields
+# the IDs of the selected caretakers
+CARETAKER_STRATEGIES: dict[str, Callable[[list[Caretaker]], Iterator[str]]] = {
+    'round_robin': round_robin,
+    'least_loaded': least_loaded,
+}
+
+
+def cached_until_changed(method: Callable) -> Callable:
+    """Cache the result of a Zoo method per combination of arguments 
+    until the zoo changes, which is detected via its version.
+
+    The cached result gets returned to every caller, so it must not be 
+    modified."""
+    @functools.wraps(method)
+    def wrapper(self: 'Zoo', *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+
+        result = method(self, *args, **kwargs)
+        self._cache[key] = (self._version, result)
+        return result
+    return wrapper
+
 
 class Zoo:
-    def __init__(self) -> None:
-        self.animals: list[Animal] = []
-        self.caretakers: list[Caretaker] = []
-        self.enclosures: list[Enclosure] = []
+    def __init__(self, change_log_size: int = CHANGE_LOG_SIZE) -> None:
+        self.animals: EntitySet[Animal] = EntitySet()
+        self.caretakers: EntitySet[Caretaker] = EntitySet()
+        self.enclosures: EntitySet[Enclosure] = EntitySet()
+
+        # running amount of animals per species, kept up to date by
+        # add_animal and remove_animal
+        self._species_count: dict[str, int] = {}
+
+        # running histogram of how many caretakers care for a certain
+        # amount of animals (amount of animals -> number of caretakers),
+        # kept up to date by the caretakers themselves
+        self._caretaker_loads: dict[int, int] = {}
+        self._total_caretaker_load = 0
+        self._min_caretaker_load = 0
+        self._max_caretaker_load = 0
+
+        # running amount of animals living in enclosures and the
+        # enclosures with more than one species, kept up to date by the
+        # enclosures themselves
+        self._enclosure_animals = 0
+        self._mixed_enclosures: EntitySet[Enclosure] = EntitySet()
+
+        # IDs of animals and enclosures ordered by the date their next
+        # feeding, medical checkup or cleaning is due
+        self._due_indexes: dict[str, DueIndex] = {
+            task: DueIndex() for task in TASK_INTERVALS}
+
+        # increases with every change of the zoo or one of its objects,
+        # the results of expensive methods are cached until it changes
+        self._version = 0
+        # tells the versions of this zoo apart from the ones of another
+        # zoo, e.g. the one before a restart, as both start at 0
+        self._epoch = uuid.uuid4().hex[:8]
+        self._cache: dict[tuple, tuple[int, object]] = {}
+
+        # increase with every change of an animal, caretaker or 
+        # enclosure or when one gets added or removed
+        self._collection_versions = {
+            'animals': 0, 'caretakers': 0, 'enclosures': 0}
+
+        # the latest changes as (version, operation, entity type, ID),
+        # every version of the zoo has exactly one entry
+        self._change_log: deque[tuple[int, str, str, str]] = deque(maxlen=change_log_size)
+
+        # guards the zoo and all of its objects when they are used by
+        # several threads: hold lock.read() while reading and
+        # lock.write() while changing anything, the methods of the zoo
+        # do not take it themselves
+        self.lock = ReadWriteLock()
+
+        # gets called with every change of the zoo as a tuple of the
+        # operation and its arguments, e.g. to write it to a log; see
+        # zoo_persistence for all operations
+        self.journal: Callable[[tuple], object] | None = None
+
+    @property
+    def version(self) -> int:
+        """Return the current version of the zoo, which increases with
+        every change of the zoo or one of its objects."""
+        return self._version
+
+    @property
+    def epoch(self) -> str:
+        """Return the epoch of the zoo, which tells its versions apart
+        from the ones of other zoos."""
+        return self._epoch
+
+    def collection_version(self, collection: str) -> int | None:
+        """Return the current version of 'animals', 'caretakers' or 
+        'enclosures', which increases with every change of one of their
+        objects and when objects get added or removed."""
+        return self._collection_versions.get(collection)
+
+    def get_changes(self, since: int, epoch: str | None = None) -> dict:
+        """Return all changes after the given version of the zoo, oldest
+        first, together with the current version and the epoch.
+
+        Only the latest changes are kept. If some of the requested 
+        changes are not available anymore, the version is newer than
+        the current one or it belongs to another epoch (by default the
+        one of this zoo), no changes get returned and 'resync' is True.
+        The client then has to load everything again. Version 0 is the
+        empty zoo in every epoch."""
+        first_version = self._version - len(self._change_log)
+        other_epoch = since > 0 and epoch is not None and epoch != self._epoch
+        if other_epoch or since < first_version or since > self._version:
+            return {'version': self._version, 'epoch': self._epoch, 'resync': True, 'changes': []}
+
+        # read only the requested changes from the end of the log
+        latest = list(itertools.islice(reversed(self._change_log), self._version - since))
+        changes = [{'version': version, 'operation': operation,
+                    'type': entity_type, 'id': obj_id}
+                   for version, operation, entity_type, obj_id in reversed(latest)]
+        return {'version': self._version, 'epoch': self._epoch, 'resync': False, 'changes': changes}
+
+    def _changed(self, obj: Animal | Caretaker | Enclosure, operation: str) -> None:
+        """Increase the version of the zoo and the collection of the 
+        given object and add the change to the change log."""
+        if isinstance(obj, Animal):
+            collection, entity_type = 'animals', 'animal'
+        elif isinstance(obj, Caretaker):
+            collection, entity_type = 'caretakers', 'caretaker'
+        else:
+            collection, entity_type = 'enclosures', 'enclosure'
+        self._version += 1
+        self._collection_versions[collection] += 1
+        self._change_log.append((self._version, operation, entity_type, obj.id))
+
+    def _log(self, *entry) -> None:
+        """Hand a change over to the journal of this zoo, if there is
+        one. Objects are passed by their ID, only the added ones are
+        passed themselves."""
+        if self.journal is not None:
+            self.journal(entry)
+
+    def _object_changed(self, obj: Animal | Caretaker | Enclosure) -> None:
+        """Called by the animals, caretakers and enclosures of this zoo
+        whenever they change."""
+        self._changed(obj, 'updated')
 
     def add_animal(self, animal: Animal) -> None:
         """Add an animal to the zoo, but only if it does not already 
@@ -16,8 +207,34 @@ class Zoo:
         if not isinstance(animal, Animal):
             return
 
-        if animal not in self.animals:
-            self.animals.append(animal)
+        if self.animals.add(animal):
+            animal._zoo = self
+            species_name = animal.species_name
+            self._species_count[species_name] = self._species_count.get(species_name, 0) + 1
+            self._update_due_date(animal, 'feeding')
+            self._update_due_date(animal, 'medical')
+            self._changed(animal, 'created')
+            self._log('add_animal', animal)
+
+    def add_animals(self, animals: Iterable[Animal]) -> int:
+        """Add many animals at once, but only the ones that do not
+        already exist. Return the number of added animals."""
+        added = []
+        for animal in animals:
+            if isinstance(animal, Animal) and self.animals.add(animal):
+                animal._zoo = self
+                species_name = animal.species_name
+                self._species_count[species_name] = self._species_count.get(species_name, 0) + 1
+                self._changed(animal, 'created')
+                added.append(animal)
+
+        # add all new animals to the due indexes at once
+        for task in ('feeding', 'medical'):
+            self._due_indexes[task].update_many(
+                (animal.id, self._next_due_date(animal, task)) for animal in added)
+        if added:
+            self._log('add_animals', added)
+        return len(added)
 
     def remove_animal(self, animal: Animal) -> None:
         """Remove an animal from the zoo, but only if it exists.
@@ -29,7 +246,18 @@ class Zoo:
         if animal in self.animals:
             animal.unset_home()
             animal.unset_caretaker()
-            self.animals.remove(animal)
+            self.animals.discard(animal)
+
+            animal._zoo = None
+            species_name = animal.species_name
+            if self._species_count[species_name] == 1:
+                del self._species_count[species_name]
+            else:
+                self._species_count[species_name] -= 1
+            self._due_indexes['feeding'].discard(animal.id)
+            self._due_indexes['medical'].discard(animal.id)
+            self._changed(animal, 'deleted')
+            self._log('remove_animal', animal.id)
 
     def get_animal(self, animal_id: str) -> Animal | None:
         """Return an animal, but only if an animal with the given ID 
@@ -37,27 +265,136 @@ class Zoo:
         if not isinstance(animal_id, str):
             return
 
-        for animal in self.animals:
-            if animal.id == animal_id:
-                return animal
+        return self.animals.get(animal_id)
 
-    def get_all_animals(self) -> list[Animal]:
-        """Return a list of all animals."""
+    def get_all_animals(self) -> EntitySet[Animal]:
+        """Return all animals in the order they were added. They can be
+        iterated and indexed like a list."""
         return self.animals
 
+    @cached_until_changed
     def get_animal_stats(self) -> dict:
         """Return some statistics about animals:
 
         - Amount of animals per species."""
+        return {'animals_per_species': dict(self._species_count)}
+
+    def check_stats(self) -> bool:
+        """Recount all statistics that are kept up to date while the zoo
+        changes and return whether they match the maintained values.
+
+        This walks through all objects, so only use it for debugging
+        and testing."""
+        for enclosure in self.enclosures:
+            species_count = {}
+            for animal in enclosure.get_animals():
+                species_name = animal.species_name
+                species_count[species_name] = species_count.get(species_name, 0) + 1
+            if species_count != enclosure._species_count:
+                return False
+
+        return self._recount_stats() == {
+            'species_count': self._species_count,
+            'caretaker_loads': self._caretaker_loads,
+            'total_caretaker_load': self._total_caretaker_load,
+            'min_caretaker_load': self._min_caretaker_load,
+            'max_caretaker_load': self._max_caretaker_load,
+            'enclosure_animals': self._enclosure_animals,
+            'mixed_enclosures': set(self._mixed_enclosures.ids()),
+        }
+
+    def restore(self, animals: list[Animal], caretakers: list[Caretaker],
+                enclosures: list[Enclosure], version: int = 0,
+                collection_versions: dict[str, int] | None = None,
+                epoch: str | None = None) -> None:
+        """Fill an empty zoo with objects that already are linked with
+        each other, e.g. loaded from a snapshot, but only if the zoo is
+        empty.
+
+        This skips the checks and the bookkeeping the add methods do for
+        every object. Instead all statistics and due dates get computed
+        once at the end. Nothing gets added to the change log.
+
+        The zoo continues with the given versions and epoch of the saved
+        zoo, so that clients that followed its changes do not mistake
+        the new versions for the ones they already know, they have to
+        resync instead."""
+        if self.animals or self.caretakers or self.enclosures:
+            return
+
+        self._version = version
+        if epoch is not None:
+            self._epoch = epoch
+        if collection_versions is not None:
+            self._collection_versions.update(collection_versions)
+
+        self.animals = EntitySet.from_unique(animals)
+        self.caretakers = EntitySet.from_unique(caretakers)
+        self.enclosures = EntitySet.from_unique(enclosures)
+        for objects in (animals, caretakers, enclosures):
+            for obj in objects:
+                obj._zoo = self
+
+        for enclosure in enclosures:
+            species_count = {}
+            for animal in enclosure.animals:
+                species_name = animal.species_name
+                species_count[species_name] = species_count.get(species_name, 0) + 1
+            enclosure._species_count = species_count
+        self._rebuild_stats()
+
+        for task, due_index in self._due_indexes.items():
+            objects = enclosures if task == 'cleaning' else animals
+            due_index.update_many((obj.id, self._next_due_date(obj, task)) for obj in objects)
+
+    def _rebuild_stats(self) -> None:
+        """Recalculate all maintained statistics from scratch.
+
+        This is only a fallback, e.g. after objects have been added 
+        without going through the add methods."""
+        stats = self._recount_stats()
+        self._species_count = stats['species_count']
+        self._caretaker_loads = stats['caretaker_loads']
+        self._total_caretaker_load = stats['total_caretaker_load']
+        self._min_caretaker_load = stats['min_caretaker_load']
+        self._max_caretaker_load = stats['max_caretaker_load']
+        self._enclosure_animals = stats['enclosure_animals']
+        self._mixed_enclosures = EntitySet()
+        for enclosure in self.enclosures:
+            if enclosure.id in stats['mixed_enclosures']:
+                self._mixed_enclosures.add(enclosure)
+
+    def _recount_stats(self) -> dict:
+        """Count all statistics by walking through all objects."""
         species_count = {}
-        for animal in self.get_all_animals():
+        for animal in self.animals:
             species_name = animal.species_name
             if species_name in species_count:
                 species_count[species_name] += 1
             else:
                 species_count[species_name] = 1
 
-        return {'animals_per_species': species_count}
+        caretaker_loads = {}
+        for caretaker in self.caretakers:
+            load = len(caretaker.get_animals())
+            caretaker_loads[load] = caretaker_loads.get(load, 0) + 1
+
+        enclosure_animals = 0
+        mixed_enclosures = set()
+        for enclosure in self.enclosures:
+            enclosure_animals += len(enclosure.get_animals())
+            if len({animal.species_name for animal in enclosure.get_animals()}) > 1:
+                mixed_enclosures.add(enclosure.id)
+
+        return {
+            'species_count': species_count,
+            'caretaker_loads': caretaker_loads,
+            'total_caretaker_load': sum(load * count for load, count in caretaker_loads.items()),
+            'min_caretaker_load': min(caretaker_loads, default=0),
+            'max_caretaker_load': max(caretaker_loads, default=0),
+            'enclosure_animals': enclosure_animals,
+            'mixed_enclosures': mixed_enclosures,
+        }
 
     def add_caretaker(self, caretaker: Caretaker) -> None:
         """Add a new caretaker to the zoo, but only if she/he does not 
@@ -65,8 +402,11 @@ class Zoo:
         if not isinstance(caretaker, Caretaker):
             return
 
-        if caretaker not in self.caretakers:
-            self.caretakers.append(caretaker)
+        if self.caretakers.add(caretaker):
+            caretaker._zoo = self
+            self._add_caretaker_load(len(caretaker.get_animals()))
+            self._changed(caretaker, 'created')
+            self._log('add_caretaker', caretaker)
 
     def remove_caretaker(self, caretaker: Caretaker) -> bool | None:
         """Remove a caretaker from the zoo, but only if she/he
@@ -84,48 +424,114 @@ class Zoo:
                 new_caretaker = next(
                     (c for c in self.caretakers if c != caretaker), None)
 
+                # iterate over a copy, because moving an animal removes
+                # it from the caretaker's animals
                 if new_caretaker:
-                    for animal in caretaker.get_animals():
+                    for animal in list(caretaker.get_animals()):
                         animal.set_caretaker(new_caretaker)
-                self.caretakers.remove(caretaker)
+                self.caretakers.discard(caretaker)
+                self._remove_caretaker_load(len(caretaker.get_animals()))
+                caretaker._zoo = None
+                self._changed(caretaker, 'deleted')
+                self._log('remove_caretaker', caretaker.id)
         return True
 
+    def add_caretakers(self, caretakers: Iterable[Caretaker]) -> int:
+        """Add many caretakers at once, but only the ones that do not
+        already exist. Return the number of added caretakers."""
+        count = len(self.caretakers)
+        for caretaker in caretakers:
+            self.add_caretaker(caretaker)
+        return len(self.caretakers) - count
+
     def get_caretaker(self, caretaker_id: str) -> Caretaker | None:
         """Return a caretaker, but only if a caretaker with the given 
         ID exists."""
         if not isinstance(caretaker_id, str):
             return
 
-        for caretaker in self.caretakers:
-            if caretaker.id == caretaker_id:
-                return caretaker
+        return self.caretakers.get(caretaker_id)
 
-    def get_all_caretakers(self) -> list[Caretaker]:
-        """Return a list of all caretakers."""
+    def get_all_caretakers(self) -> EntitySet[Caretaker]:
+        """Return all caretakers in the order they were added. They can
+        be iterated and indexed like a list."""
         return self.caretakers
 
+    @cached_until_changed
     def get_caretaker_stats(self) -> dict:
         """Return some statistics about caretakers:
 
         - minimum number of animals assigned to one caretaker
         - maximum number of animals assigned to one caretaker
         - average number of animals assigned to caretakers."""
-        animals_under_supervision = [
-            len(caretaker.get_animals()) for caretaker in self.caretakers]
+        caretakers = len(self.caretakers)
         return {
-            'minimum_animals_under_supervision': 0 if not animals_under_supervision else min(animals_under_supervision),
-            'maximum_animals_under_supervision': 0 if not animals_under_supervision else max(animals_under_supervision),
-            'average_animals_under_supervision': 0 if not animals_under_supervision else sum(animals_under_supervision) / len(animals_under_supervision)
+            'minimum_animals_under_supervision': self._min_caretaker_load,
+            'maximum_animals_under_supervision': self._max_caretaker_load,
+            'average_animals_under_supervision': 0 if not caretakers else self._total_caretaker_load / caretakers
         }
 
+    def _add_caretaker_load(self, load: int) -> None:
+        """Add a caretaker with the given amount of animals to the 
+        caretaker load histogram."""
+        if not self._caretaker_loads:
+            self._min_caretaker_load = self._max_caretaker_load = load
+        else:
+            self._min_caretaker_load = min(self._min_caretaker_load, load)
+            self._max_caretaker_load = max(self._max_caretaker_load, load)
+        self._caretaker_loads[load] = self._caretaker_loads.get(load, 0) + 1
+        self._total_caretaker_load += load
+
+    def _remove_caretaker_load(self, load: int) -> None:
+        """Remove a caretaker with the given amount of animals from the 
+        caretaker load histogram."""
+        self._caretaker_loads[load] -= 1
+        self._total_caretaker_load -= load
+        if self._caretaker_loads[load] > 0:
+            return
+
+        del self._caretaker_loads[load]
+        if not self._caretaker_loads:
+            self._min_caretaker_load = self._max_caretaker_load = 0
+        # only walk through the distinct loads if an extreme vanished
+        elif load == self._min_caretaker_load:
+            self._min_caretaker_load = min(self._caretaker_loads)
+        elif load == self._max_caretaker_load:
+            self._max_caretaker_load = max(self._caretaker_loads)
+
+    def _caretaker_load_changed(self, old_load: int, new_load: int) -> None:
+        """Update the caretaker load histogram after an animal has been
+        assigned to or removed from a caretaker of this zoo.
+
+        The load only changes by one, so the new minimum or maximum is 
+        always a neighbour of the old one."""
+        self._caretaker_loads[old_load] -= 1
+        if self._caretaker_loads[old_load] == 0:
+            del self._caretaker_loads[old_load]
+        self._caretaker_loads[new_load] = self._caretaker_loads.get(new_load, 0) + 1
+        self._total_caretaker_load += new_load - old_load
+
+        if new_load > old_load:
+            self._max_caretaker_load = max(self._max_caretaker_load, new_load)
+            if old_load == self._min_caretaker_load and old_load not in self._caretaker_loads:
+                self._min_caretaker_load = new_load
+        else:
+            self._min_caretaker_load = min(self._min_caretaker_load, new_load)
+            if old_load == self._max_caretaker_load and old_load not in self._caretaker_loads:
+                self._max_caretaker_load = new_load
+
     def add_enclosure(self, enclosure: Enclosure) -> None:
         """Add a new enclosure to the zoo, but only if it does not 
         already exist."""
         if not isinstance(enclosure, Enclosure):
             return
 
-        if enclosure not in self.enclosures:
-            self.enclosures.append(enclosure)
+        if self.enclosures.add(enclosure):
+            enclosure._zoo = self
+            self._enclosure_changed(enclosure, len(enclosure.get_animals()))
+            self._update_due_date(enclosure, 'cleaning')
+            self._changed(enclosure, 'created')
+            self._log('add_enclosure', enclosure)
 
     def remove_enclosure(self, enclosure: Enclosure) -> bool | None:
         """Remove an enclosure from the zoo, but only if it exists.
@@ -147,26 +553,52 @@ class Zoo:
                 new_enclosure = next(
                     (e for e in self.enclosures if e != enclosure), None)
 
+                # iterate over a copy, because moving an animal removes
+                # it from the enclosure's animals
                 if new_enclosure:
-                    for animal in enclosure.get_animals():
+                    for animal in list(enclosure.get_animals()):
                         animal.set_home(new_enclosure)
-                self.enclosures.remove(enclosure)
+                self.enclosures.discard(enclosure)
+                self._enclosure_animals -= len(enclosure.get_animals())
+                self._mixed_enclosures.discard(enclosure)
+                self._due_indexes['cleaning'].discard(enclosure.id)
+                enclosure._zoo = None
+                self._changed(enclosure, 'deleted')
+                self._log('remove_enclosure', enclosure.id)
         return True
 
+    def add_enclosures(self, enclosures: Iterable[Enclosure]) -> int:
+        """Add many enclosures at once, but only the ones that do not
+        already exist. Return the number of added enclosures."""
+        added = []
+        for enclosure in enclosures:
+            if isinstance(enclosure, Enclosure) and self.enclosures.add(enclosure):
+                enclosure._zoo = self
+                self._enclosure_changed(enclosure, len(enclosure.get_animals()))
+                self._changed(enclosure, 'created')
+                added.append(enclosure)
+
+        # add all new enclosures to the due index at once
+        self._due_indexes['cleaning'].update_many(
+            (enclosure.id, self._next_due_date(enclosure, 'cleaning')) for enclosure in added)
+        if added:
+            self._log('add_enclosures', added)
+        return len(added)
+
     def get_enclosure(self, enclosure_id: str) -> Enclosure | None:
         """Return an enclosure, but only if an enclosure with the given 
         ID exists."""
         if not isinstance(enclosure_id, str):
             return
 
-        for enclosure in self.enclosures:
-            if enclosure.id == enclosure_id:
-                return enclosure
+        return self.enclosures.get(enclosure_id)
 
-    def get_all_enclosures(self) -> list[Enclosure]:
-        """Return a list of all enclosures."""
+    def get_all_enclosures(self) -> EntitySet[Enclosure]:
+        """Return all enclosures in the order they were added. They can
+        be iterated and indexed like a list."""
         return self.enclosures
 
+    @cached_until_changed
     def get_enclosure_stats(self) -> dict:
         """Return some statistics about enclosures:
 
@@ -177,14 +609,8 @@ class Zoo:
         I decided to use enclosure ID as key instead of the whole object
         because I could not manage to encode the dictionaries in the API
         otherwise."""
-        animals_in_enclosures = [len(enclosure.get_animals())
-                                 for enclosure in self.enclosures]
-
-        enclosures_with_multiple_species = {}
-        for enclosure in self.enclosures:
-            animal_species_names = sorted({animal.species_name for animal in enclosure.get_animals()})
-            if len(animal_species_names) > 1:
-                enclosures_with_multiple_species[enclosure.id] = animal_species_names
+        enclosures_with_multiple_species = {
+            enclosure.id: enclosure.get_species() for enclosure in self._mixed_enclosures}
 
         available_space_per_animal_per_enclosure = {}
         for enclosure in self.enclosures:
@@ -195,67 +621,263 @@ class Zoo:
                 available_space_per_animal_per_enclosure[enclosure.id] = enclosure.area / animals
 
         return {
-            'average_animals_per_enclosure': 0 if not animals_in_enclosures else sum(animals_in_enclosures) / len(animals_in_enclosures),
+            'average_animals_per_enclosure': 0 if not self.enclosures else self._enclosure_animals / len(self.enclosures),
             'enclosures_with_multiple_species': enclosures_with_multiple_species,
             'available_space_per_animal_per_enclosure': available_space_per_animal_per_enclosure
         }
 
-    def generate_feeding_plan(self) -> dict:
-        """Generate a feeding plan for every animal."""
+    def _enclosure_changed(self, enclosure: Enclosure, animals_delta: int) -> None:
+        """Update the enclosure statistics after animals have moved in
+        or out of an enclosure of this zoo."""
+        self._enclosure_animals += animals_delta
+        if len(enclosure._species_count) > 1:
+            self._mixed_enclosures.add(enclosure)
+        else:
+            self._mixed_enclosures.discard(enclosure)
+
+    @cached_until_changed
+    def generate_feeding_plan(self, strategy: str = 'round_robin') -> dict | None:
+        """Generate a feeding plan for every animal.
+
+        The strategy decides how the caretakers get selected, see 
+        CARETAKER_STRATEGIES."""
+        if strategy not in CARETAKER_STRATEGIES:
+            return
+
         feeding_plan = {}
-        idx = 0
+        caretakers = CARETAKER_STRATEGIES[strategy](list(self.caretakers))
         for animal in self.animals:
-            feeding_date = self._calculate_next_date(animal.feeding_record, 2)
-            selected_caretaker, idx = self._select_caretaker(idx)
+            feeding_date = self._calculate_next_date(animal.feeding_record, TASK_INTERVALS['feeding'])
 
             feeding_plan[animal.id] = {
-                'date': feeding_date, 'caretaker': selected_caretaker}
+                'date': feeding_date, 'caretaker': next(caretakers)}
 
         return feeding_plan
 
-    def generate_medical_plan(self) -> dict:
-        """Generate a medical checkup plan for every animal."""
+    @cached_until_changed
+    def generate_medical_plan(self, strategy: str = 'round_robin') -> dict | None:
+        """Generate a medical checkup plan for every animal.
+
+        The strategy decides how the caretakers get selected, see 
+        CARETAKER_STRATEGIES."""
+        if strategy not in CARETAKER_STRATEGIES:
+            return
+
         medical_plan = {}
-        idx = 0
+        caretakers = CARETAKER_STRATEGIES[strategy](list(self.caretakers))
         for animal in self.animals:
-            medical_date = self._calculate_next_date(animal.medical_record, 35)
-            selected_caretaker, idx = self._select_caretaker(idx)
+            medical_date = self._calculate_next_date(animal.medical_record, TASK_INTERVALS['medical'])
 
             medical_plan[animal.id] = {
-                'date': medical_date, 'caretaker': selected_caretaker}
+                'date': medical_date, 'caretaker': next(caretakers)}
 
         return medical_plan
 
-    def generate_cleaning_plan(self) -> dict:
-        """Generate a cleaning plan for every enclosure."""
+    @cached_until_changed
+    def generate_cleaning_plan(self, strategy: str = 'round_robin') -> dict | None:
+        """Generate a cleaning plan for every enclosure.
+
+        The strategy decides how the caretakers get selected, see 
+        CARETAKER_STRATEGIES."""
+        if strategy not in CARETAKER_STRATEGIES:
+            return
+
         cleaning_plan = {}
-        idx = 0
+        caretakers = CARETAKER_STRATEGIES[strategy](list(self.caretakers))
         for enclosure in self.enclosures:
             cleaning_date = self._calculate_next_date(
-                enclosure.cleaning_record, 3)
-            selected_caretaker, idx = self._select_caretaker(idx)
+                enclosure.cleaning_record, TASK_INTERVALS['cleaning'])
 
             cleaning_plan[enclosure.id] = {
-                'date': cleaning_date, 'caretaker': selected_caretaker}
+                'date': cleaning_date, 'caretaker': next(caretakers)}
 
         return cleaning_plan
 
-    def _calculate_next_date(self, records: list[datetime.datetime], days: int) -> datetime.datetime:
+    def _calculate_next_date(self, records: TimestampRecord, days: int) -> datetime.datetime:
         """Calculate the next cleaning, feeding or medical checkup 
         date based on the last record."""
-        if not records:
+        last_record = records.last()
+        if last_record is None:
             next_date = datetime.datetime.now()
         else:
-            next_date = records[-1] + datetime.timedelta(days=days)
+            next_date = last_record + datetime.timedelta(days=days)
         return next_date
 
-    def _select_caretaker(self, idx: int) -> tuple[str, int]:
-        """Select a responsibl caretaker by just going through the 
-        list of available caretakers. If at the end of the list start
-        again from the beginning."""
-        if self.caretakers:
-            selected_caretaker = self.caretakers[idx].id
-            idx = (idx + 1) % len(self.caretakers)
+    def get_due_tasks(self, task: str, before: datetime.datetime | None = None, limit: int = 10) -> list[dict] | None:
+        """Return the animals (feeding, medical) or enclosures (cleaning)
+        whose next task is due first, ordered by that date.
+
+        Only return up to limit results and, if given, only the ones 
+        that are due before the given date. Animals and enclosures 
+        without any records are due right away and come first."""
+        if task not in self._due_indexes or not isinstance(limit, int) or limit < 1:
+            return
+
+        now = datetime.datetime.now()
+        return [{'id': item_id, 'date': now if due == datetime.datetime.min else due}
+                for item_id, due in self._due_indexes[task].first(limit, before)]
+
+    def feed_animals(self, animal_ids: Iterable[str] | None = None, species_name: str | None = None,
+                     enclosure_id: str | None = None, caretaker_id: str | None = None,
+                     timestamp: datetime.datetime | None = None) -> dict | None:
+        """Feed many animals at once, see _select_animals for how they
+        get selected. All animals get the same feeding date, by default
+        the current date.
+
+        Return the date, the number of fed animals and the IDs that have
+        not been found."""
+        return self._record_many(self._select_animals(animal_ids, species_name, enclosure_id, caretaker_id),
+                                 Animal.feed, timestamp)
+
+    def vet_animals(self, animal_ids: Iterable[str] | None = None, species_name: str | None = None,
+                    enclosure_id: str | None = None, caretaker_id: str | None = None,
+                    timestamp: datetime.datetime | None = None) -> dict | None:
+        """Same as feed_animals, but adds a medical record instead."""
+        return self._record_many(self._select_animals(animal_ids, species_name, enclosure_id, caretaker_id),
+                                 Animal.vet, timestamp)
+
+    def clean_enclosures(self, enclosure_ids: Iterable[str] | None = None, species_name: str | None = None,
+                         timestamp: datetime.datetime | None = None) -> dict | None:
+        """Clean many enclosures at once, either the ones with the given
+        IDs, the ones where the given species lives or the ones matching
+        both. All enclosures get the same cleaning date, by default the
+        current date.
+
+        Return the date, the number of cleaned enclosures and the IDs
+        that have not been found."""
+        if enclosure_ids is None and species_name is None:
+            return
+
+        not_found = []
+        if enclosure_ids is not None:
+            enclosures, not_found = self._find_all(self.enclosures, enclosure_ids)
+        else:
+            enclosures = list(self.enclosures)
+        if species_name is not None:
+            enclosures = [enclosure for enclosure in enclosures
+                          if species_name in enclosure._species_count]
+        return self._record_many((enclosures, not_found), Enclosure.clean, timestamp)
+
+    def move_animals(self, enclosure: Enclosure, animal_ids: Iterable[str] | None = None,
+                     species_name: str | None = None, enclosure_id: str | None = None,
+                     caretaker_id: str | None = None) -> dict | None:
+        """Move many animals to the given enclosure, see _select_animals
+        for how they get selected. Both the old and the new enclosure get
+        updated per animal in O(1), so this takes O(k) for k animals.
+
+        Return the number of moved animals (animals that already live in
+        the enclosure do not count) and the IDs that have not been 
+        found."""
+        if enclosure not in self.enclosures:
+            return
+        selection = self._select_animals(animal_ids, species_name, enclosure_id, caretaker_id)
+        if selection is None:
+            return
+
+        animals, not_found = selection
+        count = 0
+        for animal in animals:
+            if animal.enclosure is not enclosure:
+                animal.set_home(enclosure)
+                count += 1
+        return {'count': count, 'not_found': not_found}
+
+    def assign_caretaker(self, caretaker: Caretaker, animal_ids: Iterable[str] | None = None,
+                         species_name: str | None = None, enclosure_id: str | None = None,
+                         caretaker_id: str | None = None) -> dict | None:
+        """Assign many animals to the given caretaker, works like 
+        move_animals."""
+        if caretaker not in self.caretakers:
+            return
+        selection = self._select_animals(animal_ids, species_name, enclosure_id, caretaker_id)
+        if selection is None:
+            return
+
+        animals, not_found = selection
+        count = 0
+        for animal in animals:
+            if animal.caretaker is not caretaker:
+                animal.set_caretaker(caretaker)
+                count += 1
+        return {'count': count, 'not_found': not_found}
+
+    def _select_animals(self, animal_ids: Iterable[str] | None, species_name: str | None,
+                        enclosure_id: str | None, caretaker_id: str | None) -> tuple[list[Animal], list[str]] | None:
+        """Return the animals matching all given selectors (IDs, species,
+        enclosure and caretaker) and the IDs that have not been found.
+
+        The animals get taken from the smallest given source, the IDs, 
+        the enclosure, the caretaker or else the whole zoo, and only the
+        other selectors get checked per animal. Return None if no 
+        selector is given."""
+        if animal_ids is None and species_name is None and enclosure_id is None and caretaker_id is None:
+            return
+
+        not_found = []
+        enclosure = caretaker = None
+        if enclosure_id is not None:
+            enclosure = self.get_enclosure(enclosure_id)
+            if enclosure is None:
+                return [], [enclosure_id]
+        if caretaker_id is not None:
+            caretaker = self.get_caretaker(caretaker_id)
+            if caretaker is None:
+                return [], [caretaker_id]
+
+        if animal_ids is not None:
+            animals, not_found = self._find_all(self.animals, animal_ids)
+        elif enclosure is not None:
+            animals = list(enclosure.get_animals())
+        elif caretaker is not None:
+            animals = list(caretaker.get_animals())
         else:
-            selected_caretaker = ''
-        return selected_caretaker, idx
+            animals = list(self.animals)
+
+        animals = [animal for animal in animals
+                   if (species_name is None or animal.species_name == species_name)
+                   and (enclosure is None or animal.enclosure is enclosure)
+                   and (caretaker is None or animal.caretaker is caretaker)]
+        return animals, not_found
+
+    def _find_all(self, objects: EntitySet, ids: Iterable[str]) -> tuple[list, list[str]]:
+        """Return the objects with the given IDs, each only once, and the
+        IDs that have not been found."""
+        found = []
+        not_found = []
+        for obj_id in dict.fromkeys(ids):
+            obj = objects.get(obj_id) if isinstance(obj_id, str) else None
+            if obj is None:
+                not_found.append(obj_id)
+            else:
+                found.append(obj)
+        return found, not_found
+
+    def _record_many(self, selection: tuple[list, list[str]] | None, record: Callable,
+                     timestamp: datetime.datetime | None) -> dict | None:
+        """Add a record with the same date to all selected objects."""
+        if selection is None:
+            return
+        objects, not_found = selection
+        timestamp = timestamp or datetime.datetime.now()
+        for obj in objects:
+            record(obj, timestamp)
+        return {'timestamp': timestamp, 'count': len(objects), 'not_found': not_found}
+
+    def _update_due_date(self, obj: Animal | Enclosure, task: str) -> None:
+        """Move an animal or enclosure to the date its given task is due
+        next."""
+        self._due_indexes[task].update(obj.id, self._next_due_date(obj, task))
+
+    def _next_due_date(self, obj: Animal | Enclosure, task: str) -> datetime.datetime:
+        """Return the date the given task of an animal or enclosure is
+        due next, objects without records are due right away."""
+        last_record = getattr(obj, f'{task}_record').last()
+        if last_record is None:
+            return datetime.datetime.min
+        return last_record + datetime.timedelta(days=TASK_INTERVALS[task])
+
+    def _record_added(self, obj: Animal | Enclosure, task: str, timestamp: datetime.datetime) -> None:
+        """Update the due dates after an animal of this zoo has been fed
+        or checked or an enclosure has been cleaned."""
+        self._update_due_date(obj, task)
+        self._log('record', task, obj.id, timestamp)
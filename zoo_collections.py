@@ -0,0 +1,318 @@
+import heapq
+import bisect
+import datetime
+from array import array
+from typing import Generic, Iterable, Iterator, KeysView, TypeVar
+
+# Every object stored in an EntitySet needs an 'id' attribute
+T = TypeVar('T')
+
+# timestamps are stored as microseconds since this (naive) date
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+class EntitySet(Generic[T]):
+    """An insertion ordered set of zoo objects.
+
+    The objects are stored in a dictionary keyed by their ID, which
+    makes adding, removing and checking for membership O(1) while
+    iterating still returns the objects in the order they were added.
+
+    Every added object also gets an increasing sequence number, which
+    is used to return the objects page by page. Removed objects leave a
+    gap (None) in the order list, so the sequence numbers of the other
+    objects stay valid. Once more than half of the list are gaps it gets
+    compacted."""
+    __slots__ = ('_items', '_seqs', '_order_seqs', '_order', '_next_seq',
+                 '_removed')
+
+    def __init__(self) -> None:
+        self._items: dict[str, T] = {}
+
+        # the sequence numbers and the order only get created with the
+        # first object, as many enclosures and caretakers stay empty
+        self._seqs: dict[str, int] | None = None
+        self._order_seqs: array | None = None
+        self._order: list[T | None] | None = None
+        self._next_seq = 1
+        self._removed = 0
+
+    @classmethod
+    def from_unique(cls, items: Iterable[T]) -> 'EntitySet[T]':
+        """Create a set of objects that are known to have unique IDs,
+        e.g. objects loaded from a snapshot, without checking and adding
+        every object on its own."""
+        entity_set = cls()
+        order = list(items)
+        if order:
+            entity_set._items = {item.id: item for item in order}
+            entity_set._seqs = dict(zip(entity_set._items, range(1, len(order) + 1)))
+            entity_set._order_seqs = array('q', range(1, len(order) + 1))
+            entity_set._order = order
+            entity_set._next_seq = len(order) + 1
+        return entity_set
+
+    def add(self, item: T) -> bool:
+        """Add an object, but only if it does not already exist.
+
+        Return whether the object has been added."""
+        if item.id in self._items:
+            return False
+        if self._order is None:
+            self._seqs = {}
+            self._order_seqs = array('q')
+            self._order = []
+        self._items[item.id] = item
+        self._seqs[item.id] = self._next_seq
+        self._order_seqs.append(self._next_seq)
+        self._order.append(item)
+        self._next_seq += 1
+        return True
+
+    def discard(self, item: T) -> bool:
+        """Remove an object, but only if it exists.
+
+        Return whether the object has been removed."""
+        if self._items.get(item.id) is not item:
+            return False
+        del self._items[item.id]
+        index = bisect.bisect_left(self._order_seqs, self._seqs.pop(item.id))
+        self._order[index] = None
+        self._removed += 1
+
+        if self._removed > len(self._order) // 2 + 16:
+            self._order_seqs = array('q', (self._seqs[obj.id] for obj in self._items.values()))
+            self._order = list(self._items.values())
+            self._removed = 0
+        return True
+
+    def page(self, after: int, limit: int) -> tuple[list[T], int | None]:
+        """Return up to limit objects that were added after the object
+        with the given sequence number (0 to start at the beginning).
+
+        Also return the sequence number to continue with or None if
+        there are no more objects. This takes O(log n + limit), plus
+        the gaps of removed objects that get skipped."""
+        result = []
+        if self._order is None:
+            return result, None
+        index = bisect.bisect_right(self._order_seqs, after)
+        while index < len(self._order):
+            item = self._order[index]
+            if item is not None:
+                if len(result) == limit:
+                    return result, self._seqs[result[-1].id]
+                result.append(item)
+            index += 1
+        return result, None
+
+    def get(self, item_id: str) -> T | None:
+        """Return the object with the given ID or None if it does not
+        exist."""
+        return self._items.get(item_id)
+
+    def ids(self) -> KeysView[str]:
+        """Return a view on the IDs of all objects in insertion
+        order."""
+        return self._items.keys()
+
+    def __contains__(self, item: object) -> bool:
+        item_id = getattr(item, 'id', None)
+        return item_id is not None and self._items.get(item_id) is item
+
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        """Return the object (or a list of the objects for a slice) at
+        the given position in insertion order, like a list does.
+
+        This takes O(1) as long as no objects have been removed since
+        the last compaction and O(n) otherwise."""
+        if self._order is None or self._removed:
+            return list(self._items.values())[index]
+        return self._order[index]
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return f'EntitySet({list(self._items.values())!r})'
+
+
+class TimestampRecord:
+    """An append-only record of timestamps, e.g. feeding or cleaning
+    dates.
+
+    Instead of keeping a list of datetime objects the timestamps are
+    stored as 64 bit integers (microseconds since 1970-01-01) inside an
+    array, which needs 8 bytes per entry. The array only gets created
+    with the first entry. Reading an entry converts it back into a
+    datetime object."""
+    __slots__ = ('_micros',)
+
+    def __init__(self, timestamps: Iterable[datetime.datetime] = ()) -> None:
+        self._micros: array | None = None
+        for timestamp in timestamps:
+            self.append(timestamp)
+
+    @classmethod
+    def from_micros(cls, micros: array) -> 'TimestampRecord':
+        """Create a record from an array of microseconds since
+        1970-01-01, which gets used as it is."""
+        record = cls()
+        if micros:
+            record._micros = micros
+        return record
+
+    def micros(self) -> array:
+        """Return the timestamps as microseconds since 1970-01-01. The
+        array must not be modified."""
+        return self._micros if self._micros is not None else array('q')
+
+    def append(self, timestamp: datetime.datetime) -> None:
+        """Add a new timestamp at the end of the record."""
+        if self._micros is None:
+            self._micros = array('q')
+        self._micros.append((timestamp - _EPOCH) // _MICROSECOND)
+
+    def last(self) -> datetime.datetime | None:
+        """Return the latest timestamp or None if the record is
+        empty."""
+        if not self._micros:
+            return None
+        return _EPOCH + datetime.timedelta(microseconds=self._micros[-1])
+
+    def datetimes(self) -> list[datetime.datetime]:
+        """Return all timestamps as a list of datetime objects."""
+        if not self._micros:
+            return []
+        return [_EPOCH + datetime.timedelta(microseconds=micros)
+                for micros in self._micros]
+
+    def isoformat(self) -> list[str]:
+        """Return all timestamps as ISO 8601 strings."""
+        if not self._micros:
+            return []
+        return [(_EPOCH + datetime.timedelta(microseconds=micros)).isoformat()
+                for micros in self._micros]
+
+    def __getitem__(self, index: int | slice) -> 'datetime.datetime | TimestampRecord':
+        micros = self._micros if self._micros is not None else array('q')
+        if isinstance(index, slice):
+            record = TimestampRecord()
+            record._micros = micros[index]
+            return record
+        return _EPOCH + datetime.timedelta(microseconds=micros[index])
+
+    def __iter__(self) -> Iterator[datetime.datetime]:
+        if not self._micros:
+            return iter(())
+        return (_EPOCH + datetime.timedelta(microseconds=micros)
+                for micros in self._micros)
+
+    def __len__(self) -> int:
+        return 0 if self._micros is None else len(self._micros)
+
+    def __eq__(self, other: object) -> bool:
+        # allow comparing with lists of datetime objects as well
+        if isinstance(other, TimestampRecord):
+            return list(self._micros or ()) == list(other._micros or ())
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'TimestampRecord({list(self)!r})'
+
+
+class DueIndex:
+    """A min-heap of object IDs keyed by the date a task is due next,
+    e.g. the next feeding date of every animal.
+
+    Updating an object does not search the heap for its old entry.
+    Instead every entry carries a token and only the latest token of an
+    object is valid and outdated entries get skipped when reading. Once
+    more than half of the entries are outdated the heap gets rebuilt."""
+    __slots__ = ('_heap', '_tokens', '_counter')
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[datetime.datetime, int, str]] = []
+        self._tokens: dict[str, int] = {}
+        self._counter = 0
+
+    def update(self, item_id: str, due: datetime.datetime) -> None:
+        """Add an object or move it to its new due date."""
+        self._counter += 1
+        self._tokens[item_id] = self._counter
+        heapq.heappush(self._heap, (due, self._counter, item_id))
+        self._compact()
+
+    def _compact(self) -> None:
+        """Rebuild the heap without the outdated entries once they make
+        up more than half of it."""
+        if len(self._heap) > 2 * len(self._tokens) + 16:
+            self._heap = [entry for entry in self._heap
+                          if self._tokens.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+
+    def update_many(self, items: Iterable[tuple[str, datetime.datetime]]) -> None:
+        """Add or move many (ID, due date) pairs at once.
+
+        If there are many new entries compared to the size of the heap
+        they get appended and the heap gets restored once, which takes 
+        O(n) instead of O(k log n) for k single updates."""
+        entries = []
+        for item_id, due in items:
+            self._counter += 1
+            self._tokens[item_id] = self._counter
+            entries.append((due, self._counter, item_id))
+
+        if len(entries) < len(self._heap) // 8:
+            for entry in entries:
+                heapq.heappush(self._heap, entry)
+            if len(self._heap) <= 2 * len(self._tokens) + 16:
+                return
+        else:
+            self._heap.extend(entries)
+
+        if len(self._heap) > 2 * len(self._tokens) + 16:
+            self._heap = [entry for entry in self._heap
+                          if self._tokens.get(entry[2]) == entry[1]]
+        heapq.heapify(self._heap)
+
+    def discard(self, item_id: str) -> None:
+        """Remove an object, but only if it exists."""
+        if self._tokens.pop(item_id, None) is not None:
+            self._compact()
+
+    def first(self, limit: int, before: datetime.datetime | None = None) -> list[tuple[str, datetime.datetime]]:
+        """Return up to limit (ID, due date) pairs with the earliest due
+        dates in ascending order, optionally only the ones that are due 
+        before the given date.
+
+        The heap does not get changed, so it can be read by many threads
+        at once. Instead its tree gets walked in order via a second,
+        small heap of candidates, which takes O(k log k) for k returned
+        objects, plus the outdated entries that get skipped on the
+        way."""
+        result = []
+        candidates = [(self._heap[0], 0)] if self._heap else []
+        while candidates and len(result) < limit:
+            entry, index = heapq.heappop(candidates)
+            due, token, item_id = entry
+            if before is not None and due > before:
+                break
+            if self._tokens.get(item_id) == token:
+                result.append((item_id, due))
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self._heap):
+                    heapq.heappush(candidates, (self._heap[child], child))
+        return result
+
+    def __len__(self) -> int:
+        return len(self._tokens)
@@ -0,0 +1,230 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Callable, Iterator, Mapping, TypeAlias
+
+zoo_: TypeAlias = 'Zoo'
+zoo_object_: TypeAlias = 'Animal | Caretaker | Enclosure'
+
+logger = logging.getLogger(__name__)
+
+# the collection of the zoo for every entity type of the change log
+COLLECTIONS = {'animal': 'animals', 'caretaker': 'caretakers', 'enclosure': 'enclosures'}
+
+
+class ReadWriteLock:
+    """A lock that can be held by many readers at the same time or by a
+    single writer.
+
+    Waiting writers are preferred: as soon as a writer waits no new
+    readers get the lock, so a steady stream of reads cannot starve the
+    writers. The lock is not reentrant, a thread that holds it must not
+    acquire it again."""
+    __slots__ = ('_condition', '_readers', '_writer', '_waiting_writers')
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        """Wait until no writer holds or waits for the lock, then hold
+        it as one of the readers."""
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """Wait until neither readers nor another writer hold the lock,
+        then hold it exclusively."""
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Hold the lock as a reader inside a with statement."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Hold the lock exclusively inside a with statement."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ZooSnapshot:
+    """An immutable view of the animals, caretakers and enclosures of a
+    zoo at one version.
+
+    Every collection maps the IDs of its objects to their encoded JSON in
+    the order the objects were added to the zoo. Snapshots never change,
+    so they can be read by any number of threads without a lock."""
+    __slots__ = ('version', 'animals', 'caretakers', 'enclosures')
+
+    def __init__(self, version: int, collections: dict[str, Mapping[str, str]]) -> None:
+        self.version = version
+        self.animals: Mapping[str, str] = collections['animals']
+        self.caretakers: Mapping[str, str] = collections['caretakers']
+        self.enclosures: Mapping[str, str] = collections['enclosures']
+
+
+class SingleWriter:
+    """Apply all changes to a zoo in a single writer thread and publish
+    snapshots of it, so that readers never have to wait for writers.
+
+    Changes get submitted as functions, which the writer thread calls
+    one after another while holding the write lock of the zoo. A new
+    snapshot gets published at most once every max_staleness seconds,
+    as publishing copies every collection that changed. A change that
+    comes in sooner gets published once the interval has passed, so the
+    snapshot lags behind the zoo by at most max_staleness seconds. A
+    snapshot gets published before the result of the change is handed
+    back, so with a max_staleness of 0 every change is visible in the
+    snapshot once submit returns.
+
+    A new snapshot only encodes the objects that appear in the change log
+    since the previous one and shares the JSON of all other objects with
+    it, only the collections that changed get copied."""
+
+    def __init__(self, zoo: zoo_, encode: Callable[[zoo_object_], str],
+                 max_staleness: float = 0.1) -> None:
+        self.max_staleness = max_staleness
+        self._zoo = zoo
+        self._encode = encode
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        with zoo.lock.read():
+            self.snapshot = self._full_snapshot()
+        self._thread = threading.Thread(target=self._run, name='zoo-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, function: Callable, *args, **kwargs):
+        """Call the function in the writer thread and return its result
+        or raise its exception. If the change has been applied, but the
+        snapshot could not be published, that exception gets raised."""
+        if not self._thread.is_alive():
+            raise RuntimeError('The writer thread is not running')
+        future = Future()
+        self._queue.put((future, function, args, kwargs))
+        return future.result()
+
+    def stop(self) -> None:
+        """Apply the changes that are still waiting, then stop the
+        writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        published = time.monotonic()
+        publish_failed = False
+        while True:
+            # wait for the next change, but only until the stale
+            # snapshot is due
+            timeout = None
+            if not publish_failed and self._zoo.version != self.snapshot.version:
+                timeout = max(0.0, published + self.max_staleness - time.monotonic())
+            try:
+                task = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                task = False
+            if not task:
+                if self._zoo.version != self.snapshot.version:
+                    try:
+                        with self._zoo.lock.read():
+                            self.snapshot = self._next_snapshot()
+                    except Exception:
+                        # try again with the next change
+                        logger.exception('Publishing a snapshot of the zoo failed')
+                        publish_failed = True
+                    published = time.monotonic()
+                if task is None:
+                    return
+                continue
+
+            publish_failed = False
+            future, function, args, kwargs = task
+            error = result = None
+            try:
+                with self._zoo.lock.write():
+                    try:
+                        result = function(*args, **kwargs)
+                    except BaseException as exception:
+                        error = exception
+
+                    # even failed changes may have changed something
+                    if (self._zoo.version != self.snapshot.version
+                            and time.monotonic() - published >= self.max_staleness):
+                        published = time.monotonic()
+                        self.snapshot = self._next_snapshot()
+            except Exception as exception:
+                # the change has been applied, but it is not part of the
+                # snapshot, it gets published again later
+                error = error or exception
+            finally:
+                # always answer, otherwise submit would wait forever
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    def _full_snapshot(self) -> ZooSnapshot:
+        """Encode all objects of the zoo."""
+        encode = self._encode
+        return ZooSnapshot(self._zoo.version, {
+            name: MappingProxyType({obj.id: encode(obj) for obj in getattr(self._zoo, name)})
+            for name in COLLECTIONS.values()})
+
+    def _next_snapshot(self) -> ZooSnapshot:
+        """Apply the changes since the current snapshot to a copy of its
+        collections. If the change log does not reach back that far all
+        objects get encoded again."""
+        previous = self.snapshot
+        changes = self._zoo.get_changes(previous.version)
+        if changes['resync']:
+            return self._full_snapshot()
+
+        collections = {name: getattr(previous, name) for name in COLLECTIONS.values()}
+        copies: dict[str, dict[str, str]] = {}
+        changed = dict.fromkeys((change['type'], change['id']) for change in changes['changes'])
+        for entity_type, obj_id in changed:
+            name = COLLECTIONS[entity_type]
+            if name not in copies:
+                # copy() of a mapping proxy copies the dictionary behind
+                # it at once, dict() would go through it key by key
+                copies[name] = collections[name].copy()
+            obj = getattr(self._zoo, name).get(obj_id)
+            if obj is None:
+                copies[name].pop(obj_id, None)
+            else:
+                copies[name][obj_id] = self._encode(obj)
+
+        for name, copy in copies.items():
+            collections[name] = MappingProxyType(copy)
+        return ZooSnapshot(changes['version'], collections)
@@ -2,22 +2,62 @@ import uuid
 import datetime
 from typing import TypeAlias
 
+from zoo_collections import EntitySet, TimestampRecord
+
 # Use this when normal type aliases for classes do not work correctly
 animal_: TypeAlias = 'Animal'
 enclosure_: TypeAlias = 'Enclosure'
 caretaker_: TypeAlias = 'Caretaker'
+zoo_: TypeAlias = 'Zoo'
+
+
+class ZooObject:
+    """Base class of animals, caretakers and enclosures."""
+    # use slots instead of a __dict__ per object to save memory
+    __slots__ = ('id', '_zoo', '_json', '_version')
+
+    def __init__(self, obj_id: str | None = None) -> None:
+        # only objects that get restored, e.g. from a log, pass their ID
+        self.id: str = obj_id or str(uuid.uuid4())
+
+        # the zoo this object belongs to, it gets notified about every
+        # change of this object
+        self._zoo: zoo_ | None = None
+
+        # the encoded JSON of this object, it gets created by the JSON
+        # provider of the API and dropped with every change
+        self._json: str | None = None
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Return the current version of this object, which increases
+        with every change."""
+        return self._version
+
+    def _changed(self) -> None:
+        """Increase the version, drop the cached JSON and notify the zoo
+        this object belongs to about a change."""
+        self._version += 1
+        self._json = None
+        if self._zoo is not None:
+            self._zoo._object_changed(self)
+
 
+class Animal(ZooObject):
+    __slots__ = ('species_name', 'common_name', 'age', 'enclosure',
+                 'caretaker', 'feeding_record', 'medical_record')
 
-class Animal:
-    def __init__(self, species_name: str, common_name: str, age: int) -> None:
-        self.id: str = str(uuid.uuid4())
+    def __init__(self, species_name: str, common_name: str, age: int,
+                 animal_id: str | None = None) -> None:
+        super().__init__(animal_id)
         self.species_name = species_name
         self.common_name = common_name
         self.age = age
         self.enclosure: Enclosure | None = None
         self.caretaker: Caretaker | None = None
-        self.feeding_record: list[datetime.datetime] = []
-        self.medical_record: list[datetime.datetime] = []
+        self.feeding_record: TimestampRecord = TimestampRecord()
+        self.medical_record: TimestampRecord = TimestampRecord()
 
     def set_home(self, enclosure: enclosure_) -> None:
         """Assign the given enclosure to this animal and add this animal
@@ -35,6 +75,9 @@ class Animal:
             self.enclosure.remove_animal(self)
         self.enclosure = enclosure
         enclosure.add_animal(self)
+        self._changed()
+        if self._zoo is not None:
+            self._zoo._log('set_home', self.id, enclosure.id)
 
     def unset_home(self) -> None:
         """Remove the animal from the enclosure it used to live in and 
@@ -42,6 +85,9 @@ class Animal:
         if self.enclosure is not None:
             self.enclosure.remove_animal(self)
             self.enclosure = None
+            self._changed()
+            if self._zoo is not None:
+                self._zoo._log('unset_home', self.id)
 
     def set_caretaker(self, caretaker: caretaker_) -> None:
         """Assign the given caretaker to this animal and add this animal
@@ -58,6 +104,9 @@ class Animal:
             self.caretaker.remove_animal(self)
         self.caretaker = caretaker
         caretaker.add_animal(self)
+        self._changed()
+        if self._zoo is not None:
+            self._zoo._log('set_caretaker', self.id, caretaker.id)
 
     def unset_caretaker(self) -> None:
         """Remove the animal from the caretaker that cared for it and 
@@ -65,14 +114,25 @@ class Animal:
         if self.caretaker is not None:
             self.caretaker.remove_animal(self)
             self.caretaker = None
-
-    def feed(self) -> None:
-        """Add a new feeding record."""
-        self.feeding_record.append(datetime.datetime.now())
-
-    def vet(self) -> None:
-        """Add a new medical record."""
-        self.medical_record.append(datetime.datetime.now())
+            self._changed()
+            if self._zoo is not None:
+                self._zoo._log('unset_caretaker', self.id)
+
+    def feed(self, timestamp: datetime.datetime | None = None) -> None:
+        """Add a new feeding record, by default with the current date."""
+        timestamp = timestamp or datetime.datetime.now()
+        self.feeding_record.append(timestamp)
+        if self._zoo is not None:
+            self._zoo._record_added(self, 'feeding', timestamp)
+        self._changed()
+
+    def vet(self, timestamp: datetime.datetime | None = None) -> None:
+        """Add a new medical record, by default with the current date."""
+        timestamp = timestamp or datetime.datetime.now()
+        self.medical_record.append(timestamp)
+        if self._zoo is not None:
+            self._zoo._record_added(self, 'medical', timestamp)
+        self._changed()
 
     def birth(self) -> animal_:
         """Give birth to a new animal.
@@ -100,32 +160,50 @@ class Animal:
             "medical_record": self.medical_record,
         }
 
+    def to_summary_json(self) -> dict:
+        """Same as to_json, but instead of the whole feeding and medical
+        records just show the number of records and the latest one."""
+        data = self.to_json()
+        for record in ('feeding_record', 'medical_record'):
+            data[record] = {"count": len(data[record]),
+                            "last": data[record].last()}
+        return data
+
+
+class Caretaker(ZooObject):
+    __slots__ = ('name', 'address', 'animals')
 
-class Caretaker:
-    def __init__(self, name: str, address: str) -> None:
-        self.id: str = str(uuid.uuid4())
+    def __init__(self, name: str, address: str, caretaker_id: str | None = None) -> None:
+        super().__init__(caretaker_id)
         self.name = name
         self.address = address
-        self.animals: list[Animal] = []
+        self.animals: EntitySet[Animal] = EntitySet()
 
     def add_animal(self, animal: Animal) -> None:
         """Add an animal, but only if it does not already exist."""
         if not isinstance(animal, Animal):
             return
 
-        if animal not in self.animals:
-            self.animals.append(animal)
+        if self.animals.add(animal):
+            if self._zoo is not None:
+                load = len(self.animals)
+                self._zoo._caretaker_load_changed(load - 1, load)
+            self._changed()
 
     def remove_animal(self, animal: Animal) -> None:
         """Remove an animal, but only if it exists."""
         if not isinstance(animal, Animal):
             return
 
-        if animal in self.animals:
-            self.animals.remove(animal)
+        if self.animals.discard(animal):
+            if self._zoo is not None:
+                load = len(self.animals)
+                self._zoo._caretaker_load_changed(load + 1, load)
+            self._changed()
 
-    def get_animals(self) -> list[Animal]:
-        """Return a list of animals that this caretaker cares for."""
+    def get_animals(self) -> EntitySet[Animal]:
+        """Return the animals that this caretaker cares for in the order
+        they were assigned. They can be iterated and indexed like a list."""
         return self.animals
 
     def to_json(self) -> dict:
@@ -138,41 +216,68 @@ class Caretaker:
             "id": self.id,
             "name": self.name,
             "address": self.address,
-            "animals": [animal.id for animal in self.animals]
+            "animals": list(self.animals.ids())
         }
 
 
-class Enclosure:
-    def __init__(self, name: str, area: float) -> None:
-        self.id: str = str(uuid.uuid4())
+class Enclosure(ZooObject):
+    __slots__ = ('name', 'area', 'animals', 'cleaning_record',
+                 '_species_count')
+
+    def __init__(self, name: str, area: float, enclosure_id: str | None = None) -> None:
+        super().__init__(enclosure_id)
         self.name = name
         self.area = area
-        self.animals: list[Animal] = []
-        self.cleaning_record: list[datetime.datetime] = []
+        self.animals: EntitySet[Animal] = EntitySet()
+        self.cleaning_record: TimestampRecord = TimestampRecord()
+
+        # amount of animals per species living in this enclosure
+        self._species_count: dict[str, int] = {}
 
     def add_animal(self, animal: Animal) -> None:
         """Add an animal, but only if it does not already exist."""
         if not isinstance(animal, Animal):
             return
 
-        if animal not in self.animals:
-            self.animals.append(animal)
+        if self.animals.add(animal):
+            species_name = animal.species_name
+            self._species_count[species_name] = self._species_count.get(species_name, 0) + 1
+            if self._zoo is not None:
+                self._zoo._enclosure_changed(self, 1)
+            self._changed()
 
     def remove_animal(self, animal: Animal) -> None:
         """Remove an animal, but only if it exists."""
         if not isinstance(animal, Animal):
             return
 
-        if animal in self.animals:
-            self.animals.remove(animal)
-
-    def get_animals(self) -> list[Animal]:
-        """Return a list of animals that live in this enclosure."""
+        if self.animals.discard(animal):
+            species_name = animal.species_name
+            if self._species_count[species_name] == 1:
+                del self._species_count[species_name]
+            else:
+                self._species_count[species_name] -= 1
+            if self._zoo is not None:
+                self._zoo._enclosure_changed(self, -1)
+            self._changed()
+
+    def get_animals(self) -> EntitySet[Animal]:
+        """Return the animals that live in this enclosure in the order
+        they moved in. They can be iterated and indexed like a list."""
         return self.animals
 
-    def clean(self) -> None:
-        """Add a new cleaning record."""
-        self.cleaning_record.append(datetime.datetime.now())
+    def get_species(self) -> list[str]:
+        """Return the sorted names of all species living in this 
+        enclosure."""
+        return sorted(self._species_count)
+
+    def clean(self, timestamp: datetime.datetime | None = None) -> None:
+        """Add a new cleaning record, by default with the current date."""
+        timestamp = timestamp or datetime.datetime.now()
+        self.cleaning_record.append(timestamp)
+        if self._zoo is not None:
+            self._zoo._record_added(self, 'cleaning', timestamp)
+        self._changed()
 
     def to_json(self) -> dict:
         """To avoid circular references use this custom json encoding,
@@ -184,6 +289,6 @@ class Enclosure:
             "id": self.id,
             "name": self.name,
             "area": self.area,
-            "animals": [animal.id for animal in self.animals],
+            "animals": list(self.animals.ids()),
             "cleaning_record": self.cleaning_record
         }
@@ -0,0 +1,747 @@
+import gc
+import os
+import json
+import time
+import pickle
+import datetime
+import threading
+from array import array
+from typing import Any, BinaryIO, Callable, Iterable, NoReturn
+
+from zoo import Zoo
+from zoo_collections import EntitySet, TimestampRecord
+from zoo_objects import Animal, Caretaker, Enclosure
+
+# the first line of every log, followed by the LSN its first entry
+# comes after
+LOG_HEADER = 'lsn'
+
+# the version of the snapshot format, it changes whenever the format
+# changes in an incompatible way
+SNAPSHOT_FORMAT = 1
+
+# snapshots get written in chunks of this size to report their progress
+SNAPSHOT_CHUNK_SIZE = 4 * 2 ** 20
+
+
+def animal_state(animal: Animal) -> dict:
+    """Return everything needed to restore an animal. Whether it also
+    lives in its enclosure gets stored separately, as newborn animals
+    only know the enclosure of their mother."""
+    enclosure = animal.enclosure
+    return {
+        'id': animal.id,
+        'species_name': animal.species_name,
+        'common_name': animal.common_name,
+        'age': animal.age,
+        'enclosure': enclosure.id if enclosure else None,
+        'housed': enclosure is not None and animal in enclosure.get_animals(),
+        'caretaker': animal.caretaker.id if animal.caretaker else None,
+        'feeding_record': animal.feeding_record.isoformat(),
+        'medical_record': animal.medical_record.isoformat(),
+    }
+
+
+def caretaker_state(caretaker: Caretaker) -> dict:
+    """Return everything needed to restore a caretaker, the animals
+    restore the assignments themselves."""
+    return {'id': caretaker.id, 'name': caretaker.name, 'address': caretaker.address}
+
+
+def enclosure_state(enclosure: Enclosure) -> dict:
+    """Return everything needed to restore an enclosure, the animals
+    restore where they live themselves."""
+    return {
+        'id': enclosure.id,
+        'name': enclosure.name,
+        'area': enclosure.area,
+        'cleaning_record': enclosure.cleaning_record.isoformat(),
+    }
+
+
+# how the values of log entries that JSON cannot represent get stored,
+# looked up by their exact type
+STATE_ENCODERS: dict[type, Callable[[Any], Any]] = {
+    datetime.datetime: datetime.datetime.isoformat,
+    Animal: animal_state,
+    Caretaker: caretaker_state,
+    Enclosure: enclosure_state,
+}
+
+
+def encode_value(value: Any) -> Any:
+    """Return a JSON serializable version of a value of a log entry."""
+    encoder = STATE_ENCODERS.get(type(value))
+    if encoder is None:
+        raise TypeError(f'{type(value).__name__} cannot be written to the log')
+    return encoder(value)
+
+
+def read_record(timestamps: list[str]) -> TimestampRecord:
+    return TimestampRecord(map(datetime.datetime.fromisoformat, timestamps))
+
+
+def restore_animal(state: dict) -> Animal:
+    animal = Animal(state['species_name'], state['common_name'], state['age'], state['id'])
+    animal.feeding_record = read_record(state['feeding_record'])
+    animal.medical_record = read_record(state['medical_record'])
+    return animal
+
+
+def link_animal(zoo: Zoo, animal: Animal, state: dict) -> None:
+    """Move a restored animal of the zoo to its enclosure and assign
+    its caretaker."""
+    enclosure = zoo.get_enclosure(state['enclosure']) if state['enclosure'] else None
+    if enclosure is not None:
+        if state['housed']:
+            animal.set_home(enclosure)
+        else:
+            animal.enclosure = enclosure
+    caretaker = zoo.get_caretaker(state['caretaker']) if state['caretaker'] else None
+    if caretaker is not None:
+        animal.set_caretaker(caretaker)
+
+
+def restore_caretaker(state: dict) -> Caretaker:
+    return Caretaker(state['name'], state['address'], state['id'])
+
+
+def restore_enclosure(state: dict) -> Enclosure:
+    enclosure = Enclosure(state['name'], state['area'], state['id'])
+    enclosure.cleaning_record = read_record(state['cleaning_record'])
+    return enclosure
+
+
+def replay_add_animals(zoo: Zoo, states: list[dict]) -> None:
+    animals = [restore_animal(state) for state in states]
+    zoo.add_animals(animals)
+    for animal, state in zip(animals, states):
+        link_animal(zoo, animal, state)
+
+
+def replay_record(zoo: Zoo, task: str, obj_id: str, timestamp: str) -> None:
+    if task == 'cleaning':
+        obj, record = zoo.get_enclosure(obj_id), Enclosure.clean
+    else:
+        obj, record = zoo.get_animal(obj_id), Animal.feed if task == 'feeding' else Animal.vet
+    if obj is not None:
+        record(obj, datetime.datetime.fromisoformat(timestamp))
+
+
+def replay_link(zoo: Zoo, animal_id: str, link: Callable[[Animal], None]) -> None:
+    animal = zoo.get_animal(animal_id)
+    if animal is not None:
+        link(animal)
+
+
+# how every operation of the log gets applied to a zoo, called with the
+# zoo and the arguments of the operation
+OPERATIONS: dict[str, Callable[..., None]] = {
+    'add_animal': lambda zoo, state: replay_add_animals(zoo, [state]),
+    'add_animals': replay_add_animals,
+    'add_caretaker': lambda zoo, state: zoo.add_caretaker(restore_caretaker(state)),
+    'add_enclosure': lambda zoo, state: zoo.add_enclosure(restore_enclosure(state)),
+    'add_enclosures': lambda zoo, states: zoo.add_enclosures(map(restore_enclosure, states)),
+    'remove_animal': lambda zoo, animal_id: zoo.remove_animal(zoo.get_animal(animal_id)),
+    'remove_caretaker': lambda zoo, caretaker_id: zoo.remove_caretaker(zoo.get_caretaker(caretaker_id)),
+    'remove_enclosure': lambda zoo, enclosure_id: zoo.remove_enclosure(zoo.get_enclosure(enclosure_id)),
+    'record': replay_record,
+    'set_home': lambda zoo, animal_id, enclosure_id: replay_link(
+        zoo, animal_id, lambda animal: animal.set_home(zoo.get_enclosure(enclosure_id))),
+    'unset_home': lambda zoo, animal_id: replay_link(zoo, animal_id, Animal.unset_home),
+    'set_caretaker': lambda zoo, animal_id, caretaker_id: replay_link(
+        zoo, animal_id, lambda animal: animal.set_caretaker(zoo.get_caretaker(caretaker_id))),
+    'unset_caretaker': lambda zoo, animal_id: replay_link(zoo, animal_id, Animal.unset_caretaker),
+}
+
+
+class WriteAheadLog:
+    """An append-only log of all changes of a zoo, stored as NDJSON with
+    one [operation, arguments...] array per line.
+
+    Appending only encodes the entry and hands it over to a commit
+    thread, which writes all waiting entries at once and then calls
+    fsync a single time for all of them (group commit). Callers that
+    need an entry to be on disk wait for it via wait(), so many
+    concurrent requests share one fsync instead of paying for one each.
+
+    Every entry gets a log sequence number (LSN). The first line of the
+    file holds the LSN the entries of the file come after, so the entries
+    up to a snapshot can be dropped from the log via truncate."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(log_header(0))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._condition = threading.Condition()
+        self._pending: list[bytes] = []
+        self._appended = 0
+        self._durable = 0
+        # the size of the file up to the last durable entry
+        self._size = self._file.tell()
+        self._error: OSError | None = None
+        self._closed = False
+
+        # truncate pauses the commit thread while it replaces the file
+        self._truncating = threading.Lock()
+        self._paused = False
+        self._committing = False
+
+        # the number of fsync calls, for tests and benchmarks
+        self.commits = 0
+
+        self._thread = threading.Thread(target=self._run, name='zoo-wal', daemon=True)
+        self._thread.start()
+
+    @property
+    def last_lsn(self) -> int:
+        """Return the LSN of the latest appended entry."""
+        return self._appended
+
+    def append(self, entry: tuple) -> int:
+        """Add an entry at the end of the log and return its LSN. The
+        entry is not on disk yet when this returns."""
+        line = json.dumps(entry, default=encode_value, separators=(',', ':')).encode() + b'\n'
+        with self._condition:
+            if self._closed:
+                raise ValueError('The log has already been closed')
+            self._pending.append(line)
+            self._appended += 1
+            self._condition.notify_all()
+            return self._appended
+
+    def wait(self, lsn: int | None = None) -> None:
+        """Wait until the entry with the given LSN, by default every
+        entry appended so far, has been written and synced to disk."""
+        with self._condition:
+            if lsn is None:
+                lsn = self._appended
+            while self._durable < lsn:
+                if self._error is not None:
+                    raise self._error
+                self._condition.wait()
+
+    def close(self) -> None:
+        """Write all waiting entries, then stop the commit thread and
+        close the file."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._file.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._paused or (not self._pending and not self._closed):
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                lines, self._pending = self._pending, []
+                lsn = self._appended
+                self._committing = True
+
+            try:
+                self._file.write(b''.join(lines))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as error:
+                with self._condition:
+                    self._error = error
+                    self._committing = False
+                    self._condition.notify_all()
+                return
+
+            with self._condition:
+                self._durable = lsn
+                self._size = self._file.tell()
+                self._committing = False
+                self.commits += 1
+                self._condition.notify_all()
+
+    def replay(self, zoo: Zoo, after: int = 0) -> int:
+        """Apply all entries of the log after the given LSN to a zoo and
+        return their number. The zoo has to contain exactly the changes
+        up to that LSN, e.g. it has been loaded from a snapshot, or be
+        empty.
+
+        An incomplete last line, which is left behind if the process
+        stopped while writing it, gets cut off so that new entries start
+        on a line of their own. A damaged line before the last one raises
+        a ValueError instead, as cutting it off would drop all valid
+        entries after it. This has to be called before anything gets
+        appended and while the zoo has no journal."""
+        count = 0
+        lsn = 0
+        valid_size = 0
+        size = os.path.getsize(self.path)
+        with open(self.path, 'rb') as file:
+            for line in file:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('incomplete line')
+                    operation, *args = json.loads(line)
+                except ValueError:
+                    if valid_size + len(line) < size:
+                        raise ValueError(f'The entry after LSN {lsn} is damaged, but it is '
+                                         f'not the last line of the log')
+                    break
+                valid_size += len(line)
+                if operation == LOG_HEADER:
+                    lsn = args[0]
+                    if lsn > after:
+                        raise ValueError(f'The log starts after LSN {lsn}, but the zoo '
+                                         f'only contains the changes up to LSN {after}')
+                    continue
+                lsn += 1
+                if lsn > after:
+                    OPERATIONS[operation](zoo, *args)
+                    count += 1
+
+        if valid_size < size:
+            os.truncate(self.path, valid_size)
+        with self._condition:
+            self._appended = self._durable = lsn
+            self._size = valid_size
+        # the zoo is ahead of the log, so it only contains changes that
+        # are part of the zoo already
+        if lsn < after:
+            self.truncate(after)
+        return count
+
+    def truncate(self, lsn: int) -> None:
+        """Drop all entries up to the given LSN from the log, once they
+        are safely stored somewhere else, e.g. in a snapshot.
+
+        The remaining entries get copied to a new file, which replaces
+        the log at once, so a crash leaves either the old or the new log
+        behind. Appending goes on meanwhile: only the entries committed
+        while copying get copied with the commit thread paused, right
+        before the file gets replaced."""
+        # the entries up to the LSN have to be synced, otherwise they
+        # would be copied as entries committed meanwhile
+        self.wait(min(lsn, self.last_lsn))
+        with self._truncating:
+            with self._condition:
+                size = self._size
+            base, offset = self._entry_offset(lsn, size)
+            if lsn <= base:
+                return
+
+            temporary_path = self.path + '.tmp'
+            with open(temporary_path, 'wb') as file:
+                file.write(log_header(lsn))
+                copy_bytes(self.path, offset, size, file)
+
+                with self._condition:
+                    self._paused = True
+                    while self._committing:
+                        self._condition.wait()
+                try:
+                    copy_bytes(self.path, size, self._size, file)
+                    file.flush()
+                    os.fsync(file.fileno())
+                    os.replace(temporary_path, self.path)
+                    sync_directory(self.path)
+                    self._file.close()
+                    self._file = open(self.path, 'ab')
+                finally:
+                    with self._condition:
+                        self._size = self._file.tell()
+                        self._appended = max(self._appended, lsn)
+                        self._durable = max(self._durable, lsn)
+                        self._paused = False
+                        self._condition.notify_all()
+
+    def _entry_offset(self, lsn: int, size: int) -> tuple[int, int]:
+        """Return the LSN the file starts after and the position of the
+        first entry after the given LSN, within the first size bytes of
+        the file."""
+        base = 0
+        offset = 0
+        with open(self.path, 'rb') as file:
+            line = file.readline()
+            if line.startswith(b'["' + LOG_HEADER.encode() + b'"'):
+                base = json.loads(line)[1]
+                offset = len(line)
+            else:
+                file.seek(0)
+            for _ in range(lsn - base):
+                if offset >= size:
+                    break
+                offset += len(file.readline())
+        return base, min(offset, size)
+
+
+def copy_bytes(path: str, start: int, end: int, target: BinaryIO) -> None:
+    """Copy the bytes from start to end of a file to another file."""
+    with open(path, 'rb') as source:
+        source.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = source.read(min(remaining, SNAPSHOT_CHUNK_SIZE))
+            if not chunk:
+                break
+            target.write(chunk)
+            remaining -= len(chunk)
+
+
+def log_header(lsn: int) -> bytes:
+    """Return the first line of a log whose entries come after the
+    given LSN."""
+    return json.dumps([LOG_HEADER, lsn]).encode() + b'\n'
+
+
+def sync_directory(path: str) -> None:
+    """Make sure that a file that has been renamed or created in the
+    directory of the path stays there after a crash."""
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+def string_table(values: Iterable[str]) -> tuple[list[str], array]:
+    """Store values that repeat a lot, like species names, only once:
+    return the distinct values and the index of every value."""
+    table: dict[str, int] = {}
+    indexes = array('i', (table.setdefault(value, len(table)) for value in values))
+    return list(table), indexes
+
+
+def int_column(values: Iterable[int]) -> array | list[int]:
+    """Store integers as an array of 64 bit integers, or as a list if
+    one of them does not fit into 64 bit."""
+    values = list(values)
+    try:
+        return array('q', values)
+    except OverflowError:
+        return values
+
+
+def pack_records(records: Iterable[TimestampRecord]) -> tuple[array, array]:
+    """Return the number of timestamps of every record and all of their
+    timestamps in one array."""
+    counts = array('i')
+    micros = array('q')
+    for record in records:
+        record_micros = record.micros()
+        counts.append(len(record_micros))
+        micros.extend(record_micros)
+    return counts, micros
+
+
+def unpack_records(objects: list, record: str, counts: array, micros: array) -> None:
+    """Give every object its record of timestamps back, objects without
+    timestamps keep the empty record they have been created with."""
+    start = 0
+    for obj, count in zip(objects, counts):
+        if count:
+            setattr(obj, record, TimestampRecord.from_micros(micros[start:start + count]))
+            start += count
+
+
+def pack_members(groups: Iterable[Iterable[Animal]], index: dict[str, int]) -> tuple[array, array]:
+    """Return the number of animals of every enclosure or caretaker and
+    the indexes of all of these animals in one array."""
+    counts = array('i')
+    members = array('i')
+    for animals in groups:
+        start = len(members)
+        members.extend(index[animal.id] for animal in animals)
+        counts.append(len(members) - start)
+    return counts, members
+
+
+def unpack_members(counts: array, members: array, animals: list[Animal]) -> list[list[Animal]]:
+    groups = []
+    start = 0
+    for count in counts:
+        groups.append([animals[idx] for idx in members[start:start + count]])
+        start += count
+    return groups
+
+
+def save_snapshot(zoo: Zoo, path: str, lsn: int,
+                  progress: Callable[[float, int], object] = lambda share, written: None) -> int:
+    """Write all objects of the zoo, which contains the changes up to the
+    given LSN of its log, to a snapshot file and return its size.
+
+    The objects are stored column by column: strings that repeat get
+    stored once, numbers and timestamps as arrays and the links between
+    the objects as indexes. The file gets written next to the old one
+    and then replaces it at once.
+
+    Meanwhile progress gets called with the finished share of the work
+    and the number of bytes written so far: the first half is collecting
+    the objects, the second half writing them."""
+    animals = list(zoo.animals)
+    caretakers = list(zoo.caretakers)
+    enclosures = list(zoo.enclosures)
+    animal_index = {animal.id: idx for idx, animal in enumerate(animals)}
+    enclosure_index = {enclosure.id: idx for idx, enclosure in enumerate(enclosures)}
+    objects = max(1, len(animals) + len(caretakers) + len(enclosures))
+
+    data = {
+        'format': SNAPSHOT_FORMAT,
+        'lsn': lsn,
+        'version': zoo.version,
+        'epoch': zoo.epoch,
+        'collection_versions': dict(zoo._collection_versions),
+        'animals': {
+            'id': [animal.id for animal in animals],
+            'species_name': string_table(animal.species_name for animal in animals),
+            'common_name': string_table(animal.common_name for animal in animals),
+            'age': int_column(animal.age for animal in animals),
+            # the enclosure of newborn animals, which do not live in it
+            'enclosure': array('i', (enclosure_index.get(animal.enclosure.id, -1) if animal.enclosure else -1
+                                     for animal in animals)),
+            'feeding_record': pack_records(animal.feeding_record for animal in animals),
+            'medical_record': pack_records(animal.medical_record for animal in animals),
+        },
+    }
+    progress(len(animals) / objects / 2, 0)
+    data |= {
+        'caretakers': {
+            'id': [caretaker.id for caretaker in caretakers],
+            'name': [caretaker.name for caretaker in caretakers],
+            'address': [caretaker.address for caretaker in caretakers],
+            'animals': pack_members((caretaker.animals for caretaker in caretakers), animal_index),
+        },
+        'enclosures': {
+            'id': [enclosure.id for enclosure in enclosures],
+            'name': [enclosure.name for enclosure in enclosures],
+            'area': array('d', (enclosure.area for enclosure in enclosures)),
+            'cleaning_record': pack_records(enclosure.cleaning_record for enclosure in enclosures),
+            'animals': pack_members((enclosure.animals for enclosure in enclosures), animal_index),
+        },
+    }
+
+    progress(0.5, 0)
+
+    content = memoryview(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+    del data
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        for start in range(0, len(content), SNAPSHOT_CHUNK_SIZE):
+            written = file.write(content[start:start + SNAPSHOT_CHUNK_SIZE]) + start
+            progress(0.5 + written / len(content) / 2, written)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+    sync_directory(path)
+    return len(content)
+
+
+def load_snapshot(zoo: Zoo, path: str) -> int:
+    """Fill an empty zoo with the objects of a snapshot file and return
+    the LSN of the log the snapshot contains the changes up to.
+
+    All objects get created at once and added to the zoo via
+    Zoo.restore, without going through the add methods."""
+    with open(path, 'rb') as file:
+        data = pickle.load(file)
+    if data.get('format') != SNAPSHOT_FORMAT:
+        raise ValueError(f'{path} is not a snapshot of format {SNAPSHOT_FORMAT}')
+
+    # creating millions of objects makes the garbage collector run over
+    # and over again, although none of them is garbage
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        restore_snapshot(zoo, data)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return data['lsn']
+
+
+def restore_snapshot(zoo: Zoo, data: dict) -> None:
+    """Create the objects of a loaded snapshot and add them to the zoo."""
+    columns = data['animals']
+    species_names, species_indexes = columns['species_name']
+    common_names, common_indexes = columns['common_name']
+    animals = [Animal(species_names[species_idx], common_names[common_idx], age, animal_id)
+               for animal_id, species_idx, common_idx, age in zip(
+                   columns['id'], species_indexes, common_indexes, columns['age'])]
+    for record in ('feeding_record', 'medical_record'):
+        unpack_records(animals, record, *columns[record])
+
+    columns = data['enclosures']
+    enclosures = [Enclosure(name, area, enclosure_id) for enclosure_id, name, area in zip(
+        columns['id'], columns['name'], columns['area'])]
+    unpack_records(enclosures, 'cleaning_record', *columns['cleaning_record'])
+    for enclosure, members in zip(enclosures, unpack_members(*columns['animals'], animals)):
+        enclosure.animals = EntitySet.from_unique(members)
+        for animal in members:
+            animal.enclosure = enclosure
+    for animal, enclosure_idx in zip(animals, data['animals']['enclosure']):
+        if enclosure_idx >= 0 and animal.enclosure is None:
+            animal.enclosure = enclosures[enclosure_idx]
+
+    columns = data['caretakers']
+    caretakers = [Caretaker(name, address, caretaker_id) for caretaker_id, name, address in zip(
+        columns['id'], columns['name'], columns['address'])]
+    for caretaker, members in zip(caretakers, unpack_members(*columns['animals'], animals)):
+        caretaker.animals = EntitySet.from_unique(members)
+        for animal in members:
+            animal.caretaker = caretaker
+
+    zoo.restore(animals, caretakers, enclosures, data.get('version', 0),
+                data.get('collection_versions'), data.get('epoch'))
+
+
+class BackgroundSave:
+    """Saves snapshots of a zoo in a child process, in the style of the
+    BGSAVE command of Redis.
+
+    The process gets forked and the child writes its copy of the zoo to
+    the snapshot. The operating system shares the memory of both
+    processes until one of them changes a page (copy-on-write), so the
+    zoo only has to stay unchanged during the fork itself and the parent
+    keeps serving requests while the snapshot gets written. The child
+    reports its progress via a pipe to a thread of the parent, which
+    waits for the child to exit and then calls saved with the LSN of the
+    snapshot, e.g. to truncate the log.
+
+    Only one save runs at a time, starting another one meanwhile gets
+    rejected."""
+
+    def __init__(self, path: str, saved: Callable[[int], object] | None = None) -> None:
+        self.path = path
+        self._saved = saved
+        self._lock = threading.Lock()
+        self._status: dict | None = None
+        self._started = 0.0
+        self._done = threading.Event()
+        self._done.set()
+
+    @property
+    def running(self) -> bool:
+        return not self._done.is_set()
+
+    def status(self) -> dict | None:
+        """Return the state of the running or the latest save or None if
+        nothing has been saved yet: whether it is in progress, whether it
+        succeeded, the LSN it saves up to, when it started and how many
+        seconds it took, the finished share of the work, the number of
+        bytes written and the error if it failed."""
+        with self._lock:
+            if self._status is None:
+                return None
+            status = dict(self._status)
+            if status['in_progress']:
+                status['duration'] = time.monotonic() - self._started
+        return status
+
+    def start(self, zoo: Zoo, lsn: int) -> bool:
+        """Start saving the zoo, which contains the changes up to the
+        given LSN, and return whether the save has been started. It does
+        not while another save is running.
+
+        The zoo must not change during the call, so the caller has to
+        hold its lock."""
+        with self._lock:
+            if self.running:
+                return False
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                self._save(zoo, lsn, write_fd)
+            os.close(write_fd)
+            self._done.clear()
+            self._started = time.monotonic()
+            self._status = {
+                'in_progress': True,
+                'status': 'running',
+                'lsn': lsn,
+                'started': datetime.datetime.now(),
+                'duration': 0.0,
+                'progress': 0.0,
+                'bytes_written': 0,
+                'error': None,
+            }
+        threading.Thread(target=self._monitor, args=(pid, read_fd, lsn), daemon=True).start()
+        return True
+
+    def wait(self, timeout: float | None = None) -> dict | None:
+        """Wait until the running save, if any, has finished and return
+        its status."""
+        self._done.wait(timeout)
+        return self.status()
+
+    def _save(self, zoo: Zoo, lsn: int, fd: int) -> NoReturn:
+        """Write the snapshot in the child process and report to the
+        parent, one JSON array per line. The child never returns."""
+        # the garbage collector would touch every object of the zoo and
+        # so copy all of its pages
+        gc.disable()
+        exit_code = 1
+        try:
+            with os.fdopen(fd, 'w') as pipe:
+                def report(*message) -> None:
+                    pipe.write(json.dumps(message) + '\n')
+                    pipe.flush()
+
+                try:
+                    report('saved', save_snapshot(zoo, self.path, lsn,
+                                                  lambda share, written: report('progress', share, written)))
+                    exit_code = 0
+                except Exception as e:
+                    report('failed', str(e))
+        finally:
+            # skip all cleanup of the parent's objects, e.g. flushing its
+            # files a second time
+            os._exit(exit_code)
+
+    def _monitor(self, pid: int, fd: int, lsn: int) -> None:
+        """Follow the reports of the child until it has exited. The save
+        always ends with a status, even if the child died in the middle
+        of a report."""
+        error = 'The save has been interrupted'
+        size = None
+        try:
+            result = None
+            try:
+                with os.fdopen(fd) as pipe:
+                    for line in pipe:
+                        message, *args = json.loads(line)
+                        if message == 'progress':
+                            with self._lock:
+                                self._status['progress'], self._status['bytes_written'] = args
+                        else:
+                            result = message, args[0]
+            except ValueError:
+                # an incomplete report of a child that has been killed
+                result = None
+            finally:
+                _, wait_status = os.waitpid(pid, 0)
+            exit_code = os.waitstatus_to_exitcode(wait_status)
+
+            if result is not None and result[0] == 'failed':
+                error = result[1]
+            elif result is None or exit_code != 0:
+                error = f'The child process exited with code {exit_code}'
+            else:
+                size = result[1]
+                error = None
+                if self._saved is not None:
+                    self._saved(lsn)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            with self._lock:
+                self._status.update({
+                    'in_progress': False,
+                    'status': 'failed' if error else 'ok',
+                    'duration': time.monotonic() - self._started,
+                    'error': error,
+                })
+                if error is None:
+                    self._status.update({'progress': 1.0, 'bytes_written': size})
+            self._done.set()